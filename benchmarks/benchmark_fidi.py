@@ -0,0 +1,197 @@
+"""This part of program is responsible for measuring time and memory of calculations of plates, shields and shells
+for many meshes, supports and solvers, so changes of program may be compared with results of previous version
+
+Every case is computed a few times without factorization cache and the fastest run is kept, peak memory is measured
+in one additional run. Results are saved as json file, which may be given as baseline of later runs - cases slower
+than baseline by more than threshold are reported as slowdowns."""
+
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+import scipy
+
+from fidi.attributes.loading_attributes import element_from_data
+
+# operator of shield is regular only if its left edge is free, so hinged supports are used only by plates (their sine
+# transform solver is measured as backend spectral) and the other supports leave the loaded left edge free
+SUPPORTS = {"hinged": {"bottom": 1, "left": 1, "right": 1, "top": 1},
+            "fixed": {"bottom": 2, "left": 0, "right": 2, "top": 2},
+            "mixed": {"bottom": 2, "left": 0, "right": 1, "top": 0}}
+
+# backend : assembly, solver and its options
+BACKENDS = {"dense": ("dense", "dense", {"spectral": False}),
+            "spectral": ("dense", "dense", {"spectral": True}),
+            "sparse": ("sparse", "sparse", None),
+            "banded": ("sparse", "banded", None),
+            "multigrid": ("stencil", "multigrid", None)}
+
+# groups of stages of calculations, see fidi.fdm_engine.progress
+STAGE_GROUPS = {"assembly": ["allocation", "boundary rows", "interior rows"],
+                "solve": ["factorization", "solve"],
+                "post-processing": ["reshape", "recovery"]}
+
+MAX_DENSE_NODES = 2500  # dense matrix of bigger mesh needs too much memory
+
+
+def element_data(object_type, nodes, supports):
+    """Json data of square element with nodes x nodes mesh"""
+    return {"name": "benchmark", "object_type": object_type, "density": 0.1,
+            "geometry": {"width": nodes * 0.1, "height": nodes * 0.1, "thickness": 20.0},
+            "material": {"E": 30.0, "v": 0.2},
+            "loads_plate": 5.0,
+            "loads_shield": {"x_direction": {"bottom": 0.0, "left": 10.0, "right": 0.0, "top": 0.0},
+                             "y_direction": {"bottom": 0.0, "left": 10.0, "right": 0.0, "top": 0.0}},
+            "supports": dict(SUPPORTS[supports])}
+
+
+def applicable(object_type, nodes, supports, backend):
+    """Returns False for cases which are not measured - dense matrices of big meshes, shields without free left
+    edge and sine transforms of elements other than fully hinged plates"""
+    if backend == "dense" and nodes * nodes > MAX_DENSE_NODES:
+        return False
+    if object_type != "plate" and SUPPORTS[supports]["left"] != 0:
+        return False
+    return backend != "spectral" or (object_type == "plate" and supports == "hinged")
+
+
+def stage_timings(solver_info):
+    """Sums times of stages of all parts of element"""
+    timings = {}
+    for info in [solver_info, solver_info.get("plate", {})]:
+        for stage, seconds in info.get("timings", {}).items():
+            timings[stage] = timings.get(stage, 0.0) + seconds
+    return timings
+
+
+def run_case(object_type, nodes, supports, backend, repeat=3):
+    """Computes one case repeat times and returns times of the fastest run with peak memory"""
+    [assembly, solver, solver_options] = BACKENDS[backend]
+    best = None
+    for k in range(repeat):
+        element = element_from_data(element_data(object_type, nodes, supports))
+        start = time.perf_counter()
+        element.compute(solver, cache=None, solver_options=solver_options, assembly=assembly)
+        total = time.perf_counter() - start
+        if best is None or total < best["total"]:
+            best = {"total": total, "stages": stage_timings(element.solver_info)}
+    best.update({name: sum(best["stages"].get(stage, 0.0) for stage in stages)
+                 for name, stages in STAGE_GROUPS.items()})
+    element = element_from_data(element_data(object_type, nodes, supports))
+    element.compute(solver, cache=None, solver_options=solver_options, assembly=assembly,
+                    profiler=lambda stage, seconds: None)
+    best["peak_memory"] = element.solver_info["peak_memory"]
+    return best
+
+
+def case_id(object_type, nodes, supports, backend):
+    return "{}-{}x{}-{}-{}".format(object_type, nodes, nodes, supports, backend)
+
+
+def run_benchmarks(objects, sizes, supports, backends, repeat=3):
+    """Computes every combination of objects, sizes of mesh, supports and backends, returns dictionary of results"""
+    cases = {}
+    for object_type in objects:
+        for nodes in sizes:
+            for support in supports:
+                for backend in backends:
+                    if not applicable(object_type, nodes, support, backend):
+                        continue
+                    name = case_id(object_type, nodes, support, backend)
+                    try:
+                        cases[name] = run_case(object_type, nodes, support, backend, repeat)
+                    except Exception as error:  # e.g. singular matrix of shield or solver unable to converge
+                        cases[name] = {"error": "{}: {}".format(type(error).__name__, error)}
+                    print(name, cases[name].get("total", cases[name].get("error")))
+    return {"date": datetime.datetime.now().isoformat(),
+            "environment": {"python": sys.version.split()[0], "numpy": np.__version__, "scipy": scipy.__version__,
+                            "platform": platform.platform(), "processor": platform.processor()},
+            "repeat": repeat,
+            "cases": cases}
+
+
+def slowdowns(results, baseline, threshold=1.2):
+    """Returns list of [case, time, time of baseline] of cases slower than baseline more than threshold times"""
+    slower = []
+    for name, case in results["cases"].items():
+        base = baseline["cases"].get(name, {})
+        if "total" in case and "total" in base and case["total"] > threshold * base["total"]:
+            slower.append([name, case["total"], base["total"]])
+    return slower
+
+
+class BenchmarkCmdl(object):
+    """Manage benchmark of solvers from command line"""
+    def __init__(self):
+        self.parser = self.setup_cmdline_parser()
+        self.args = self.parser.parse_args()
+
+    def setup_cmdline_parser(self):
+        """Create parser for command line arguments"""
+        parser = argparse.ArgumentParser(description='Measure time and memory of calculations of FIDI elements')
+        parser.add_argument('--objects',
+                            nargs='+',
+                            default=['plate', 'shield', 'shell'],
+                            choices=['plate', 'shield', 'shell'],
+                            help='Types of elements'
+                            )
+        parser.add_argument('--sizes',
+                            nargs='+',
+                            default=[25, 50, 100],
+                            type=int,
+                            help='Numbers of nodes on each dimension of square mesh'
+                            )
+        parser.add_argument('--supports',
+                            nargs='+',
+                            default=sorted(SUPPORTS),
+                            choices=sorted(SUPPORTS),
+                            help='Supports of elements'
+                            )
+        parser.add_argument('--backends',
+                            nargs='+',
+                            default=sorted(BACKENDS),
+                            choices=sorted(BACKENDS),
+                            help='Assembly and solver of equations'
+                            )
+        parser.add_argument('--repeat',
+                            default=3,
+                            type=int,
+                            help='Number of runs of every case, the fastest one is kept'
+                            )
+        parser.add_argument('--output',
+                            default='benchmark.json',
+                            help='Json file for results'
+                            )
+        parser.add_argument('--baseline',
+                            default=None,
+                            help='Json file with results of previous benchmark'
+                            )
+        parser.add_argument('--threshold',
+                            default=1.2,
+                            type=float,
+                            help='Case slower than baseline more than threshold times is a slowdown'
+                            )
+        return parser
+
+    def run(self):
+        """Run benchmark, save its results and compare them with baseline, exit code is 1 if there are slowdowns"""
+        results = run_benchmarks(self.args.objects, self.args.sizes, self.args.supports, self.args.backends,
+                                 self.args.repeat)
+        with open(self.args.output, 'w') as results_file:
+            results_file.write(json.dumps(results, indent=4, sort_keys=True))
+        if self.args.baseline is None:
+            return 0
+        with open(self.args.baseline) as baseline_file:
+            slower = slowdowns(results, json.load(baseline_file), self.args.threshold)
+        for [name, seconds, base_seconds] in slower:
+            print("Slowdown {} - {:.4f} s, baseline {:.4f} s".format(name, seconds, base_seconds))
+        return 1 if slower else 0
+
+
+if __name__ == '__main__':
+    benchmark = BenchmarkCmdl()
+    sys.exit(benchmark.run())
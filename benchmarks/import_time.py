@@ -0,0 +1,91 @@
+"""This part of program is responsible for measuring time of import of modules used by headless calculations and
+checking that they do not import plotting or Qt libraries
+
+Every module is imported in new Python process, so modules imported before do not hide the cost of import. Exit code is 1 if any module imports forbidden library or is imported longer than limit."""
+
+import argparse
+import json
+import subprocess
+import sys
+
+# modules which must be importable without plotting and graphical interface
+HEADLESS_MODULES = ["fidi", "fidi.fdm_engine.fdm_plate_algorithm", "fidi.fdm_engine.fdm_shield_algorithm",
+                    "fidi.attributes.loading_attributes", "fidi.attributes.batch_runner",
+                    "fidi.attributes.parameter_sweep", "fidi.console.console_core", "fidi.console.batch_console"]
+
+FORBIDDEN = ["matplotlib", "PySide2", "fidi.gui"]
+
+CHECK = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+duration = time.perf_counter() - start
+print(json.dumps([duration, sorted(set(name for name in {forbidden} if name in sys.modules))]))
+"""
+
+
+def import_time(module):
+    """Imports module in new process, returns [time of import in seconds, forbidden modules imported by it]"""
+    process = subprocess.run([sys.executable, "-c", CHECK.format(module=module, forbidden=FORBIDDEN)],
+                             capture_output=True, text=True, check=True)
+    return json.loads(process.stdout.splitlines()[-1])
+
+
+def import_times(modules, repeat=3):
+    """Returns dictionary of module : {"time" - the shortest of repeat imports, "forbidden" - forbidden modules}"""
+    results = {}
+    for module in modules:
+        runs = [import_time(module) for k in range(repeat)]
+        results[module] = {"time": min(run[0] for run in runs), "forbidden": runs[0][1]}
+    return results
+
+
+class ImportTimeCmdl(object):
+    """Manage benchmark of import time from command line"""
+    def __init__(self):
+        self.parser = self.setup_cmdline_parser()
+        self.args = self.parser.parse_args()
+
+    def setup_cmdline_parser(self):
+        """Create parser for command line arguments"""
+        parser = argparse.ArgumentParser(description='Measure import time of headless FIDI modules')
+        parser.add_argument('--modules',
+                            nargs='+',
+                            default=HEADLESS_MODULES,
+                            help='Modules to import'
+                            )
+        parser.add_argument('--repeat',
+                            default=3,
+                            type=int,
+                            help='Number of imports of every module, the fastest one is kept'
+                            )
+        parser.add_argument('--limit',
+                            default=2.0,
+                            type=float,
+                            help='Maximal time of import of one module in seconds'
+                            )
+        parser.add_argument('--output',
+                            default=None,
+                            help='Json file for results'
+                            )
+        return parser
+
+    def run(self):
+        """Import every module, print its time and return exit code 1 if any of them fails the check"""
+        results = import_times(self.args.modules, self.args.repeat)
+        failed = 0
+        for module, result in results.items():
+            problems = ["imports " + ", ".join(result["forbidden"])] if result["forbidden"] else []
+            if result["time"] > self.args.limit:
+                problems.append("slower than {} s".format(self.args.limit))
+            failed += bool(problems)
+            print("{} - {:.3f} s {}".format(module, result["time"], "; ".join(problems)))
+        if self.args.output is not None:
+            with open(self.args.output, 'w') as results_file:
+                results_file.write(json.dumps(results, indent=4, sort_keys=True))
+        return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    benchmark = ImportTimeCmdl()
+    sys.exit(benchmark.run())
@@ -1,4 +1,11 @@
-from . import gui
 from . import fdm_engine
 from . import attributes
 from . import console
+
+
+def __getattr__(name):
+    """Graphical interface is imported on first use, so calculations do not need Qt and matplotlib"""
+    if name == "gui":
+        import importlib
+        return importlib.import_module(".gui", __name__)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
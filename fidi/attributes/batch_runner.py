@@ -0,0 +1,79 @@
+"""This part of program is responsible for computing many elements saved as json files without any questions to user
+
+Elements are computed in parallel in process pool, results of every element are saved to disk as soon as they are
+computed and summary of all elements is written to summary.csv. Element which can not be loaded or computed does not
+stop other elements, its error is written in the summary."""
+
+import csv
+import datetime
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from fidi.attributes.loading_attributes import fidi_load_path, element_from_data
+from fidi.attributes.result_cache import ResultCache
+
+SUMMARY_FIELDS = ["file", "name", "object_type", "nodes", "max_displacement", "duration", "results", "error"]
+
+
+def element_files(pattern):
+    """Returns sorted paths of json files in directory or matching glob pattern"""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*.json")
+    return sorted(glob.glob(pattern))
+
+
+def compute_file(path, output, solver="sparse", solver_options=None, cache_directory=None):
+    """Loads and computes element from json file, its results are saved in output folder as npz file with arrays
+    in order of element.results. Results of elements computed before are taken from cache in cache_directory, if it
+    is given. Returns row of summary"""
+    row = {"file": path}
+    start = datetime.datetime.now()
+    try:
+        element = element_from_data(fidi_load_path(path))
+        row.update({"name": element.name, "object_type": element.object_type,
+                    "nodes": "{} x {}".format(*element.nodes)})
+        result_cache = None if cache_directory is None else ResultCache(cache_directory)
+        element.compute(solver, solver_options=solver_options, result_cache=result_cache)
+        filename = os.path.join(output, os.path.splitext(os.path.basename(path))[0] + ".npz")
+        np.savez(filename, *element.results)
+        row.update({"results": os.path.basename(filename),
+                    "max_displacement": max(float(np.max(np.abs(element.results[k]))) for k in range(3))})
+    except Exception as error:  # one broken element must not stop the whole batch
+        row["error"] = "{}: {}".format(type(error).__name__, error)
+    row["duration"] = (datetime.datetime.now() - start).total_seconds()
+    return row
+
+
+def computed_files(paths, output, solver, solver_options, workers, cache_directory=None):
+    """Yields summary row of every element as soon as it is computed"""
+    if workers == 1:
+        for path in paths:
+            yield compute_file(path, output, solver, solver_options, cache_directory)
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(compute_file, path, output, solver, solver_options, cache_directory)
+                       for path in paths]
+            for future in as_completed(futures):
+                yield future.result()
+
+
+def run_batch(pattern, output, solver="sparse", solver_options=None, workers=None, cache_directory=None):
+    """Computes all elements from directory or glob pattern of json files and yields summary row of every element
+    as soon as its results are saved. Summary of all elements is written to summary.csv file in output folder.
+
+    workers - number of processes, 1 computes everything in this process, None uses all processors
+    cache_directory - folder of ResultCache shared by all processes, None computes every element
+    """
+    if not os.path.isdir(output):
+        os.makedirs(output)
+    with open(os.path.join(output, "summary.csv"), "w", newline="") as summary_file:
+        summary = csv.DictWriter(summary_file, SUMMARY_FIELDS)
+        summary.writeheader()
+        for row in computed_files(element_files(pattern), output, solver, solver_options, workers,
+                                  cache_directory):
+            summary.writerow(row)
+            summary_file.flush()
+            yield row
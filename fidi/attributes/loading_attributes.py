@@ -1,10 +1,18 @@
 """This part of program is responsible for loading properties of prism
 attributes from existing json file"""
 
+import copy
 import json
+from concurrent.futures import ThreadPoolExecutor
 from fidi.fdm_engine import fdm_plate_algorithm as fdm_plate  # importing functions responsible for plate algorithm
 from fidi.fdm_engine import fdm_shield_algorithm as fdm_shield  # importing functions responsible for shield algorithm
 from fidi.fdm_engine import mesh as stat          # importing classes containing statical quantities
+from fidi.fdm_engine import solvers               # importing solvers of assembled FDM equations
+from fidi.fdm_engine.factorization_cache import default_cache  # factorized operators shared by all elements
+from fidi.fdm_engine.progress import part_progress, MemoryTrace  # stages and memory of calculations
+from fidi.fdm_engine.results import Results, FIELDS, SHIELD_FIELDS, joined_results  # named matrices of results
+from fidi.attributes import results_archive       # saving results in binary archive
+from fidi.attributes import result_cache as stored  # results of already computed elements kept on disk
 
 
 def fidi_load_file(filename):
@@ -20,18 +28,37 @@ def fidi_load_file(filename):
         print("There is no {}.json in json_files folder".format(filename))
 
 
+def fidi_load_path(path):
+    """Function for loading saved properties of element from json file at any path"""
+    with open(path) as starting_file:
+        return json.load(starting_file)
+
+
 def create_element():
     """This function creates new Prism object"""
     _data = fidi_load_file(input('Please enter the name of file to load'))
     if _data is None:
         return None
     else:
-        if _data['object_type'] == "plate":
-            return Plate(_data)
-        elif _data['object_type'] == "shield":
-            return Shield(_data)
-        else:
-            return Shell(_data)
+        return element_from_data(_data)
+
+
+def element_from_data(data):
+    """Creates Plate, Shield or Shell object from properties loaded from json file"""
+    if data['object_type'] == "plate":
+        return Plate(data)
+    elif data['object_type'] == "shield":
+        return Shield(data)
+    else:
+        return Shell(data)
+
+
+def load_element(path, mmap=True):
+    """Creates element saved together with its results by save_results method, results are not computed again,
+    but memory-mapped from archive"""
+    element = element_from_data(results_archive.read_metadata(path)["definition"])
+    element.load_results(path, mmap)
+    return element
 
 
 def statical_quantities(width, height, density):
@@ -41,14 +68,26 @@ def statical_quantities(width, height, density):
     return [mesh, displacements]
 
 
+def stacked_shield_loads(list_of_loads):
+    """Joins shield loads of following load cases into one dictionary, in which every load is a list of values"""
+    shield_loads = [load_case['loads_shield'] for load_case in list_of_loads]
+    return {direction: {edge: [loads[direction][edge] for loads in shield_loads]
+                        for edge in shield_loads[0][direction]}
+            for direction in shield_loads[0]}
+
+
 class Prism(object):
     """Prism object contain all the information gathered from user about properties of element, density of mesh
     and location of supports. Methods of this class are inherited to Shell, Shield and Plate classes
     """
 
+    # names of matrices of results in order of results
+    result_names = FIELDS
+
     def __init__(self, json_data, computed=False):
         """ Loading all properties from existing json file """
 
+        self._definition = copy.deepcopy(json_data)  # properties in units of json file, saved with results
         self._geometry = json_data['geometry']
         self._geometry["thickness"] *= 0.01  # thickness in now in [m]
         self._material = json_data['material']
@@ -62,6 +101,7 @@ class Prism(object):
         """setting initial statical quantities"""
         statics = statical_quantities(self._geometry['width'], self._geometry['height'], self._density)
         self.results = None
+        self.solver_info = {}  # details of solution of the last computation, e.g. convergence of iterative solvers
         self._nodes = statics[0].nodes
         self._displacements = statics[1].data
 
@@ -97,10 +137,57 @@ class Prism(object):
     def displacements(self):
         return self._displacements
 
+    def save_results(self, path):
+        """Saves results with properties of element in binary archive (npz file), matrices containing only zeros
+        are not stored. Returns path of archive."""
+        if not self.computed:
+            raise ValueError("Results are not available, please perform the calculations first")
+        definition = dict(self._definition, supports=dict(self._supports))  # supports may be changed by GUI
+        return results_archive.save_results(path, self.result_names, self.results, definition)
+
+    def load_results(self, path, mmap=True):
+        """Reads results saved by save_results, matrices are memory-mapped from archive (read-only) if mmap is True"""
+        [definition, names, results] = results_archive.load_results(path, mmap)
+        if names != self.result_names:
+            raise ValueError("Archive {} contains results of other type of element".format(path))
+        self.results = Results.from_arrays(names, results)
+        self.computed = True
+
+    def result_key(self, solver=None, solver_options=None, assembly=None):
+        """Key of results of element computed with given settings in ResultCache"""
+        definition = dict(self._definition, supports=dict(self._supports))  # supports may be changed by GUI
+        return stored.result_key(definition, solver, solvers.preferred_assembly(solver, assembly), solver_options)
+
+    def _cached(self, result_cache, key):
+        """Takes results from cache of results on disk, returns False if they are not there"""
+        results = None if result_cache is None else result_cache.get(key, self.result_names)
+        if results is None:
+            return False
+        self.results = Results.from_arrays(self.result_names, results)
+        self.solver_info = {"result_cache": key}
+        self.computed = True
+        return True
+
+    def _check_convergence(self):
+        """Raises ConvergenceError if iterative solver of any part of element (plate or direction of shield) did not
+        reach its tolerance, such results are neither marked as computed nor stored in cache of results"""
+        failed = [part for [part, info] in sorted(self.solver_info.items())
+                  if isinstance(info, dict) and not all(info.get("converged", [True]))]
+        if failed:
+            raise solvers.ConvergenceError("Iterative solver did not converge for {} of element {}, increase maxiter "
+                                           "or choose other preconditioner".format(", ".join(failed), self.name))
+
+    def _store(self, result_cache, key):
+        if result_cache is not None:
+            self.solver_info["result_cache"] = key
+            result_cache.put(key, self)
+
 
 class Shield(Prism):
     """In case loads act in the prism plane"""
 
+    result_names = SHIELD_FIELDS
+
     def __init__(self, json_data):
         """ Loading all methods of any Prism object and shield loads"""
         super().__init__(json_data)
@@ -115,10 +202,32 @@ class Shield(Prism):
     def loads_shield(self):
         return self._loads_shield
 
-    def compute(self):
+    def compute(self, solver=None, cache=default_cache, solver_options=None, assembly=None, progress=None,
+                profiler=None, result_cache=None):
+        key = None if result_cache is None else self.result_key(solver, solver_options, assembly)
+        if self._cached(result_cache, key):
+            return
+        self.computed = False  # until calculations are completed, they may be cancelled by progress function
+        self.solver_info = {}
+        with MemoryTrace(profiler is not None) as trace:
+            self.results = fdm_shield.compute_shield(self._displacements, self._material["E"], self._loads_shield,
+                            self._supports, self._density, self._material["v"], self._geometry["thickness"],
+                            solvers.preferred_assembly(solver, assembly), solver, cache, solver_options,
+                            self.solver_info, progress=progress, profiler=profiler)
+        self.solver_info["peak_memory"] = trace.peak
+        self._check_convergence()
         self.computed = True
-        self.results = fdm_shield.compute_shield(self._displacements, self._material["E"], self._loads_shield,
-                        self._supports, self._density, self._material["v"], self._geometry["thickness"])
+        self._store(result_cache, key)
+
+    def compute_load_cases(self, list_of_loads, solver=None, cache=default_cache, solver_options=None,
+                           assembly=None):
+        """Solves many load cases at once, operator is assembled and factorized only once. Every load case is
+        a dictionary with key 'loads_shield' like in json file. Returns Results with the same fields as results,
+        each of them with additional first dimension of load cases"""
+        return fdm_shield.compute_shield(self._displacements, self._material["E"], stacked_shield_loads(list_of_loads),
+                                         self._supports, self._density, self._material["v"],
+                                         self._geometry["thickness"], solvers.preferred_assembly(solver, assembly),
+                                         solver, cache, solver_options)
 
 
 class Plate(Prism):
@@ -136,28 +245,86 @@ class Plate(Prism):
     def loads_plate(self):
         return self._loads_plate
 
-    def compute(self):
+    def compute(self, solver=None, cache=default_cache, solver_options=None, assembly=None, progress=None,
+                profiler=None, result_cache=None):
+        """Default solver (None) is dense, or matrix-free multigrid for assembly "stencil". Plate hinged on all edges
+        is solved with sine transforms instead of default solver, solver_options {"spectral": False} turns it off
+        (see fidi.fdm_engine.fdm_plate_algorithm.compute_plate)"""
+        key = None if result_cache is None else self.result_key(solver, solver_options, assembly)
+        if self._cached(result_cache, key):
+            return
+        self.computed = False  # until calculations are completed, they may be cancelled by progress function
+        self.solver_info = {"plate": {}}
+        with MemoryTrace(profiler is not None) as trace:
+            self.results = fdm_plate.compute_plate(self._displacements, self._Dp, self._loads_plate,
+                                                    self._supports, self._density, self._material["v"],
+                                                    self._geometry["thickness"],
+                                                    solvers.preferred_assembly(solver, assembly), solver, cache,
+                                                    solver_options, self.solver_info["plate"], progress, profiler)
+        self.solver_info["peak_memory"] = trace.peak
+        self._check_convergence()
         self.computed = True
-        self.results = fdm_plate.compute_plate(self._displacements, self._Dp, self._loads_plate,
-                                                self._supports, self._density, self._material["v"],
-                                                self._geometry["thickness"])
+        self._store(result_cache, key)
+
+    def compute_load_cases(self, list_of_loads, solver=None, cache=default_cache, solver_options=None,
+                           assembly=None):
+        """Solves many load cases at once, operator is assembled and factorized only once. Every load case is
+        a dictionary with key 'loads_plate' like in json file. Returns Results with the same fields as results,
+        each of them with additional first dimension of load cases"""
+        loads_plate = [load_case['loads_plate'] * 1000 for load_case in list_of_loads]  # loads are now in N/m2
+        return fdm_plate.compute_plate(self._displacements, self._Dp, loads_plate,
+                                       self._supports, self._density, self._material["v"],
+                                       self._geometry["thickness"], solvers.preferred_assembly(solver, assembly),
+                                       solver, cache, solver_options)
 
 
 class Shell(Shield, Plate):
     """In case loads act both perpendicular and in the prism plane"""
 
+    result_names = ["plate_" + name for name in Plate.result_names] + \
+                   ["shield_" + name for name in Shield.result_names]
+
     def __init__(self, json_data):
         """ Loading all methods and attributes of any Shield or Plate object"""
         super().__init__(json_data)
 
-    def compute(self):
+    def compute(self, solver=None, cache=default_cache, solver_options=None, assembly=None, progress=None,
+                profiler=None, result_cache=None):
+        """Plate and both directions of shield are independent, so they are solved concurrently - factorizations
+        and dense solvers spend their time in LAPACK and SuperLU, which let other threads run. Plate hinged on all
+        edges is solved with sine transforms like in Plate.compute, unless solver_options has {"spectral": False}"""
+        key = None if result_cache is None else self.result_key(solver, solver_options, assembly)
+        if self._cached(result_cache, key):
+            return
+        self.computed = False  # until calculations are completed, they may be cancelled by progress function
+        self.solver_info = {"plate": {}}
+        assembly = solvers.preferred_assembly(solver, assembly)
+        with MemoryTrace(profiler is not None) as trace, ThreadPoolExecutor(max_workers=3) as executor:
+            plate = executor.submit(fdm_plate.compute_plate, self._displacements, self._Dp, self._loads_plate,
+                                    self._supports, self._density, self._material["v"],
+                                    self._geometry["thickness"], assembly, solver, cache,
+                                    solver_options, self.solver_info["plate"], part_progress(progress, "plate"),
+                                    part_progress(profiler, "plate"))
+            shield = fdm_shield.compute_shield(self._displacements, self._material["E"], self._loads_shield,
+                                               self._supports, self._density, self._material["v"],
+                                               self._geometry["thickness"], assembly, solver, cache,
+                                               solver_options, self.solver_info, executor,
+                                               part_progress(progress, "shield"), part_progress(profiler, "shield"))
+            self.results = joined_results([["plate_", plate.result()], ["shield_", shield]])
+        self.solver_info["peak_memory"] = trace.peak
+        self._check_convergence()
         self.computed = True
-        self.results = fdm_plate.compute_plate(self._displacements, self._Dp, self._loads_plate,
-                                                self._supports, self._density, self._material["v"],
-                                                self._geometry["thickness"]) +\
-                        fdm_shield.compute_shield(self._displacements, self._material["E"], self._loads_shield,
-                                                  self._supports, self._density, self._material["v"],
-                                                  self._geometry["thickness"])
+        self._store(result_cache, key)
+
+    def compute_load_cases(self, list_of_loads, solver=None, cache=default_cache, solver_options=None,
+                           assembly=None):
+        """Solves many load cases at once, every load case is a dictionary with keys 'loads_plate' and 'loads_shield'
+        like in json file. Returns Results with the same fields as results, each of them with additional first
+        dimension of load cases"""
+        return joined_results([["plate_", Plate.compute_load_cases(self, list_of_loads, solver, cache,
+                                                                   solver_options, assembly)],
+                               ["shield_", Shield.compute_load_cases(self, list_of_loads, solver, cache,
+                                                                     solver_options, assembly)]])
 
 
 if __name__ == '__main__':
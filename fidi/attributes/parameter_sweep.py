@@ -0,0 +1,126 @@
+"""This part of program is responsible for parametric studies of element - it is computed for every combination
+of given values of thickness, modulus of elasticity, Poisson's ratio and density of mesh
+
+Operator of plate equations does not depend on thickness and modulus of elasticity (they change only flexural
+stiffness Dp, which scales the load) and operator of shield does not depend on thickness, so combinations sharing
+the same operator are computed one after another with one FactorizationCache - the operator is factorized only once
+for all of them. Such groups are computed in parallel in process pool and results of every combination are saved
+to disk as soon as they are computed. Combination which can not be computed (e.g. iterative solver does not converge)
+does not stop the others, its error is written in the summary."""
+
+import copy
+import csv
+import itertools
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from fidi.attributes.loading_attributes import element_from_data
+from fidi.fdm_engine.factorization_cache import FactorizationCache
+
+# swept parameter : place of its value in json data of element, values are given in units of json file
+SWEPT_PARAMETERS = OrderedDict([("thickness", ("geometry", "thickness")),  # [cm]
+                                ("E", ("material", "E")),                  # [GPa]
+                                ("v", ("material", "v")),
+                                ("density", (None, "density"))])           # [m]
+
+SUMMARY_FIELDS = ["index"] + list(SWEPT_PARAMETERS) + ["max_displacement", "file", "error"]
+
+
+def parameter_values(text):
+    """Converts text into list of values - single number or range start:stop:count of evenly spaced values"""
+    if ":" in text:
+        [start, stop, count] = text.split(":")
+        return list(np.linspace(float(start), float(stop), int(count)))
+    return [float(text)]
+
+
+def combinations(ranges):
+    """Returns list of dictionaries with every combination of swept values, ranges - dictionary of lists of values,
+    parameters which are not given keep their value from json data"""
+    names = [name for name in SWEPT_PARAMETERS if name in ranges]
+    return [dict(zip(names, values)) for values in itertools.product(*[ranges[name] for name in names])]
+
+
+def parameter_value(data, name):
+    """Returns value of swept parameter from json data of element"""
+    [section, key] = SWEPT_PARAMETERS[name]
+    return data[key] if section is None else data[section][key]
+
+
+def swept_data(json_data, combination):
+    """Returns copy of json data of element with swept parameters set to values of combination"""
+    data = copy.deepcopy(json_data)  # Prism objects change units of their json data
+    for name, value in combination.items():
+        [section, key] = SWEPT_PARAMETERS[name]
+        (data if section is None else data[section])[key] = float(value)
+    return data
+
+
+def operator_group(json_data, combination):
+    """Returns parameters on which operator of element depends, combinations with the same group share factorization"""
+    data = swept_data(json_data, combination)
+    names = ["density", "v"] if data["object_type"] == "plate" else ["density", "v", "E"]
+    return tuple(parameter_value(data, name) for name in names)
+
+
+def compute_group(json_data, group, output, solver="sparse", solver_options=None):
+    """Computes combinations of one group [[index, combination], ...] with shared factorization cache, results of
+    every combination are saved in output folder as npz file with arrays in order of element.results. Returns rows
+    of summary of computed combinations, combination which failed has its error in the row"""
+    cache = FactorizationCache()
+    rows = []
+    for [index, combination] in group:
+        data = swept_data(json_data, combination)
+        row = {name: parameter_value(data, name) for name in SWEPT_PARAMETERS}  # before Prism changes units
+        row["index"] = index
+        try:
+            element = element_from_data(data)
+            element.compute(solver, cache, solver_options)
+            filename = os.path.join(output, "{}_{:05d}.npz".format(data["name"], index))
+            np.savez(filename, *element.results)
+            row.update({"file": os.path.basename(filename),
+                        "max_displacement": max(float(np.max(np.abs(element.results[k]))) for k in range(3))})
+        except Exception as error:  # one failed combination must not stop the whole sweep
+            row["error"] = "{}: {}".format(type(error).__name__, error)
+        rows.append(row)
+    return rows
+
+
+def computed_groups(json_data, groups, output, solver, solver_options, workers):
+    """Yields summary rows of every group of combinations as soon as the group is computed"""
+    if workers == 1:
+        for group in groups:
+            yield compute_group(json_data, group, output, solver, solver_options)
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(compute_group, json_data, group, output, solver, solver_options)
+                       for group in groups]
+            for future in as_completed(futures):
+                yield future.result()
+
+
+def sweep(json_data, ranges, output, solver="sparse", solver_options=None, workers=None):
+    """Computes element for every combination of swept values and yields summary row of every combination as soon as
+    its results are saved. Summary of all combinations is written to sweep.csv file in output folder.
+
+    json_data - properties of element like in json file
+    ranges - dictionary of lists of values of thickness, E, v and density
+    workers - number of processes, 1 computes everything in this process, None uses all processors
+    """
+    if not os.path.isdir(output):
+        os.makedirs(output)
+    groups = OrderedDict()
+    for index, combination in enumerate(combinations(ranges)):
+        groups.setdefault(operator_group(json_data, combination), []).append([index, combination])
+
+    with open(os.path.join(output, "sweep.csv"), "w", newline="") as summary_file:
+        summary = csv.DictWriter(summary_file, SUMMARY_FIELDS)
+        summary.writeheader()
+        for rows in computed_groups(json_data, list(groups.values()), output, solver, solver_options, workers):
+            for row in rows:
+                summary.writerow(row)
+                summary_file.flush()
+                yield row
@@ -0,0 +1,159 @@
+"""This part of program is responsible for keeping results of calculations on disk, so the same element computed
+again, even in other session of program, is read from disk instead of being solved
+
+Results are stored in archives of results_archive module named by hashes of element and solver settings:
+<hash of element>-<hash of settings>.npz. Hash of element is computed from normalized definition of element from its
+json file (name of element does not change results, so it is left out), hash of settings from solver, assembly and
+options of solver. Cache is limited by size of all archives, archives used least recently are removed first."""
+
+import hashlib
+import json
+import os
+
+from fidi.attributes import results_archive
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser("~"), ".fidi", "results_cache")
+
+LOADS = {"plate": ["loads_plate"], "shield": ["loads_shield"], "shell": ["loads_plate", "loads_shield"]}
+
+
+def normalized(value):
+    """Returns value with all numbers as floats, so 20 and 20.0 give the same hash"""
+    if isinstance(value, dict):
+        return {str(key): normalized(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalized(item) for item in value]
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+def digest(value):
+    return hashlib.sha256(json.dumps(normalized(value), sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def element_key(definition):
+    """Hash of properties of element which change its results - geometry, material, loads, supports, density
+    and type of element"""
+    object_type = definition["object_type"]
+    relevant = ["object_type", "geometry", "material", "supports", "density"] + LOADS.get(object_type, LOADS["shell"])
+    return digest({name: definition.get(name) for name in relevant})
+
+
+def settings_key(solver, assembly, solver_options):
+    return digest({"solver": solver, "assembly": assembly, "solver_options": solver_options or {}})
+
+
+def result_key(definition, solver, assembly, solver_options):
+    """Key of results of element computed with given settings of solver"""
+    return "{}-{}".format(element_key(definition), settings_key(solver, assembly, solver_options))
+
+
+class ResultCache(object):
+    """Least recently used cache of results in directory, limited by size of all archives in bytes
+
+    Time of modification of archive is the time of its last use. Archives are written under temporary names and
+    renamed, so cache may be shared by many processes, e.g. of batch runner.
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_size=2 ** 30):
+        self._directory = directory
+        self._max_size = max_size  # in bytes
+        self.hits = 0
+        self.misses = 0
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    @property
+    def directory(self):
+        return self._directory
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    def path(self, key):
+        return os.path.join(self._directory, key + ".npz")
+
+    def __contains__(self, key):
+        return os.path.isfile(self.path(key))
+
+    def __len__(self):
+        return len(self.entries())
+
+    def entries(self):
+        """Returns list of [key, size in bytes, time of last use] of all archives, the least recently used first"""
+        entries = []
+        for filename in os.listdir(self._directory):
+            [key, extension] = os.path.splitext(filename)
+            if extension != ".npz" or key.count("-") != 1 or "." in key:
+                continue  # e.g. archive still being written
+            try:
+                status = os.stat(os.path.join(self._directory, filename))
+            except OSError:  # removed by other process in the meantime
+                continue
+            entries.append([key, status.st_size, status.st_mtime])
+        return sorted(entries, key=lambda entry: entry[2])
+
+    @property
+    def size(self):
+        return sum(entry[1] for entry in self.entries())
+
+    def get(self, key, names, mmap=True):
+        """Returns list of results stored under key or None, if there are no such results or they have other names"""
+        path = self.path(key)
+        try:
+            [definition, stored_names, results] = results_archive.load_results(path, mmap)
+            os.utime(path)  # the archive is used most recently now
+        except (OSError, ValueError, KeyError):  # not stored, removed or damaged
+            self.misses += 1
+            return None
+        if stored_names != list(names):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return results
+
+    def put(self, key, element):
+        """Stores results of computed element, archives used least recently are removed to keep size of cache"""
+        temporary = os.path.join(self._directory, "{}.{}.tmp.npz".format(key, os.getpid()))
+        element.save_results(temporary)
+        if os.path.getsize(temporary) > self._max_size:
+            os.remove(temporary)  # it would remove everything else and would not fit anyway
+            return
+        os.replace(temporary, self.path(key))
+        self._evict()
+
+    def invalidate(self, key):
+        """Removes results stored under key, returns True if they were stored"""
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def invalidate_element(self, definition):
+        """Removes results of element computed with any settings of solver, returns number of removed archives"""
+        prefix = element_key(definition) + "-"
+        return sum(self.invalidate(key) for [key, size, used] in self.entries() if key.startswith(prefix))
+
+    def clear(self):
+        """Removes all results, returns number of removed archives"""
+        return sum(self.invalidate(key) for [key, size, used] in self.entries())
+
+    def resize(self, max_size):
+        """Changes limit of cache and removes archives exceeding it"""
+        self._max_size = max_size
+        self._evict()
+
+    def _evict(self):
+        entries = self.entries()
+        size = sum(entry[1] for entry in entries)
+        for [key, entry_size, used] in entries:
+            if size <= self._max_size:
+                break
+            try:
+                os.remove(self.path(key))
+            except OSError:  # removed by other process or still opened (memory-mapped) on Windows
+                continue
+            size -= entry_size
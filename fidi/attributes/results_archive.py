@@ -0,0 +1,88 @@
+"""This part of program is responsible for saving results of calculations to binary archive and reading them back
+
+Archive is uncompressed npz file - every field of results is stored as npy file inside zip file, so every field may
+be memory-mapped directly from the archive without reading the whole file. Fields containing only zeros (e.g.
+displacements u and v of plate) are not stored at all, metadata contains their shape. Metadata (json text in field
+metadata) contains definition of element as in its json file and names, shapes and types of all fields."""
+
+import json
+import zipfile
+
+import numpy as np
+
+METADATA = "metadata"
+
+
+def save_results(path, names, results, definition):
+    """Saves named arrays of results with definition of element in uncompressed npz archive, returns its path"""
+    if not path.endswith(".npz"):
+        path += ".npz"  # numpy adds the extension anyway
+    arrays = {}
+    fields = []
+    for name, array in zip(names, results):
+        array = np.asarray(array)
+        fields.append({"name": name, "shape": list(array.shape), "dtype": array.dtype.str})
+        if np.any(array):
+            arrays[name] = array
+    metadata = {"definition": definition, "fields": fields}
+    np.savez(path, **dict(arrays, **{METADATA: np.array(json.dumps(metadata))}))
+    return path
+
+
+def read_metadata(path):
+    """Reads definition of element and description of fields from archive"""
+    with np.load(path) as archive:
+        return json.loads(str(archive[METADATA]))
+
+
+def member_offset(path, info):
+    """Returns position of the first byte of data of zip file member in bytes from the beginning of file, or None
+    if the member is compressed"""
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    with open(path, "rb") as zip_file:
+        zip_file.seek(info.header_offset)
+        header = zip_file.read(zipfile.sizeFileHeader)  # local header is followed by name and extra field
+    name_length = int.from_bytes(header[26:28], "little")
+    extra_length = int.from_bytes(header[28:30], "little")
+    return info.header_offset + zipfile.sizeFileHeader + name_length + extra_length
+
+
+def memory_mapped_array(path, offset):
+    """Memory-maps npy array lying at offset of file, returns None if its header is of unknown version"""
+    read_header = {(1, 0): np.lib.format.read_array_header_1_0, (2, 0): np.lib.format.read_array_header_2_0}
+    with open(path, "rb") as npy_file:
+        npy_file.seek(offset)
+        version = np.lib.format.read_magic(npy_file)
+        if version not in read_header:
+            return None
+        [shape, fortran_order, dtype] = read_header[version](npy_file)
+        data_offset = npy_file.tell()
+    if dtype.hasobject:
+        return None
+    return np.memmap(path, dtype=dtype, mode="r", offset=data_offset, shape=shape, order="F" if fortran_order else "C")
+
+
+def read_field(path, name, mmap=True, description=None):
+    """Reads one field of results, memory-mapped (read-only) if possible. Field which was not stored, because it
+    contained only zeros, is returned as read-only array of zeros, which does not occupy memory"""
+    if description is None:
+        description = [field for field in read_metadata(path)["fields"] if field["name"] == name][0]
+    with zipfile.ZipFile(path) as archive:
+        member = name + ".npy"
+        if member not in archive.namelist():
+            return np.broadcast_to(np.zeros((), dtype=description["dtype"]), tuple(description["shape"]))
+        offset = member_offset(path, archive.getinfo(member)) if mmap else None
+        array = None if offset is None else memory_mapped_array(path, offset)
+        if array is None:
+            with archive.open(member) as npy_file:
+                array = np.lib.format.read_array(npy_file)
+    return array
+
+
+def load_results(path, mmap=True):
+    """Reads definition of element and list of names and arrays of all fields of results"""
+    metadata = read_metadata(path)
+    names = [field["name"] for field in metadata["fields"]]
+    results = [read_field(path, field["name"], mmap, field) for field in metadata["fields"]]
+    return metadata["definition"], names, results
@@ -0,0 +1,75 @@
+"""This part of program is responsible for launching computation of many elements from command line, e.g.
+
+    python batch_console.py "slabs/*.json" --output slabs_results --workers 8
+
+computes every element from slabs folder, results and summary.csv are saved in slabs_results folder"""
+
+import argparse
+import datetime
+from fidi.attributes.batch_runner import run_batch
+from fidi.fdm_engine.solvers import SOLVERS
+from fidi.fdm_engine.assembly import PRECISIONS
+
+
+class BatchConsole(object):
+    """Manage computation of directory or glob pattern of json files of elements"""
+    def __init__(self):
+        self.parser = self.setup_cmdline_parser()
+        self.args = self.parser.parse_args()
+
+    def setup_cmdline_parser(self):
+        """Create parser for command line arguments"""
+        parser = argparse.ArgumentParser(description='Compute every element from directory or glob of json files')
+        parser.add_argument('elements',
+                            help='Directory or glob pattern of json files of elements'
+                            )
+        parser.add_argument('--output',
+                            dest='output',
+                            default='results',
+                            help='Folder for results and summary.csv'
+                            )
+        parser.add_argument('--solver',
+                            dest='solver',
+                            default='sparse',
+                            choices=sorted(SOLVERS),
+                            help='Solver of FDM equations'
+                            )
+        parser.add_argument('--precision',
+                            dest='precision',
+                            default='double',
+                            choices=sorted(PRECISIONS),
+                            help='Precision of solution - single halves memory, mixed refines single precision '
+                                 'solution to double precision accuracy'
+                            )
+        parser.add_argument('--workers',
+                            dest='workers',
+                            default=None,
+                            type=int,
+                            help='Number of processes, by default number of processors'
+                            )
+        parser.add_argument('--cache-dir',
+                            dest='cache_directory',
+                            default=None,
+                            help='Folder of cache of results, elements computed before are not computed again'
+                            )
+        return parser
+
+    def run(self):
+        """Run computation of all elements and print every computed element"""
+        start = datetime.datetime.now()
+        failed = 0
+        solver_options = None if self.args.precision == 'double' else {'precision': self.args.precision}
+        for row in run_batch(self.args.elements, self.args.output, self.args.solver, solver_options,
+                             self.args.workers, self.args.cache_directory):
+            if row.get("error"):
+                failed += 1
+                print("{} - {}".format(row["file"], row["error"]))
+            else:
+                print("{} - {} s".format(row["file"], row["duration"]))
+        print("{} failed".format(failed))
+        print(datetime.datetime.now() - start)
+
+
+if __name__ == '__main__':
+    fidi_batch = BatchConsole()
+    fidi_batch.run()
@@ -0,0 +1,51 @@
+"""This part of program is responsible for managing cache of results on disk from command line, e.g.
+
+    python cache_console.py invalidate slabs/slab1.json slabs/slab2.json
+
+removes results of both elements computed with any solver, so they are computed again next time"""
+
+import argparse
+from fidi.attributes.loading_attributes import fidi_load_path
+from fidi.attributes.result_cache import ResultCache, DEFAULT_DIRECTORY
+
+
+class CacheConsole(object):
+    """Manage cache of results of computed elements"""
+    def __init__(self):
+        self.parser = self.setup_cmdline_parser()
+        self.args = self.parser.parse_args()
+
+    def setup_cmdline_parser(self):
+        """Create parser for command line arguments"""
+        parser = argparse.ArgumentParser(description='Show, invalidate or clear cache of results on disk')
+        parser.add_argument('command',
+                            choices=['info', 'invalidate', 'clear'],
+                            help='info - show size of cache, invalidate - remove results of given elements, '
+                                 'clear - remove all results'
+                            )
+        parser.add_argument('elements',
+                            nargs='*',
+                            help='Json files of elements to invalidate'
+                            )
+        parser.add_argument('--cache-dir',
+                            dest='directory',
+                            default=DEFAULT_DIRECTORY,
+                            help='Folder of cache of results'
+                            )
+        return parser
+
+    def run(self):
+        """Run chosen command"""
+        cache = ResultCache(self.args.directory)
+        if self.args.command == 'info':
+            print("{} - {} results, {:.1f} MB".format(cache.directory, len(cache), cache.size / 2 ** 20))
+        elif self.args.command == 'invalidate':
+            for path in self.args.elements:
+                print("{} - {} results removed".format(path, cache.invalidate_element(fidi_load_path(path))))
+        else:
+            print("{} results removed".format(cache.clear()))
+
+
+if __name__ == '__main__':
+    fidi_cache = CacheConsole()
+    fidi_cache.run()
@@ -1,7 +1,5 @@
 """This part of program is responsible launching console version of FIDI"""
 
-import matplotlib.pyplot as plt
-import matplotlib.cm as cm
 import datetime
 from fidi.attributes.saving_attributes import console_save_file
 from fidi.attributes.collecting_attributes.console_input_attributes import console_collecting_attributes
@@ -69,6 +67,8 @@ class ConsoleFidi(object):
 
     def results(self):
         if self.element._computed is True:
+            import matplotlib.pyplot as plt  # imported on first plot, so console starts without it
+            import matplotlib.cm as cm
             plt.imshow(self.element.displacements[2],
                        extent=(0, self.element.nodes[0] - 1, 0, self.element.nodes[1] - 1),
                        interpolation='hermite', cmap=cm.inferno)
@@ -0,0 +1,76 @@
+"""This part of program is responsible for launching parametric study of element from command line, e.g.
+
+    python sweep_console.py slab.json --thickness 15:30:4 --E 25 30 35 --output slab_sweep
+
+computes slab for 4 thicknesses from 15 to 30 cm and 3 moduli of elasticity, results are saved in slab_sweep folder"""
+
+import argparse
+import datetime
+from fidi.attributes.loading_attributes import fidi_load_path
+from fidi.attributes.parameter_sweep import sweep, parameter_values, SWEPT_PARAMETERS
+from fidi.fdm_engine.solvers import SOLVERS
+from fidi.fdm_engine.assembly import PRECISIONS
+
+
+class SweepConsole(object):
+    """Manage parametric study of element given as json file"""
+    def __init__(self):
+        self.parser = self.setup_cmdline_parser()
+        self.args = self.parser.parse_args()
+
+    def setup_cmdline_parser(self):
+        """Create parser for command line arguments"""
+        parser = argparse.ArgumentParser(description='Compute element for every combination of swept parameters')
+        parser.add_argument('element',
+                            help='Path to json file of element'
+                            )
+        for name, help_text in [('thickness', 'Thickness [cm]'), ('E', 'Modulus of elasticity [GPa]'),
+                                ('v', 'Poisson ratio'), ('density', 'Density of mesh [m]')]:
+            parser.add_argument('--{}'.format(name),
+                                dest=name,
+                                nargs='+',
+                                default=None,
+                                help='{} - values or ranges start:stop:count'.format(help_text)
+                                )
+        parser.add_argument('--output',
+                            dest='output',
+                            default='sweep',
+                            help='Folder for results and summary sweep.csv'
+                            )
+        parser.add_argument('--solver',
+                            dest='solver',
+                            default='sparse',
+                            choices=sorted(SOLVERS),
+                            help='Solver of FDM equations'
+                            )
+        parser.add_argument('--precision',
+                            dest='precision',
+                            default='double',
+                            choices=sorted(PRECISIONS),
+                            help='Precision of solution - single halves memory, mixed refines single precision '
+                                 'solution to double precision accuracy'
+                            )
+        parser.add_argument('--workers',
+                            dest='workers',
+                            default=None,
+                            type=int,
+                            help='Number of processes, by default number of processors'
+                            )
+        return parser
+
+    def run(self):
+        """Run parametric study and print every computed combination"""
+        json_data = fidi_load_path(self.args.element)
+        ranges = {name: [value for text in getattr(self.args, name) for value in parameter_values(text)]
+                  for name in SWEPT_PARAMETERS if getattr(self.args, name) is not None}
+        start = datetime.datetime.now()
+        solver_options = None if self.args.precision == 'double' else {'precision': self.args.precision}
+        for row in sweep(json_data, ranges, self.args.output, self.args.solver, solver_options, self.args.workers):
+            print(", ".join("{}: {}".format(name, row[name]) for name in ["index"] + list(ranges) +
+                            ["error" if row.get("error") else "file"]))
+        print(datetime.datetime.now() - start)
+
+
+if __name__ == '__main__':
+    fidi_sweep = SweepConsole()
+    fidi_sweep.run()
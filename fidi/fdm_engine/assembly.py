@@ -0,0 +1,219 @@
+"""This part of program is responsible for storing matrices of FDM scheme equations while they are assembled"""
+
+import numpy as np
+import scipy.sparse as sparse
+from scipy.sparse.linalg import LinearOperator
+
+# type of coefficients of assembled matrices for precision option of solvers, mixed precision keeps the matrix in
+# double precision for residuals of iterative refinement, only its factorization is single
+PRECISIONS = {"double": np.float64, "single": np.float32, "mixed": np.float64}
+
+
+def precision_dtype(precision):
+    """Returns numpy type of coefficients of matrices for given precision"""
+    if precision not in PRECISIONS:
+        raise ValueError("Unknown precision {}, choose one of: {}".format(precision, ", ".join(PRECISIONS)))
+    return PRECISIONS[precision]
+
+
+class SparseMatrix(object):
+    """Matrix of FDM scheme equations stored as coordinate triplets (row, column, value)
+
+    Coefficients are set exactly like in dense numpy matrix - A[a, b] = value - and if the same entry is set twice,
+    the last value is kept, so the assembled matrix is identical to the dense one. Memory grows with the number of
+    set coefficients instead of the square of the number of nodes.
+    """
+
+    def __init__(self, n, dtype=np.float64):
+        self.shape = (n, n)
+        self.dtype = np.dtype(dtype)
+        self._rows = []
+        self._cols = []
+        self._values = []
+        self._chunks = []  # already flushed (rows, cols, values) arrays
+
+    def __setitem__(self, index, value):
+        row, col = index
+        if np.ndim(row) == 0 and np.ndim(col) == 0 and np.ndim(value) == 0:
+            self._rows.append(row)
+            self._cols.append(col)
+            self._values.append(value)
+        else:
+            row, col, value = np.broadcast_arrays(row, col, value)
+            self._flush()
+            self._chunks.append((row.ravel(), col.ravel(), np.array(value, dtype=self.dtype).ravel()))
+
+    def _flush(self):
+        """Moves single coefficients gathered in lists into array chunk, order of setting is preserved"""
+        if self._rows:
+            self._chunks.append((np.array(self._rows, dtype=np.int64), np.array(self._cols, dtype=np.int64),
+                                 np.array(self._values, dtype=self.dtype)))
+            self._rows = []
+            self._cols = []
+            self._values = []
+
+    def triplets(self):
+        """Returns rows, columns and values of matrix, each entry only once with the last value set"""
+        self._flush()
+        if not self._chunks:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0, dtype=self.dtype)
+        rows = np.concatenate([chunk[0] for chunk in self._chunks]).astype(np.int64)
+        cols = np.concatenate([chunk[1] for chunk in self._chunks]).astype(np.int64)
+        values = np.concatenate([chunk[2] for chunk in self._chunks])
+        self._chunks = [(rows, cols, values)]
+        # negative indices work in dense matrix as well, so they are wrapped the same way
+        rows = rows % self.shape[0]
+        cols = cols % self.shape[1]
+        # np.unique returns first occurrence, so reversed arrays give the last value set for every entry
+        keys = (rows * self.shape[1] + cols)[::-1]
+        keys, first = np.unique(keys, return_index=True)
+        last = len(values) - 1 - first
+        return rows[last], cols[last], values[last]
+
+    def tocsr(self):
+        """Converts gathered coefficients into compressed sparse row matrix"""
+        rows, cols, values = self.triplets()
+        return sparse.csr_matrix((values, (rows, cols)), shape=self.shape)
+
+    def toarray(self):
+        """Converts gathered coefficients into dense numpy matrix"""
+        return self.tocsr().toarray()
+
+
+class StencilMatrix(object):
+    """Matrix-free operator of FDM scheme equations on i x j mesh
+
+    Only equations of nodes lying near edges are stored (as SparseMatrix), equations of all interior nodes are kept
+    as 13 coefficients of stencil and applied to vector of values by shifting it on 2D grid. Memory is proportional
+    to number of nodes of the mesh and to the perimeter of it instead of number of coefficients.
+    """
+
+    def __init__(self, n, grid, dtype=np.float64):
+        self.shape = (n, n)
+        self.dtype = np.dtype(dtype)
+        self.grid = tuple(grid)  # number of nodes on x and y dimension, node = vm * i + m
+        self.coefficients = np.zeros(13, dtype=self.dtype)
+        self._edges = SparseMatrix(n, dtype)  # equations set one by one
+        self._boundary = None          # compressed equations set one by one without entries overwritten by stencil
+
+    def __setitem__(self, index, value):
+        self._edges[index] = value
+        self._boundary = None
+
+    def set_stencil(self, coefficients):
+        """Sets 13 coefficients of stencil of all interior nodes"""
+        self.coefficients = np.asarray(coefficients, dtype=self.dtype)
+        self._boundary = None
+
+    @property
+    def boundary(self):
+        """Compressed sparse row matrix of equations set one by one, interior nodes have only entries outside the
+        stencil, because stencil is set last and overwrites all others like in dense matrix"""
+        if self._boundary is None:
+            (i, j) = self.grid
+            rows, cols, values = self._edges.triplets()
+            overwritten = np.zeros(rows.shape, dtype=bool)
+            m = rows % i
+            vm = rows // i
+            interior = (m >= 2) & (m < i - 2) & (vm >= 2) & (vm < j - 2)
+            overwritten[interior] = np.isin(cols[interior] - rows[interior], stencil_offsets(i))
+            keep = ~overwritten
+            self._boundary = sparse.csr_matrix((values[keep], (rows[keep], cols[keep])), shape=self.shape)
+        return self._boundary
+
+    def _apply_stencil(self, X):
+        """Applies stencil of interior nodes to values X given on grid of shape (j, i, ...)"""
+        (i, j) = self.grid
+        Y = np.zeros(X.shape, dtype=np.result_type(X, self.dtype))
+        for (dvm, dm), c in zip(STENCIL_SHIFTS, self.coefficients):
+            if c != 0:
+                Y[2:j - 2, 2:i - 2] += c * X[2 + dvm:j - 2 + dvm, 2 + dm:i - 2 + dm]
+        return Y
+
+    def __matmul__(self, x):
+        """Product of operator and vector, matrix of columns or sparse matrix"""
+        (i, j) = self.grid
+        if sparse.issparse(x):
+            nodes = interior_nodes(i, j)
+            x = sparse.csr_matrix(x)
+            rows = sparse.csr_matrix((len(nodes), x.shape[1]))
+            for offset, c in zip(stencil_offsets(i), self.coefficients):
+                if c != 0:
+                    rows = rows + c * x[nodes + offset]
+            embed = sparse.csr_matrix((np.ones(len(nodes)), (nodes, np.arange(len(nodes)))),
+                                      shape=(self.shape[0], len(nodes)))
+            return (self.boundary @ x + embed @ rows).tocsr()
+        x = np.asarray(x)
+        x = x.astype(np.result_type(x, self.dtype), copy=False)  # double precision vector is not rounded
+        Y = self._apply_stencil(x.reshape((j, i) + x.shape[1:]))
+        return self.boundary @ x + Y.reshape(x.shape)
+
+    def diagonal(self):
+        (i, j) = self.grid
+        d = self.boundary.diagonal()
+        d[interior_nodes(i, j)] += self.coefficients[6]
+        return d
+
+    def aslinearoperator(self):
+        return LinearOperator(self.shape, matvec=self.__matmul__, matmat=self.__matmul__)
+
+    def tocsr(self):
+        """Assembles the whole matrix, coefficients of stencil are set last like in dense matrix"""
+        (i, j) = self.grid
+        A = SparseMatrix(self.shape[0], self.dtype)
+        boundary = self.boundary.tocoo()
+        A[boundary.row, boundary.col] = boundary.data
+        set_interior_stencil(A, i, j, self.coefficients)
+        return A.tocsr()
+
+    def toarray(self):
+        return self.tocsr().toarray()
+
+
+def allocate_matrix(n, assembly="dense", grid=None, dtype=np.float64):
+    """Creates empty n x n matrix of FDM scheme equations - dense numpy array, sparse triplets matrix or matrix-free
+    stencil operator, which needs number of nodes on x and y dimension given as grid. Coefficients are of type dtype,
+    np.float32 halves memory of the matrix."""
+    if assembly == "dense":
+        return np.zeros((n, n), dtype=dtype)
+    elif assembly == "sparse":
+        return SparseMatrix(n, dtype)
+    elif assembly == "stencil":
+        return StencilMatrix(n, grid, dtype)
+    else:
+        raise ValueError("Unknown assembly mode {}, choose dense, sparse or stencil".format(assembly))
+
+
+def interior_nodes(i, j):
+    """Returns numbers of nodes lying at least 2 nodes away from every edge of i x j mesh, in the same order as
+    for vm in range(2, j - 2): for m in range(2, i - 2): node = vm * i + m"""
+    m, vm = np.meshgrid(np.arange(2, i - 2), np.arange(2, j - 2))
+    return (vm * i + m).ravel()
+
+
+def stencil_offsets(i):
+    """Returns differences between number of node and numbers of 13 nodes of biharmonic stencil, from top to bottom:
+
+               n1
+           n2  n3  n4
+       n5  n6  n7  n8  n9
+           n10 n11 n12
+               n13
+    """
+    return np.array([-2 * i, -i - 1, -i, -i + 1, -2, -1, 0, 1, 2, i - 1, i, i + 1, 2 * i])
+
+
+# the same 13 nodes of stencil as shifts (on y, on x) on grid of shape (j, i)
+STENCIL_SHIFTS = [(-2, 0), (-1, -1), (-1, 0), (-1, 1), (0, -2), (0, -1), (0, 0), (0, 1), (0, 2),
+                  (1, -1), (1, 0), (1, 1), (2, 0)]
+
+
+def set_interior_stencil(A, i, j, coefficients):
+    """Sets 13 coefficients of stencil in rows of all interior nodes at once, returns numbers of these nodes"""
+    nodes = interior_nodes(i, j)
+    if isinstance(A, StencilMatrix):
+        A.set_stencil(coefficients)
+        return nodes
+    A[nodes[:, None], nodes[:, None] + stencil_offsets(i)] = np.asarray(coefficients, dtype=np.float64)
+    return nodes
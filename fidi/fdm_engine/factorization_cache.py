@@ -0,0 +1,94 @@
+"""This part of program is responsible for keeping factorized operators of FDM equations, so repeated calculations
+of the same element with other loads need only to solve already factorized system"""
+
+import threading
+from collections import OrderedDict
+
+from fidi.fdm_engine import solvers
+
+
+def operator_key(object_type, shape, density, supports, v, solver, E=None, direction=None):
+    """Returns key describing operator A - it depends only on mesh, supports, material and chosen solver,
+    loads are not a part of it"""
+    return (object_type, tuple(shape), density, tuple(sorted(supports.items())), v, solver, E, direction)
+
+
+class FactorizationCache(object):
+    """Least recently used cache of factorized operators, limited by memory of factorizations and number of them
+
+    Cache may be shared by threads solving parts of one element concurrently, e.g. plate and shield of Shell.
+    """
+
+    def __init__(self, max_memory=512 * 2 ** 20, max_entries=None):
+        self._max_memory = max_memory    # in bytes
+        self._max_entries = max_entries  # None means no limit
+        self._entries = OrderedDict()    # key : [solve function, memory]
+        self.memory = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+
+    @property
+    def max_memory(self):
+        return self._max_memory
+
+    @property
+    def max_entries(self):
+        return self._max_entries
+
+    def resize(self, max_memory=None, max_entries=None):
+        """Changes limits of cache and evicts operators exceeding them"""
+        if max_memory is not None:
+            self._max_memory = max_memory
+        self._max_entries = max_entries
+        with self._lock:
+            self._evict()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Returns solve function of factorized operator or None, if there is no such operator in cache"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, solve):
+        """Stores solve function of factorized operator, operators used least recently are evicted"""
+        memory = getattr(solve, "memory", 0)
+        if memory > self._max_memory:
+            return  # it would evict everything else and would not fit anyway
+        with self._lock:
+            if key in self._entries:
+                self.memory -= self._entries.pop(key)[1]
+            self._entries[key] = [solve, memory]
+            self.memory += memory
+            self._evict()
+
+    def factorize(self, key, A, solver, options=None):
+        """Returns solve function for operator A, factorizing it only if it is not in cache yet"""
+        solve = self.get(key)
+        if solve is None:
+            solve = solvers.factorize(A, solver, options)
+            self.put(key, solve)
+        return solve
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.memory = 0
+
+    def _evict(self):
+        while self._entries and (self.memory > self._max_memory or
+                                 (self._max_entries is not None and len(self._entries) > self._max_entries)):
+            self.memory -= self._entries.popitem(last=False)[1][1]
+
+
+default_cache = FactorizationCache()  # cache shared by all Prism objects
@@ -3,13 +3,42 @@
 
 import numpy as np
 import datetime
-import matplotlib.pyplot as plt
-import matplotlib.cm as cm
-import matplotlib.colors
+from functools import partial
+from fidi.fdm_engine.assembly import allocate_matrix, set_interior_stencil, precision_dtype
+from fidi.fdm_engine.factorization_cache import operator_key
+from fidi.fdm_engine import solvers
+from fidi.fdm_engine.spectral import hinged_on_all_edges, solve_hinged_plate
+from fidi.fdm_engine.progress import report, StageTimer
+from fidi.fdm_engine.results import Results, FIELDS
 
 
-def compute_plate(displacements, Dp, q, supports, density, v, h):
-    """Apply boundary conditions for plate objects and compute values of displacement in every node of mesh"""
+def load_plate(displacements, Dp, q, supports, density):
+    """Right-hand side p of equations Aw = p of plate, see assemble_plate
+
+    Supported nodes have zero load, nodes of free edges carry half of load of mid node and free corners a quarter of
+    it. p does not depend on Poisson ratio, so it is built without A if A is already factorized.
+    """
+    q = np.asarray(q, dtype=np.float64)  # for many load cases every coefficient of p becomes row of values
+    (i, j) = displacements[2].shape  # i/j - number of nodes on x/y dimension
+    share = np.ones((j, i))  # share of load of mid node in every node, in order of w vector
+    for [edge, nodes] in [["top", share[0, :]], ["bottom", share[-1, :]],
+                          ["left", share[:, 0]], ["right", share[:, -1]]]:
+        nodes[:] = 0 if supports[edge] in [1, 2] else 0.5
+    for [row, col, edges] in [[0, 0, ["top", "left"]], [0, -1, ["top", "right"]],
+                              [-1, 0, ["bottom", "left"]], [-1, -1, ["bottom", "right"]]]:
+        share[row, col] = 0 if any(supports[edge] in [1, 2] for edge in edges) else 0.25
+    return share.reshape((-1, 1)) * ((q * density ** 4) / Dp).reshape((1, -1))
+
+
+def assemble_plate(displacements, Dp, q, supports, density, v, assembly="dense", progress=None, dtype=np.float64):
+    """Apply boundary conditions for plate objects and assemble equations Aw = p
+
+    q - load, or sequence of loads - then p has one column for every load case
+    assembly - "dense" stores A as full n x n matrix, "sparse" stores only non-zero coefficients of A, "stencil"
+               stores only equations of edge nodes and applies stencil of interior nodes without any matrix
+    progress - function called with name of every stage of assembly, see fidi.fdm_engine.progress
+    dtype - type of coefficients of A, np.float32 halves memory of the matrix
+    """
 
     """ 1. Data """
     wf = displacements[2]  # displacements on z dimension
@@ -41,16 +70,16 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
     #    A - assembled matrix of FDM scheme equations, w - vector of displacements, p - vector of load
     #    Initial setting of matrices :
 
-    A = np.zeros((n, n))
-    p = np.ones((n, 1))
+    report(progress, "allocation")
+    A = allocate_matrix(n, assembly, (i, j), dtype)
+    p = load_plate(displacements, Dp, q, supports, density)
+    report(progress, "boundary rows")
 
     """ 3. Setting equations for corner points (A) """
 
     if supports["top"] in [1, 2] or supports["left"] in [1, 2]:   # top-left
-        p[0, 0] = 0
         A[0, 0] = 1  # after A*w=P it gives result 1*w1 = 0
     else:
-        p[0, 0] = (q * density ** 4) / (4 * Dp)
         A[0, 0] = (3 + v) * (1 - v)
         A[0, 1] = -(3 + v) * (1 - v)
         A[0, 2] = (1 - v ** 2) / 2
@@ -59,10 +88,8 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
         A[0, 2 * i] = (1 - v ** 2) / 2
 
     if supports["top"] in [1, 2] or supports["right"] in [1, 2]:   # top-right
-        p[i - 1, 0] = 0
         A[i - 1, i - 1] = 1
     else:
-        p[i - 1, 0] = (q * density ** 4) / (4 * Dp)
         A[i - 1, i - 1] = (3 + v) * (1 - v)
         A[i - 1, i - 2] = -(3 + v) * (1 - v)
         A[i - 1, i - 3] = (1 - v ** 2) / 2
@@ -71,10 +98,8 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
         A[i - 1, 2 * i + i - 1] = (1 - v ** 2) / 2
 
     if supports["bottom"] in [1, 2] or supports["left"] in [1, 2]:   # bottom-left
-        p[(j - 1) * i, 0] = 0
         A[(j - 1) * i, (j - 1) * i] = 1
     else:
-        p[(j - 1) * i, 0] = (q * density ** 4) / (4 * Dp)
         A[(j - 1) * i, (j - 1) * i] = (3 + v) * (1 - v)
         A[(j - 1) * i, (j - 1) * i + 1] = -(3 + v) * (1 - v)
         A[(j - 1) * i, (j - 1) * i + 2] = (1 - v ** 2) / 2
@@ -83,10 +108,8 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
         A[(j - 1) * i, (j - 3) * i] = (1 - v ** 2) / 2
 
     if supports["bottom"] in [1, 2] or supports["right"] in [1, 2]:   # bottom-right
-        p[(j - 1) * i + i - 1, 0] = 0
         A[(j - 1) * i + i - 1, (j - 1) * i + i - 1] = 1
     else:
-        p[(j - 1) * i + i - 1, 0] = (q * density ** 4) / (4 * Dp)
         A[(j - 1) * i + i - 1, (j - 1) * i + i - 1] = (3 + v) * (1 - v)
         A[(j - 1) * i + i - 1, (j - 1) * i + i - 2] = -(3 + v) * (1 - v)
         A[(j - 1) * i + i - 1, (j - 1) * i + i - 3] = (1 - v ** 2) / 2
@@ -97,12 +120,10 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
     """ 4. Setting equations for corner-edge points (B) """
 
     def corner_edge_nodes(main_edge, secondary_edge, node, n1, n2, n3, n4, n5, n6, n7, n8,
-                          _A=A, _p=p, _i=i, _j=j, _v=v, _density=density, _Dp=Dp, _q=q):
+                          _A=A, _i=i, _j=j, _v=v):
         if main_edge in [1, 2]:
-            _p[node, 0] = 0
             _A[node, node] = 1
         elif secondary_edge == 0:
-            _p[node, 0] = (_q * _density ** 4) / (2 * _Dp)
             _A[node, n1] = -(3 + _v) * (1 - _v)
             _A[node, n2] = (15 - 8 * _v - 5 * _v ** 2) / 2
             _A[node, n3] = -2 * (2 + _v) * (1 - _v)
@@ -112,7 +133,6 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
             _A[node, n7] = 2 - _v
             _A[node, n8] = 1
         elif secondary_edge == 1:
-            _p[node, 0] = (_q * _density ** 4) / (2 * _Dp)
             _A[node, n2] = (15 - 8 * _v - 5 * _v ** 2) / 2
             _A[node, n3] = -2 * (2 + _v) * (1 - _v)
             _A[node, n4] = (1 - _v ** 2) / 2
@@ -120,48 +140,45 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
             _A[node, n7] = 2 - _v
             _A[node, n8] = 1
         else:
-            _p[node, 0] = (_q * _density ** 4) / (2 * _Dp)
             _A[node, n2] = (17 - 8 * _v - 7 * _v ** 2) / 2
             _A[node, n3] = -2 * (2 + _v) * (1 - _v)
             _A[node, n4] = (1 - _v ** 2) / 2
             _A[node, n6] = -2 * (3 - _v)
             _A[node, n7] = 2 - _v
             _A[node, n8] = 1
-        return [_A, _p]
-
-    [A, p] = corner_edge_nodes(supports["top"], supports["left"],   # top-left-top
-                               1, 0, 1, 2, 3, i, i + 1, i + 2, 2 * i + 1)
-    [A, p] = corner_edge_nodes(supports["left"], supports["top"],  # top-left-left
-                               i, 0, i, 2 * i, 3 * i, 1, i + 1, 2 * i + 1, i + 2)
-    [A, p] = corner_edge_nodes(supports["top"], supports["right"],  # top-right-top
-                               i - 2, i - 1, i - 2, i - 3, i - 4, i + i - 1, i + i - 2, i + i - 3, 2 * i + i - 2)
-    [A, p] = corner_edge_nodes(supports["right"], supports["top"],  # top-right-right
-                               i + i - 1, i - 1, i + i - 1, 2 * i + i - 1, 3 * i + i - 1, i - 2, i + i - 2,
-                               2 * i + i - 2, i + i - 3)
-    [A, p] = corner_edge_nodes(supports["bottom"], supports["left"],  # bottom-left-bottom
-                               (j - 1) * i + 1, (j - 1) * i, (j - 1) * i + 1, (j - 1) * i + 2, (j - 1) * i + 3,
-                               (j - 2) * i, (j - 2) * i + 1, (j - 2) * i + 2, (j - 3) * i + 1)
-    [A, p] = corner_edge_nodes(supports["left"], supports["bottom"],  # bottom-left-left
-                               (j - 2) * i, (j - 1) * i, (j - 2) * i, (j - 3) * i, (j - 4) * i,
-                               (j - 1) * i + 1, (j - 2) * i + 1, (j - 3) * i + 1, (j - 2) * i + 2)
-    [A, p] = corner_edge_nodes(supports["bottom"], supports["right"],  # bottom-right-bottom
-                               (j - 1) * i + i - 2, (j - 1) * i + i - 1, (j - 1) * i + i - 2, (j - 1) * i + i - 3,
-                               (j - 1) * i + i - 4, (j - 2) * i + i - 1, (j - 2) * i + i - 2, (j - 2) * i + i - 3,
-                               (j - 3) * i + i - 2)
-    [A, p] = corner_edge_nodes(supports["right"], supports["bottom"],  # bottom-right-right
-                               (j - 2) * i + i - 1, (j - 1) * i + i - 1, (j - 2) * i + i - 1, (j - 3) * i + i - 1,
-                               (j - 4) * i + i - 1, (j - 1) * i + i - 2, (j - 2) * i + i - 2, (j - 3) * i + i - 2,
-                               (j - 2) * i + i - 3)
+        return _A
+
+    A = corner_edge_nodes(supports["top"], supports["left"],   # top-left-top
+                          1, 0, 1, 2, 3, i, i + 1, i + 2, 2 * i + 1)
+    A = corner_edge_nodes(supports["left"], supports["top"],  # top-left-left
+                          i, 0, i, 2 * i, 3 * i, 1, i + 1, 2 * i + 1, i + 2)
+    A = corner_edge_nodes(supports["top"], supports["right"],  # top-right-top
+                          i - 2, i - 1, i - 2, i - 3, i - 4, i + i - 1, i + i - 2, i + i - 3, 2 * i + i - 2)
+    A = corner_edge_nodes(supports["right"], supports["top"],  # top-right-right
+                          i + i - 1, i - 1, i + i - 1, 2 * i + i - 1, 3 * i + i - 1, i - 2, i + i - 2,
+                          2 * i + i - 2, i + i - 3)
+    A = corner_edge_nodes(supports["bottom"], supports["left"],  # bottom-left-bottom
+                          (j - 1) * i + 1, (j - 1) * i, (j - 1) * i + 1, (j - 1) * i + 2, (j - 1) * i + 3,
+                          (j - 2) * i, (j - 2) * i + 1, (j - 2) * i + 2, (j - 3) * i + 1)
+    A = corner_edge_nodes(supports["left"], supports["bottom"],  # bottom-left-left
+                          (j - 2) * i, (j - 1) * i, (j - 2) * i, (j - 3) * i, (j - 4) * i,
+                          (j - 1) * i + 1, (j - 2) * i + 1, (j - 3) * i + 1, (j - 2) * i + 2)
+    A = corner_edge_nodes(supports["bottom"], supports["right"],  # bottom-right-bottom
+                          (j - 1) * i + i - 2, (j - 1) * i + i - 1, (j - 1) * i + i - 2, (j - 1) * i + i - 3,
+                          (j - 1) * i + i - 4, (j - 2) * i + i - 1, (j - 2) * i + i - 2, (j - 2) * i + i - 3,
+                          (j - 3) * i + i - 2)
+    A = corner_edge_nodes(supports["right"], supports["bottom"],  # bottom-right-right
+                          (j - 2) * i + i - 1, (j - 1) * i + i - 1, (j - 2) * i + i - 1, (j - 3) * i + i - 1,
+                          (j - 4) * i + i - 1, (j - 1) * i + i - 2, (j - 2) * i + i - 2, (j - 3) * i + i - 2,
+                          (j - 2) * i + i - 3)
 
     """ 5. Setting equations for edge points (C) """
 
     def edge_nodes(edge, node, n1, n2, n3, n4, n5, n6, n7, n8, n9,
-                          _A=A, _p=p, _i=i, _j=j, _v=v, _density=density, _Dp=Dp, _q=q):
+                          _A=A, _i=i, _j=j, _v=v):
         if edge in [1, 2]:
-            _p[node, 0] = 0
             _A[node, node] = 1
         else:
-            _p[node, 0] = (_q * _density ** 4) / (2 * _Dp)
             _A[node, n1] = (1 - _v ** 2) / 2
             _A[node, n2] = -2 * (2 + _v) * (1 - _v)
             _A[node, n3] = 8 - 4 * _v - 3 * _v ** 2
@@ -171,28 +188,27 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
             _A[node, n7] = -2 * (3 - _v)
             _A[node, n8] = 2 - _v
             _A[node, n9] = 1
-        return [_A, _p]
+        return _A
 
     for m in range(2, i - 2, 1):    # top
-        [A, p] = edge_nodes(supports["top"],
-                            m, m - 2, m - 1, m, m + 1, m + 2, i + m - 1, i + m, i + m + 1, 2 * i + m)
+        A = edge_nodes(supports["top"],
+                       m, m - 2, m - 1, m, m + 1, m + 2, i + m - 1, i + m, i + m + 1, 2 * i + m)
     for m in range(2 * i, (j - 2) * i, i):  # left
-        [A, p] = edge_nodes(supports["left"],
-                            m, -2 * i + m, -1 * i + m, m, i + m, 2 * i + m, -1 * i + m + 1, m + 1, i + m + 1, m + 2)
+        A = edge_nodes(supports["left"],
+                       m, -2 * i + m, -1 * i + m, m, i + m, 2 * i + m, -1 * i + m + 1, m + 1, i + m + 1, m + 2)
     for m in range((j - 1) * i + 2, (j - 1) * i + i - 2, 1):  # bottom
-        [A, p] = edge_nodes(supports["bottom"],
-                            m, m - 2, m - 1, m, m + 1, m + 2, -1 * i + m - 1, -1 * i + m, -1 * i + m + 1, -2 * i + m)
+        A = edge_nodes(supports["bottom"],
+                       m, m - 2, m - 1, m, m + 1, m + 2, -1 * i + m - 1, -1 * i + m, -1 * i + m + 1, -2 * i + m)
     for m in range(2 * i + i - 1, (j - 2) * i + i - 1, i):  # right
-        [A, p] = edge_nodes(supports["right"],
-                            m, -2 * i + m, -1 * i + m, m, i + m, 2 * i + m, -1 * i + m - 1, m - 1, i + m - 1, m - 2)
+        A = edge_nodes(supports["right"],
+                       m, -2 * i + m, -1 * i + m, m, i + m, 2 * i + m, -1 * i + m - 1, m - 1, i + m - 1, m - 2)
 
     """ 5. Setting equations for corner-mid points (D) """
 
     def corner_mid_nodes(horizontal_edge, vertical_edge, node, n1, n2, n3, n4, n5, n6, n7, n8, n9, n10, n11,
-                          _A=A, _p=p, _i=i, _j=j, _v=v, _density=density, _Dp=Dp, _q=q):
+                          _A=A, _i=i, _j=j, _v=v):
         if vertical_edge == 0:
             if horizontal_edge == 0:
-                _p[node, 0] = (_q * _density ** 4) / _Dp
                 _A[node, n1] = 2 * (1 - _v)
                 _A[node, n2] = -2 * (3 - _v)
                 _A[node, n3] = 2 - _v
@@ -205,7 +221,6 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
                 _A[node, n10] = 2
                 _A[node, n11] = 1
             elif horizontal_edge == 1:
-                _p[node, 0] = (_q * _density ** 4) / _Dp
                 _A[node, n2] = -2 * (3 - _v)
                 _A[node, n3] = 2 - _v
                 _A[node, n5] = 18
@@ -215,7 +230,6 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
                 _A[node, n10] = 2
                 _A[node, n11] = 1
             else:
-                _p[node, 0] = (_q * _density ** 4) / _Dp
                 _A[node, n2] = -2 * (3 - _v)
                 _A[node, n3] = 2 - _v
                 _A[node, n5] = 20
@@ -227,7 +241,6 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
 
         elif vertical_edge == 1:
             if horizontal_edge == 0:
-                _p[node, 0] = (_q * _density ** 4) / _Dp
                 _A[node, n4] = -2 * (3 - _v)
                 _A[node, n5] = 18
                 _A[node, n6] = -8
@@ -237,7 +250,6 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
                 _A[node, n10] = 2
                 _A[node, n11] = 1
             elif horizontal_edge == 1:
-                _p[node, 0] = (_q * _density ** 4) / _Dp
                 _A[node, n5] = 18
                 _A[node, n6] = -8
                 _A[node, n7] = 1
@@ -245,7 +257,6 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
                 _A[node, n10] = 2
                 _A[node, n11] = 1
             else:
-                _p[node, 0] = (_q * _density ** 4) / _Dp
                 _A[node, n5] = 20
                 _A[node, n6] = -8
                 _A[node, n7] = 1
@@ -255,7 +266,6 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
 
         else:
             if horizontal_edge == 0:
-                _p[node, 0] = (_q * _density ** 4) / _Dp
                 _A[node, n4] = -2 * (3 - _v)
                 _A[node, n5] = 20
                 _A[node, n6] = -8
@@ -265,7 +275,6 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
                 _A[node, n10] = 2
                 _A[node, n11] = 1
             elif horizontal_edge == 1:
-                _p[node, 0] = (_q * _density ** 4) / _Dp
                 _A[node, n5] = 20
                 _A[node, n6] = -8
                 _A[node, n7] = 1
@@ -273,35 +282,33 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
                 _A[node, n10] = 2
                 _A[node, n11] = 1
             else:
-                _p[node, 0] = (_q * _density ** 4) / _Dp
                 _A[node, n5] = 22
                 _A[node, n6] = -8
                 _A[node, n7] = 1
                 _A[node, n9] = -8
                 _A[node, n10] = 2
                 _A[node, n11] = 1
-        return [_A, _p]
-
-    [A, p] = corner_mid_nodes(supports["top"], supports["left"],  # top-left-mid
-                              i + 1, 0, 1, 2, i, i + 1, i + 2, i + 3, 2 * i, 2 * i + 1, 2 * i + 2, 3 * i + 1)
-    [A, p] = corner_mid_nodes(supports["top"], supports["right"],  # top-right-mid
-                              i + i - 2, i - 1, i - 2, i - 3, i + i - 1, i + i - 2, i + i - 3,
-                              i + i - 4, 2 * i + i - 1, 2 * i + i - 2, 2 * i + i - 3, 3 * i + i - 2)
-    [A, p] = corner_mid_nodes(supports["bottom"], supports["left"],  # bottom-left-mid
-                              (j - 2) * i + 1, (j - 1) * i, (j - 1) * i + 1, (j - 1) * i + 2, (j - 2) * i,
-                              (j - 2) * i + 1, (j - 2) * i + 2, (j - 2) * i + 3, (j - 3) * i, (j - 3) * i + 1,
-                              (j - 3) * i + 2, (j - 4) * i + 1)
-    [A, p] = corner_mid_nodes(supports["bottom"], supports["right"],  # bottom-right-mid
-                              (j - 2) * i + i - 2, (j - 1) * i + i - 1, (j - 1) * i + i - 2, (j - 1) * i + i - 3,
-                              (j - 2) * i + i - 1, (j - 2) * i + i - 2, (j - 2) * i + i - 3, (j - 2) * i + i - 4,
-                              (j - 3) * i + i - 1, (j - 3) * i + i - 2, (j - 3) * i + i - 3, (j - 4) * i + i - 2)
+        return _A
+
+    A = corner_mid_nodes(supports["top"], supports["left"],  # top-left-mid
+                         i + 1, 0, 1, 2, i, i + 1, i + 2, i + 3, 2 * i, 2 * i + 1, 2 * i + 2, 3 * i + 1)
+    A = corner_mid_nodes(supports["top"], supports["right"],  # top-right-mid
+                         i + i - 2, i - 1, i - 2, i - 3, i + i - 1, i + i - 2, i + i - 3,
+                         i + i - 4, 2 * i + i - 1, 2 * i + i - 2, 2 * i + i - 3, 3 * i + i - 2)
+    A = corner_mid_nodes(supports["bottom"], supports["left"],  # bottom-left-mid
+                         (j - 2) * i + 1, (j - 1) * i, (j - 1) * i + 1, (j - 1) * i + 2, (j - 2) * i,
+                         (j - 2) * i + 1, (j - 2) * i + 2, (j - 2) * i + 3, (j - 3) * i, (j - 3) * i + 1,
+                         (j - 3) * i + 2, (j - 4) * i + 1)
+    A = corner_mid_nodes(supports["bottom"], supports["right"],  # bottom-right-mid
+                         (j - 2) * i + i - 2, (j - 1) * i + i - 1, (j - 1) * i + i - 2, (j - 1) * i + i - 3,
+                         (j - 2) * i + i - 1, (j - 2) * i + i - 2, (j - 2) * i + i - 3, (j - 2) * i + i - 4,
+                         (j - 3) * i + i - 1, (j - 3) * i + i - 2, (j - 3) * i + i - 3, (j - 4) * i + i - 2)
 
     """ 6. Setting equations for edge-mid points (E) """
 
     def edge_mid_nodes(edge, node, n1, n2, n3, n4, n5, n6, n7, n8, n9, n10, n11, n12,
-                          _A=A, _p=p, _i=i, _j=j, _v=v, _density=density, _Dp=Dp, _q=q):
+                          _A=A, _i=i, _j=j, _v=v):
         if edge == 0:
-            _p[node, 0] = (_q * _density ** 4) / _Dp
             _A[node, n1] = 2 - _v
             _A[node, n2] = -2 * (3 - _v)
             _A[node, n3] = 2 - _v
@@ -315,7 +322,6 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
             _A[node, n11] = 2
             _A[node, n12] = 1
         elif edge == 1:
-            _p[node, 0] = (_q * _density ** 4) / _Dp
             _A[node, n4] = 1
             _A[node, n5] = -8
             _A[node, n6] = 19
@@ -326,7 +332,6 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
             _A[node, n11] = 2
             _A[node, n12] = 1
         else:
-            _p[node, 0] = (_q * _density ** 4) / _Dp
             _A[node, n4] = 1
             _A[node, n5] = -8
             _A[node, n6] = 21
@@ -336,68 +341,109 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
             _A[node, n10] = -8
             _A[node, n11] = 2
             _A[node, n12] = 1
-        return [_A, _p]
+        return _A
 
     for m in range(i + 2, i + i - 2, 1):    # top
-        [A, p] = edge_mid_nodes(supports["top"],
-                                m, -1 * i + m - 1, -1 * i + m, -1 * i + m + 1, m - 2, m - 1, m, m + 1, m + 2, i + m - 1,
-                                i + m, i + m + 1, 2 * i + m)
+        A = edge_mid_nodes(supports["top"],
+                           m, -1 * i + m - 1, -1 * i + m, -1 * i + m + 1, m - 2, m - 1, m, m + 1, m + 2, i + m - 1,
+                           i + m, i + m + 1, 2 * i + m)
     for m in range(2 * i + 1, (j - 2) * i + 1, i):  # left
-        [A, p] = edge_mid_nodes(supports["left"],
-                                m, -1 * i + m - 1, m - 1, i + m - 1, -2 * i + m, -1 * i + m, m, i + m, 2 * i + m,
-                                -1 * i + m + 1, m + 1, i + m + 1, m + 2)
+        A = edge_mid_nodes(supports["left"],
+                           m, -1 * i + m - 1, m - 1, i + m - 1, -2 * i + m, -1 * i + m, m, i + m, 2 * i + m,
+                           -1 * i + m + 1, m + 1, i + m + 1, m + 2)
     for m in range((j - 2) * i + 2, (j - 2) * i + i - 2, 1):  # bottom
-        [A, p] = edge_mid_nodes(supports["bottom"],
-                                m, i + m - 1, i + m, i + m + 1, m - 2, m - 1, m, m + 1, m + 2, -1 * i + m - 1,
-                                -1 * i + m, -1 * i + m + 1, -2 * i + m)
+        A = edge_mid_nodes(supports["bottom"],
+                           m, i + m - 1, i + m, i + m + 1, m - 2, m - 1, m, m + 1, m + 2, -1 * i + m - 1,
+                           -1 * i + m, -1 * i + m + 1, -2 * i + m)
     for m in range(2*i + i - 2, (j - 2) * i + i - 2, i):  # right
-        [A, p] = edge_mid_nodes(supports["right"],
-                                m, -1 * i + m + 1, m + 1, i + m + 1, -2 * i + m, -1 * i + m, m, i + m, 2 * i + m,
-                                -1 * i + m - 1, m - 1, i + m - 1, m - 2)
+        A = edge_mid_nodes(supports["right"],
+                           m, -1 * i + m + 1, m + 1, i + m + 1, -2 * i + m, -1 * i + m, m, i + m, 2 * i + m,
+                           -1 * i + m - 1, m - 1, i + m - 1, m - 2)
 
     """ 7. Setting equations for mid points (F) """
 
-    def mid_nodes(node, n1, n2, n3, n4, n5, n6, n7, n8, n9, n10, n11, n12, n13,
-                          _A=A, _p=p, _i=i, _j=j, _v=v, _density=density, _Dp=Dp, _q=q):
-
-        _p[node, 0] = (_q * _density ** 4) / _Dp
-        _A[node, n1] = 1
-        _A[node, n2] = 2
-        _A[node, n3] = -8
-        _A[node, n4] = 2
-        _A[node, n5] = 1
-        _A[node, n6] = -8
-        _A[node, n7] = 20
-        _A[node, n8] = -8
-        _A[node, n9] = 1
-        _A[node, n10] = 2
-        _A[node, n11] = -8
-        _A[node, n12] = 2
-        _A[node, n13] = 1
-        return [_A, _p]
-
-    for vm in range(2, j - 2, 1):
-        for m in range(2, i - 2, 1):
-            [A, p] = mid_nodes(vm * i + m, (vm - 2) * i + m, (vm - 1) * i + m - 1, (vm - 1) * i + m,
-                               (vm - 1) * i + m + 1, vm * i + m - 2, vm * i + m - 1, vm * i + m, vm * i + m + 1,
-                               vm * i + m + 2, (vm + 1) * i + m - 1, (vm + 1) * i + m, (vm + 1) * i + m + 1,
-                               (vm + 2) * i + m)
-
-    """ 8. Calculation of Aw = p equation """
-
-    wf = np.linalg.solve(A, p)
-    W = np.zeros((i, j))
-    s = 0
-    for vm in range(j):
-        for m in range(i):
-            W[m, vm] = round(wf[s, 0], 14)
-            s += 1
+    report(progress, "interior rows")
+    # all mid points have the same equation, so they are set at once
+    set_interior_stencil(A, i, j, [1, 2, -8, 2, 1, -8, 20, -8, 1, 2, -8, 2, 1])
+
+    return [A, p]
+
+
+def bending_stress(moment, h):
+    """Normal or shear stress at surface of plate of thickness h caused by bending or twisting moment"""
+    return (12 * moment * 0.5 * h) / (h ** 3)
+
+
+def compute_plate(displacements, Dp, q, supports, density, v, h, assembly="dense", solver=None, cache=None,
+                  solver_options=None, info=None, progress=None, profiler=None):
+    """Apply boundary conditions for plate objects and compute values of displacement in every node of mesh
+
+    q - load, or sequence of loads - then all load cases are solved at once and every returned matrix has additional
+        first dimension with results of following load cases
+    assembly - "dense" stores A as full n x n matrix, "sparse" stores only non-zero coefficients of A, "stencil"
+               stores only equations of edge nodes and applies stencil of interior nodes without any matrix
+    solver - name of solver from fidi.fdm_engine.solvers, by default dense for dense, sparse for sparse and
+             multigrid for stencil assembly
+    cache - FactorizationCache, if operator A of this plate is already factorized only p is assembled and solved
+    solver_options - dictionary of options of iterative solvers (tol, maxiter, preconditioner), precision (double,
+                     single or mixed, see fidi.fdm_engine.solvers) and spectral - plate hinged on all edges is solved
+                     with sine transforms without any matrix (nothing is factorized, so cache is not used) if solver
+                     is default one (None or dense). spectral False turns it off, True forces it for any solver.
+                     Sine transforms are computed in double precision and results are returned in chosen precision
+    info - dictionary filled with details of solution, e.g. convergence history of iterative solvers, and with
+           times of stages of calculations (timings)
+    progress - function called with name of every stage of calculations, see fidi.fdm_engine.progress
+    profiler - function called with name and time of every stage of calculations, if it is given number of non-zero
+               coefficients and estimate of condition number of A are put in info too
+
+    Returns Results (fidi.fdm_engine.results) with w and moments stored, stresses derived from moments and zero
+    u, v and membrane forces.
+    """
 
-    """ 9. Calculation of sigma x, sigma y and tau xy and moments from W matrix """
+    """ 1. Data """
+    q = np.asarray(q, dtype=np.float64)  # for many load cases every coefficient of p becomes row of values
+    wf = displacements[2]  # displacements on z dimension
+    (i, j) = wf.shape  # i/j - number of nodes on x/y dimension
+
+    """ 8. Calculation of Aw = p equation, fully hinged plate is solved with sine transforms without any matrix """
+
+    timer = StageTimer(progress, profiler)
+    spectral = solver in [None, "dense"]  # sine transforms replace only the default solver, unless option says else
+    if solver is None:
+        solver = solvers.default_solver(assembly)
+    options = dict({} if solver_options is None else solver_options, grid=(i, j))  # multigrid needs shape of mesh
+    if options.get("spectral", spectral) and hinged_on_all_edges(supports, (i, j)):
+        timer("solve")
+        wf = solve_hinged_plate((q * density ** 4) / Dp, (i, j), info)
+        wf = wf.astype(precision_dtype(options.get("precision", "double")), copy=False)
+    else:
+        key = operator_key("plate", (i, j), density, supports, v, solvers.solver_key(solver, solver_options))
+        solve = None if cache is None else cache.get(key)
+        if solve is None or profiler is not None:  # profile of operator needs its coefficients, in cheap sparse form
+            [A, p] = assemble_plate(displacements, Dp, q, supports, density, v,
+                                    assembly if solve is None else "sparse", timer,
+                                    precision_dtype(options.get("precision", "double")))
+        else:  # A is already factorized, so only p is built
+            timer("allocation")
+            p = load_plate(displacements, Dp, q, supports, density)
+        timer("factorization")
+        if solve is None:
+            solve = solvers.factorize(A, solver, options)
+            if cache is not None:
+                cache.put(key, solve)
+        timer("solve")
+        wf = solve(p, info)
+        if profiler is not None and info is not None:
+            timer.stop()  # additional solves of estimate are not a part of any stage
+            info.update(solvers.operator_profile(A, solve))
+    timer("reshape")
+    # w vector is flattened wf matrix column by column, so W[m, vm] = w[vm * i + m], load cases are the last dimension
+    W = np.round(wf, 14).reshape((j, i) + q.shape).swapaxes(0, 1)
 
-    blank = np.zeros((i,j))
+    """ 9. Calculation of sigma x, sigma y and tau xy and moments from W matrix """
 
-    mxx = np.zeros((i, j))
+    timer("recovery")
+    mxx = np.zeros(W.shape, dtype=W.dtype)  # results of single precision solve stay single
 
     # corners
 
@@ -409,35 +455,24 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
     mxx[i-1, j-1] = (-Dp / density ** 2) * ((1 + v) * W[i-1, j-1] - 2 * W[i-2, j-1] + 1 * W[i-3, j-1]
                                             - 2 * v * W[i-1, j-2] + v * W[i-1, j-3])
 
-    # edges
+    # edges - slice [1:i-1] contains nodes 1, ..., i-2 and [0:i-2] / [2:i] their neighbours
 
-    for m in range(i-2):  # top
-        m += 1
-        mxx[m, 0] = (-Dp / density ** 2) * (1 * W[m-1, 0] + (-2+v) * W[m, 0] + 1 * W[m+1, 0]
-                                            - 2*v * W[m, 1] + v * W[m, 2])
-    for m in range(i-2):  # bottom
-        m += 1
-        mxx[m, j-1] = (-Dp / density ** 2) * (1 * W[m-1, j-1] + (-2+v) * W[m, j-1] + 1 * W[m+1, j-1]
-                                            - 2*v * W[m, j-2] + v * W[m, j-3])
-    for m in range(j-2):  # left
-        m += 1
-        mxx[0, m] = (-Dp / density ** 2) * (v * W[0, m-1] + (-2*v+1) * W[0, m] + v * W[0, m+1]
-                                            - 2 * W[1, m] + 1 * W[2, m])
-    for m in range(j - 2):  # right
-        m += 1
-        mxx[i-1, m] = (-Dp / density ** 2) * (v * W[i-1, m - 1] + (-2 * v + 1) * W[i-1, m] + v * W[i-1, m + 1]
-                                            - 2 * W[i-2, m] + 1 * W[i-3, m])
+    mxx[1:i-1, 0] = (-Dp / density ** 2) * (1 * W[0:i-2, 0] + (-2+v) * W[1:i-1, 0] + 1 * W[2:i, 0]
+                                            - 2*v * W[1:i-1, 1] + v * W[1:i-1, 2])  # top
+    mxx[1:i-1, j-1] = (-Dp / density ** 2) * (1 * W[0:i-2, j-1] + (-2+v) * W[1:i-1, j-1] + 1 * W[2:i, j-1]
+                                              - 2*v * W[1:i-1, j-2] + v * W[1:i-1, j-3])  # bottom
+    mxx[0, 1:j-1] = (-Dp / density ** 2) * (v * W[0, 0:j-2] + (-2*v+1) * W[0, 1:j-1] + v * W[0, 2:j]
+                                            - 2 * W[1, 1:j-1] + 1 * W[2, 1:j-1])  # left
+    mxx[i-1, 1:j-1] = (-Dp / density ** 2) * (v * W[i-1, 0:j-2] + (-2 * v + 1) * W[i-1, 1:j-1] + v * W[i-1, 2:j]
+                                              - 2 * W[i-2, 1:j-1] + 1 * W[i-3, 1:j-1])  # right
 
     # central points
 
-    for vm in range(j-2):
-        vm += 1
-        for m in range(i-2):
-            m += 1
-            mxx[m, vm] = (-Dp / density ** 2) * (1 * W[m-1, vm] + v * W[m, vm-1]+ (-2-2*v) * W[m, vm] + 1 * W[m+1, vm]
-                                                 + v * W[m, vm+1])
+    mxx[1:i-1, 1:j-1] = (-Dp / density ** 2) * (1 * W[0:i-2, 1:j-1] + v * W[1:i-1, 0:j-2]
+                                                + (-2-2*v) * W[1:i-1, 1:j-1] + 1 * W[2:i, 1:j-1]
+                                                + v * W[1:i-1, 2:j])
 
-    myy = np.zeros((i, j))
+    myy = np.zeros(W.shape, dtype=W.dtype)
 
     # corners
 
@@ -453,34 +488,24 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
 
     # edges
 
-    for m in range(i - 2):  # top
-        m += 1
-        myy[m, 0] = (-Dp / density ** 2) * (v * W[m - 1, 0] + (-2*v + 1) * W[m, 0] + v * W[m + 1, 0]
-                                            - 2 * W[m, 1] + 1 * W[m, 2])
-    for m in range(i - 2):  # bottom
-        m += 1
-        myy[m, j - 1] = (-Dp / density ** 2) * (v * W[m - 1, j - 1] + (-2*v + 1) * W[m, j - 1] + v * W[m + 1, j - 1]
-                                                - 2 * W[m, j - 2] + 1 * W[m, j - 3])
-    for m in range(j - 2):  # left
-        m += 1
-        myy[0, m] = (-Dp / density ** 2) * (1 * W[0, m - 1] + (-2 + v) * W[0, m] + 1 * W[0, m + 1]
-                                            - 2 * v * W[1, m] + v * W[2, m])
-    for m in range(j - 2):  # right
-        m += 1
-        myy[i - 1, m] = (-Dp / density ** 2) * (1 * W[i - 1, m - 1] + (-2 + v) * W[i - 1, m] + 1 * W[i - 1, m + 1]
-                                                - 2 * v * W[i - 2, m] + v * W[i - 3, m])
+    myy[1:i-1, 0] = (-Dp / density ** 2) * (v * W[0:i-2, 0] + (-2*v + 1) * W[1:i-1, 0] + v * W[2:i, 0]
+                                            - 2 * W[1:i-1, 1] + 1 * W[1:i-1, 2])  # top
+    myy[1:i-1, j - 1] = (-Dp / density ** 2) * (v * W[0:i-2, j - 1] + (-2*v + 1) * W[1:i-1, j - 1]
+                                                + v * W[2:i, j - 1] - 2 * W[1:i-1, j - 2]
+                                                + 1 * W[1:i-1, j - 3])  # bottom
+    myy[0, 1:j-1] = (-Dp / density ** 2) * (1 * W[0, 0:j-2] + (-2 + v) * W[0, 1:j-1] + 1 * W[0, 2:j]
+                                            - 2 * v * W[1, 1:j-1] + v * W[2, 1:j-1])  # left
+    myy[i - 1, 1:j-1] = (-Dp / density ** 2) * (1 * W[i - 1, 0:j-2] + (-2 + v) * W[i - 1, 1:j-1]
+                                                + 1 * W[i - 1, 2:j] - 2 * v * W[i - 2, 1:j-1]
+                                                + v * W[i - 3, 1:j-1])  # right
 
     # central points
 
-    for vm in range(j - 2):
-        vm += 1
-        for m in range(i - 2):
-            m += 1
-            myy[m, vm] = (-Dp / density ** 2) * (
-                        v * W[m - 1, vm] + 1 * W[m, vm - 1] + (-2 - 2 * v) * W[m, vm] + v * W[m + 1, vm]
-                        + 1 * W[m, vm + 1])
+    myy[1:i-1, 1:j-1] = (-Dp / density ** 2) * (
+                v * W[0:i-2, 1:j-1] + 1 * W[1:i-1, 0:j-2] + (-2 - 2 * v) * W[1:i-1, 1:j-1] + v * W[2:i, 1:j-1]
+                + 1 * W[1:i-1, 2:j])
 
-    mxy = np.zeros((i, j))
+    mxy = np.zeros(W.shape, dtype=W.dtype)
 
     mxy[0, 0] = ((Dp * (1-v))/(density ** 2)) * (W[0, 0] - W[1, 0] - W[0, 1] + W[1, 1])
     mxy[i - 1, 0] = ((-Dp * (1-v))/(density ** 2)) * (W[i - 1, 0] - W[i - 2, 0] - W[i - 1, 1] + W[i - 2, 1])
@@ -490,40 +515,34 @@ def compute_plate(displacements, Dp, q, supports, density, v, h):
 
     # edges
 
-    for m in range(i - 2):  # top
-        m += 1
-        mxy[m, 0] = ((Dp * (1-v))/(2*density ** 2)) * (W[m-1, 0] - W[m+1, 0] - W[m-1, 1] + W[m+1, 1])
-    for m in range(i - 2):  # bottom
-        m += 1
-        mxy[m, j - 1] = ((-Dp * (1-v))/(2*density ** 2)) * (W[m-1, j - 1] - W[m+1, j - 1] - W[m-1, j - 2]
-                                                            + W[m+1, j - 2])
-    for m in range(j - 2):  # left
-        m += 1
-        mxy[0, m] = ((Dp * (1-v))/(2*density ** 2)) * (W[0, m-1] - W[0, m+1] - W[1, m-1] + W[1, m+1])
-    for m in range(j - 2):  # right
-        m += 1
-        mxy[i - 1, m] = ((-Dp * (1-v))/(2*density ** 2)) * (W[i - 1, m-1] - W[i - 1, m+1] - W[i - 2, m-1]
-                                                            + W[i - 2, m+1])
+    mxy[1:i-1, 0] = ((Dp * (1-v))/(2*density ** 2)) * (W[0:i-2, 0] - W[2:i, 0] - W[0:i-2, 1]
+                                                       + W[2:i, 1])  # top
+    mxy[1:i-1, j - 1] = ((-Dp * (1-v))/(2*density ** 2)) * (W[0:i-2, j - 1] - W[2:i, j - 1] - W[0:i-2, j - 2]
+                                                            + W[2:i, j - 2])  # bottom
+    mxy[0, 1:j-1] = ((Dp * (1-v))/(2*density ** 2)) * (W[0, 0:j-2] - W[0, 2:j] - W[1, 0:j-2]
+                                                       + W[1, 2:j])  # left
+    mxy[i - 1, 1:j-1] = ((-Dp * (1-v))/(2*density ** 2)) * (W[i - 1, 0:j-2] - W[i - 1, 2:j] - W[i - 2, 0:j-2]
+                                                            + W[i - 2, 2:j])  # right
 
     # central points
 
-    for vm in range(j - 2):
-        vm += 1
-        for m in range(i - 2):
-            m += 1
-            mxy[m, vm] = ((-Dp * (1-v))/(4*density ** 2)) * (-W[m - 1, vm-1] + W[m + 1, vm - 1] + W[m - 1, vm + 1]
-                                                             - W[m + 1, vm + 1])
-
-    sigma_x = (12*mxx*0.5*h)/(h**3)
-
-    sigma_y = (12 * myy * 0.5 * h) / (h ** 3)
+    mxy[1:i-1, 1:j-1] = ((-Dp * (1-v))/(4*density ** 2)) * (-W[0:i-2, 0:j-2] + W[2:i, 0:j-2] + W[0:i-2, 2:j]
+                                                            - W[2:i, 2:j])
 
-    tau_xy = (12 * mxy * 0.5 * h) / (h ** 3)
+    # stresses are proportional to moments, so they are computed from them only when they are used
+    stress = partial(bending_stress, h=h)
 
-    return [blank, blank, W.T, sigma_x.T, sigma_y.T, tau_xy.T, mxx.T, myy.T, mxy.T, blank, blank, blank]
+    timer.stop()
+    if info is not None:
+        info["timings"] = timer.timings
+    return Results(FIELDS, W.T.shape, W.dtype, {"w": W.T, "mxx": mxx.T, "myy": myy.T, "mxy": mxy.T},
+                   {"sigma_x": [stress, ["mxx"]], "sigma_y": [stress, ["myy"]], "tau_xy": [stress, ["mxy"]]})
 
 
 if __name__ == '__main__':
+    import matplotlib.pyplot as plt  # plotting is needed only here, engine is imported without it
+    import matplotlib.cm as cm
+    import matplotlib.colors
 
     class TestMeshClass(object):
         def __init__(self):
@@ -3,77 +3,21 @@
 
 import numpy as np
 import datetime
-import matplotlib.pyplot as plt
-import matplotlib.cm as cm
-import matplotlib.colors
+from functools import partial
+from fidi.fdm_engine.assembly import allocate_matrix, set_interior_stencil, precision_dtype
+from fidi.fdm_engine.factorization_cache import operator_key
+from fidi.fdm_engine import solvers
+from fidi.fdm_engine.progress import report, StageTimer
+from fidi.fdm_engine.results import Results, FIELDS, SHIELD_FIELDS
 
 
-def compute_shield_one_direction(displacements, E, loads, supports, density, v, thickness, direction):
-    """Apply boundary conditions for shield objects and compute values of displacement in every node of mesh"""
-
-    """ 1. Data """
-
-    uf = displacements[0]  # displacements on x dimension
-    vf = displacements[1]  # displacements on y dimension
-    (i, j) = uf.shape  # i/j - number of nodes on x/y dimension
-    i += 2     # adding fictitious nodes
-    j += 2     # adding fictitious nodes
-    n = i * j  # amount of nodes
-
-    load_xB = loads["x_direction"]["bottom"]
-    load_xT = loads["x_direction"]["top"]
-    load_xL = loads["x_direction"]["left"]
-    load_xR = loads["x_direction"]["right"]
-    load_yB = loads["y_direction"]["bottom"]
-    load_yT = loads["y_direction"]["top"]
-    load_yL = loads["y_direction"]["left"]
-    load_yR = loads["y_direction"]["right"]
+def shield_coefficients(E, v, direction):
+    """Returns coefficients of F function for given direction of load - alphas of displacements, betas of
+    equilibrium equation and C coefficients of sigma_x, sigma_y and tau_xy"""
 
     G = E/(2*(1+v))
     Ds = E/(1-v**2)
 
-    """ 2. Starting from the idea of Airy function, suppose that in case of isotropic material there is F(x,y)
-           function of which partial derivatives give the projections of displacements as it follows:
-           
-           u = alpha1*Fxx + alpha2*Fxy + alpha3*Fyy 
-           v = alpha4*Fxx + alpha5*Fxy + alpha6*Fyy 
-           
-           where u is projection on x axis, v on y axis and alphas are coefficients to be determined.
-    
-           Assuming load only in X direction we may determine alpha coefficients according to theory
-           attached to Master's thesis, then we may do the same with only Y directed load. Eventually using
-           superposition overall displacements are obtained by summing u and v for X directed load and Y directed load.
-           
-           Legend of nodes naming for equation assembling :
-
-                 X   A3 B2 B2 B2 B2 B2 A3   X
-                A2 [ A1 B1 B1 B1 B1 B1 A1 ] A2
-                B2 [ B1 C1 C1 C1 C1 C1 B1 ] B2
-                B2 [ B1 C1 C1 C1 C1 C1 B1 ] B2
-           F =  B2 [ B1 C1 C1 C1 C1 C1 B1 ] B2
-                B2 [ B1 C1 C1 C1 C1 C1 B1 ] B2
-                B2 [ B1 C1 C1 C1 C1 C1 B1 ] B2
-                A2 [ A1 B1 B1 B1 B1 B1 A1 ] A2
-                 X   A3 B2 B2 B2 B2 B2 A3   X
-
-            X - fictitious that does not belong to domain
-            f vector is flattened version of F matrix, for i,j shape matrix :
-            f[0] element is equal to F[0, 0], (that is fictitious node - not belonging to domain)
-            f[0*i + i-1] is equal to F[0, i-1]  
-            f[1 * i] is equal to F[1, 0]
-            f[(j-1)*i] is equal to F[j-1, 0]
-            f[(j-1)*i + i-1] is equal  to F[j-1, i-1]
-
-    """
-
-    #    A - assembled matrix of FDM scheme equations, f - vector of Airy function F values,
-    #    p - vector of load/displacement (depends on boundary condition type)
-
-    A = np.zeros((n, n))
-    p = np.ones((n, 1))
-
-    """ 3. Calculation of all coefficients and setting corner fictitious nodes, that does not belong to domain """
-
     # for vertical direction of load
     alpha1v = 0
     alpha2v = 1
@@ -96,17 +40,6 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
     beta2 = (v * Ds + G - (Ds ** 2 + G ** 2) / (v * Ds + G))
     beta3 = (-G * Ds / (v * Ds + G))
 
-    p[0, 0] = 0
-    A[0, 0] = 1  # after A*f=P it gives result 1*f(top-left) = 0
-    p[i - 1, 0] = 0
-    A[i - 1, i - 1] = 1  # after A*f=P it gives result 1*f(top-right) = 0
-    p[(j - 1) * i, 0] = 0
-    A[(j - 1) * i, (j - 1) * i] = 1  # after A*f=P it gives result 1*f(bottom-left) = 0
-    p[(j - 1) * i + i - 1, 0] = 0
-    A[(j - 1) * i + i - 1, (j - 1) * i + i - 1] = 1  # after A*f=P it gives result 1*f(bottom-right) = 0
-
-    #  for one direction of load
-
     if direction == "vertical":
         a1 = alpha1v
         a2 = alpha2v
@@ -114,10 +47,6 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
         a4 = alpha4v
         a5 = alpha5v
         a6 = alpha6v
-        load_xB = 0
-        load_xT = 0
-        load_xL = 0
-        load_xR = 0
     else:
         a1 = alpha1h
         a2 = alpha2h
@@ -125,10 +54,6 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
         a4 = alpha4h
         a5 = alpha5h
         a6 = alpha6h
-        load_yB = 0
-        load_yT = 0
-        load_yL = 0
-        load_yR = 0
 
     # C coefficients for sigma_x boundary conditions
 
@@ -151,15 +76,170 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
     ct3 = G * a2 + G * a6
     ct4 = G * a3
 
+    return [[a1, a2, a3, a4, a5, a6], [beta0, beta1, beta2, beta3],
+            [cx1, cx2, cx3, cx4], [cy1, cy2, cy3, cy4], [ct1, ct2, ct3, ct4]]
+
+
+def loads_shape(loads):
+    """Returns () for single load case or (k,) if every load is given as sequence of values for k load cases"""
+    return np.broadcast(*[np.asarray(load) for direction in loads.values() for load in direction.values()]).shape
+
+
+def mesh_shape(displacements):
+    """Returns number of nodes on x and y dimension of mesh with fictitious nodes"""
+    (i, j) = displacements[0].shape
+    return (i + 2, j + 2)
+
+
+def load_shield_one_direction(displacements, loads, supports, density, direction):
+    """Right-hand side p of equations Af = p of shield for one direction of load, see assemble_shield_one_direction
+
+    Only equations of statical boundary conditions are loaded, displacement boundary conditions and mid points have
+    zero on the right-hand side. p does not depend on material, so it is built without A if A is already factorized.
+    """
+
+    """ 1. Data """
+
+    (i, j) = mesh_shape(displacements)  # with fictitious nodes
+    n = i * j  # amount of nodes
+
+    load_xB = np.asarray(loads["x_direction"]["bottom"], dtype=np.float64)
+    load_xT = np.asarray(loads["x_direction"]["top"], dtype=np.float64)
+    load_xL = np.asarray(loads["x_direction"]["left"], dtype=np.float64)
+    load_xR = np.asarray(loads["x_direction"]["right"], dtype=np.float64)
+    load_yB = np.asarray(loads["y_direction"]["bottom"], dtype=np.float64)
+    load_yT = np.asarray(loads["y_direction"]["top"], dtype=np.float64)
+    load_yL = np.asarray(loads["y_direction"]["left"], dtype=np.float64)
+    load_yR = np.asarray(loads["y_direction"]["right"], dtype=np.float64)
+
+    #  for one direction of load only loads of the same direction are applied
+
+    if direction == "vertical":
+        load_xB = 0
+        load_xT = 0
+        load_xL = 0
+        load_xR = 0
+    else:
+        load_yB = 0
+        load_yT = 0
+        load_yL = 0
+        load_yR = 0
+
+    p = np.zeros((n, int(np.prod(loads_shape(loads)))))  # one column for every load case
+
+    """ 2. Corner points (A) for statical boundary conditions """
+
+    if supports["top"] == 0 and supports["left"] == 0:
+        p[i] = -(0.5*load_xL + 0.5*load_xT) * density ** 3  # sig_x = 0.5*sig_x_load + 0.5*tau_xy_load # x with -
+        p[i + 1] = (0.5*load_yL + 0.5*load_yT) * density ** 3  # sig_y = 0.5*sig_y_load + 0.5*tau_xy_load # y with +
+    if supports["top"] == 0 and supports["right"] == 0:
+        p[2 * i - 2] = (0.5 * load_xT + 0.5 * load_xR) * density ** 3
+        p[2 * i - 1] = (0.5 * load_yT + 0.5 * load_yR) * density ** 3
+    if supports["bottom"] == 0 and supports["left"] == 0:
+        p[(j - 2) * i + 1] = -(0.5 * load_xL + 0.5 * load_xB) * density ** 3
+        p[(j - 1) * i + 1] = -(0.5 * load_yL + 0.5 * load_yB) * density ** 3
+    if supports["bottom"] == 0 and supports["right"] == 0:
+        p[(j - 2) * i + i - 2] = (0.5 * load_xB + 0.5 * load_xR) * density ** 3
+        p[(j - 1) * i + i - 2] = -(0.5 * load_yB + 0.5 * load_yR) * density ** 3
+
+    """ 3. Edge points (B) for statical boundary conditions - real node for u(i,j), fictitious node for v(i,j) """
+
+    if supports["top"] == 0:
+        p[i + 2:2 * i - 2] = load_xT * 2 * density ** 3
+        p[2:i - 2] = load_yT * 2 * density ** 3
+    if supports["left"] == 0:
+        p[2 * i + 1:(j - 2) * i + 1:i] = load_xL * 2 * density ** 3
+        p[2 * i:(j - 2) * i:i] = load_yL * 2 * density ** 3
+    if supports["bottom"] == 0:
+        p[(j - 2) * i + 2:(j - 2) * i + i - 2] = load_xB * 2 * density ** 3
+        p[(j - 1) * i + 2:(j - 1) * i + i - 2] = load_yB * 2 * density ** 3
+    if supports["right"] == 0:
+        p[3 * i - 2:(j - 2) * i + i - 2:i] = load_xR * 2 * density ** 3
+        p[3 * i - 1:(j - 2) * i + i - 1:i] = load_yR * 2 * density ** 3
+
+    return p
+
+
+def assemble_shield_one_direction(displacements, E, loads, supports, density, v, direction, assembly="dense",
+                                  progress=None, dtype=np.float64):
+    """Apply boundary conditions for shield objects and assemble equations Af = p for one direction of load
+
+    loads - dictionary of loads, every load may be sequence of values for following load cases, then p has one column
+            for every load case
+    assembly - "dense" stores A as full n x n matrix, "sparse" stores only non-zero coefficients of A, "stencil"
+               stores only equations of edge nodes and applies stencil of interior nodes without any matrix
+    progress - function called with name of every stage of assembly, see fidi.fdm_engine.progress
+    dtype - type of coefficients of A, np.float32 halves memory of the matrix
+    """
+
+    """ 1. Data """
+
+    uf = displacements[0]  # displacements on x dimension
+    vf = displacements[1]  # displacements on y dimension
+    (i, j) = uf.shape  # i/j - number of nodes on x/y dimension
+    i += 2     # adding fictitious nodes
+    j += 2     # adding fictitious nodes
+    n = i * j  # amount of nodes
+
+    """ 2. Starting from the idea of Airy function, suppose that in case of isotropic material there is F(x,y)
+           function of which partial derivatives give the projections of displacements as it follows:
+           
+           u = alpha1*Fxx + alpha2*Fxy + alpha3*Fyy 
+           v = alpha4*Fxx + alpha5*Fxy + alpha6*Fyy 
+           
+           where u is projection on x axis, v on y axis and alphas are coefficients to be determined.
+    
+           Assuming load only in X direction we may determine alpha coefficients according to theory
+           attached to Master's thesis, then we may do the same with only Y directed load. Eventually using
+           superposition overall displacements are obtained by summing u and v for X directed load and Y directed load.
+           
+           Legend of nodes naming for equation assembling :
+
+                 X   A3 B2 B2 B2 B2 B2 A3   X
+                A2 [ A1 B1 B1 B1 B1 B1 A1 ] A2
+                B2 [ B1 C1 C1 C1 C1 C1 B1 ] B2
+                B2 [ B1 C1 C1 C1 C1 C1 B1 ] B2
+           F =  B2 [ B1 C1 C1 C1 C1 C1 B1 ] B2
+                B2 [ B1 C1 C1 C1 C1 C1 B1 ] B2
+                B2 [ B1 C1 C1 C1 C1 C1 B1 ] B2
+                A2 [ A1 B1 B1 B1 B1 B1 A1 ] A2
+                 X   A3 B2 B2 B2 B2 B2 A3   X
+
+            X - fictitious that does not belong to domain
+            f vector is flattened version of F matrix, for i,j shape matrix :
+            f[0] element is equal to F[0, 0], (that is fictitious node - not belonging to domain)
+            f[0*i + i-1] is equal to F[0, i-1]  
+            f[1 * i] is equal to F[1, 0]
+            f[(j-1)*i] is equal to F[j-1, 0]
+            f[(j-1)*i + i-1] is equal  to F[j-1, i-1]
+
+    """
+
+    #    A - assembled matrix of FDM scheme equations, f - vector of Airy function F values,
+    #    p - vector of load/displacement (depends on boundary condition type)
+
+    report(progress, "allocation")
+    A = allocate_matrix(n, assembly, (i, j), dtype)
+    p = load_shield_one_direction(displacements, loads, supports, density, direction)
+    report(progress, "boundary rows")
+
+    """ 3. Calculation of all coefficients and setting corner fictitious nodes, that does not belong to domain """
+
+    [[a1, a2, a3, a4, a5, a6], [beta0, beta1, beta2, beta3],
+     [cx1, cx2, cx3, cx4], [cy1, cy2, cy3, cy4], [ct1, ct2, ct3, ct4]] = shield_coefficients(E, v, direction)
+
+    A[0, 0] = 1  # after A*f=P it gives result 1*f(top-left) = 0
+    A[i - 1, i - 1] = 1  # after A*f=P it gives result 1*f(top-right) = 0
+    A[(j - 1) * i, (j - 1) * i] = 1  # after A*f=P it gives result 1*f(bottom-left) = 0
+    A[(j - 1) * i + i - 1, (j - 1) * i + i - 1] = 1  # after A*f=P it gives result 1*f(bottom-right) = 0
+
     """ 4. Setting equations for corner points (A) for displacement boundary conditions """
 
     if supports["top"] in [1, 2] or supports["left"] in [1, 2]:  # 3 equations for corner point
 
-        p[1, 0] = 0
         A[1, 1] = 1
         A[1, i] = -1  # after A*f=P it gives result f1-f2 = 0, so f1 = f2 for 2 fictitious nodes
 
-        p[i, 0] = 0 * density ** 2  # support or forced displacement value in vertical direction
         A[i, i] = a1
         A[i, 1] = a3
         A[i, i + 1] = -2 * a1 - a2 - 2 * a3
@@ -167,7 +247,6 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
         A[i, 2 * i + 1] = a2 + a3
         A[i, 2 * i + 2] = -a2
 
-        p[i + 1, 0] = 0 * density ** 2  # support or forced displacement value in horizontal direction
         A[i + 1, i] = a4
         A[i + 1, 1] = a6
         A[i + 1, i + 1] = -2 * a4 - a5 - 2 * a6
@@ -180,11 +259,9 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
 
     if supports["top"] in [1, 2] or supports["right"] in [1, 2]:  # 3 equations for corner point
 
-        p[i - 2, 0] = 0
         A[i - 2, i - 2] = 1
         A[i - 2, 2 * i - 1] = -1  # after A*f=P it gives result f1-f2 = 0, so f1 = f2 for 2 fictitious nodes
 
-        p[2 * i - 2, 0] = 0 * density ** 2  # support or forced displacement value in vertical direction
         A[2 * i - 2, i - 2] = a3
         A[2 * i - 2, 2 * i - 3] = a1 - a2
         A[2 * i - 2, 2 * i - 2] = -2 * a1 + a2 - 2 * a3
@@ -192,7 +269,6 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
         A[2 * i - 2, 3 * i - 3] = a2
         A[2 * i - 2, 3 * i - 2] = -a2 + a3
 
-        p[2 * i - 1, 0] = 0 * density ** 2  # support or forced displacement value in horizontal direction
         A[2 * i - 1, i - 2] = a6
         A[2 * i - 1, 2 * i - 3] = a4 - a5
         A[2 * i - 1, 2 * i - 2] = -2 * a4 + a5 - 2 * a6
@@ -205,11 +281,9 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
 
     if supports["bottom"] in [1, 2] or supports["left"] in [1, 2]:  # 3 equations for corner point
 
-        p[(j - 2) * i, 0] = 0
         A[(j - 2) * i, (j - 2) * i] = 1
         A[(j - 2) * i, (j - 1) * i + 1] = -1  # after A*f=P it gives result f1-f2 = 0, so f1 = f2 for 2 fictitious nodes
 
-        p[(j - 2) * i + 1, 0] = 0 * density ** 2  # support or forced displacement value in vertical direction
         A[(j - 2) * i + 1, (j - 3) * i + 1] = -a2 + a3
         A[(j - 2) * i + 1, (j - 3) * i + 2] = a2
         A[(j - 2) * i + 1, (j - 2) * i] = a1
@@ -217,7 +291,6 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
         A[(j - 2) * i + 1, (j - 2) * i + 2] = a1 - a2
         A[(j - 2) * i + 1, (j - 1) * i + 1] = a3
 
-        p[(j - 1) * i + 1, 0] = 0 * density ** 2  # support or forced displacement value in horizontal direction
         A[(j - 1) * i + 1, (j - 3) * i + 1] = -a5 + a6
         A[(j - 1) * i + 1, (j - 3) * i + 2] = a5
         A[(j - 1) * i + 1, (j - 2) * i] = a4
@@ -230,11 +303,9 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
 
     if supports["bottom"] in [1, 2] or supports["right"] in [1, 2]:  # 3 equations for corner point
 
-        p[(j - 2) * i + i - 1, 0] = 0
         A[(j - 2) * i + i - 1, (j - 2) * i + i - 1] = 1
         A[(j - 2) * i + i - 1, (j - 1) * i + i - 2] = -1
 
-        p[(j - 2) * i + i - 2, 0] = 0 * density ** 2
         A[(j - 2) * i + i - 2, (j - 3) * i + i - 3] = -a2
         A[(j - 2) * i + i - 2, (j - 3) * i + i - 2] = a2 + a3
         A[(j - 2) * i + i - 2, (j - 2) * i + i - 3] = a1 + a2
@@ -242,7 +313,6 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
         A[(j - 2) * i + i - 2, (j - 2) * i + i - 1] = a1
         A[(j - 2) * i + i - 2, (j - 1) * i + i - 2] = a3
 
-        p[(j - 1) * i + i - 2, 0] = 0 * density ** 2
         A[(j - 1) * i + i - 2, (j - 3) * i + i - 3] = -a5
         A[(j - 1) * i + i - 2, (j - 3) * i + i - 2] = a5 + a6
         A[(j - 1) * i + i - 2, (j - 2) * i + i - 3] = a4 + a5
@@ -257,11 +327,9 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
 
     if supports["top"] == 0 and supports["left"] == 0:  # 3 equations for corner point
 
-        p[1, 0] = 0
         A[1, 1] = 1
         A[1, i] = -1  # after A*f=P it gives result f1-f2 = 0, so f1 = f2 for 2 fictitious nodes
 
-        p[i, 0] = -(0.5*load_xL + 0.5*load_xT) * density ** 3  # sig_x = 0.5*sig_x_load + 0.5*tau_xy_load # x with -
         A[i, i] = -cx1 + cx2
         A[i, 1] = -cx3 + cx4
         A[i, 2] = cx3
@@ -273,7 +341,6 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
         A[i, 2 * i + 2] = -cx2 + cx3
         A[i, 3 * i + 1] = -cx4
 
-        p[i + 1, 0] = (0.5*load_yL + 0.5*load_yT) * density ** 3  # sig_y = 0.5*sig_y_load + 0.5*tau_xy_load # y with +
         A[i + 1, i] = -cy1 + cy2
         A[i + 1, 1] = -cy3 + cy4
         A[i + 1, 2] = cy3
@@ -290,11 +357,9 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
 
     if supports["top"] == 0 and supports["right"] == 0:  # 3 equations for corner point
 
-        p[i - 2, 0] = 0
         A[i - 2, i - 2] = 1
         A[i - 2, 2 * i - 1] = -1  # after A*f=P it gives result f1-f2 = 0, so f1 = f2 for 2 fictitious nodes
 
-        p[2 * i - 2, 0] = (0.5 * load_xT + 0.5 * load_xR) * density ** 3  # sig_x = 0.5*sig_x_load + 0.5*tau_xy_load
         A[2 * i - 2, i - 3] = -cx3
         A[2 * i - 2, i - 2] = cx3 + cx4
         A[2 * i - 2, 2 * i - 4] = -cx1
@@ -306,7 +371,6 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
         A[2 * i - 2, 3 * i - 1] = -cx2
         A[2 * i - 2, 4 * i - 2] = -cx4
 
-        p[2 * i - 1, 0] = (0.5 * load_yT + 0.5 * load_yR) * density ** 3  # sig_y = 0.5*sig_y_load + 0.5*tau_xy_load
         A[2 * i - 1, i - 3] = -cy3
         A[2 * i - 1, i - 2] = cy3 + cy4
         A[2 * i - 1, 2 * i - 4] = -cy1
@@ -323,11 +387,9 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
 
     if supports["bottom"] == 0 and supports["left"] == 0:  # 3 equations for corner point
 
-        p[(j - 2) * i, 0] = 0
         A[(j - 2) * i, (j - 2) * i] = 1
         A[(j - 2) * i, (j - 1) * i + 1] = -1
 
-        p[(j - 2) * i + 1, 0] = -(0.5 * load_xL + 0.5 * load_xB) * density ** 3
         A[(j - 2) * i + 1, (j - 4) * i + 1] = cx4
         A[(j - 2) * i + 1, (j - 3) * i] = cx2
         A[(j - 2) * i + 1, (j - 3) * i + 1] = -2 * cx2 - cx3 - 3 * cx4
@@ -339,7 +401,6 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
         A[(j - 2) * i + 1, (j - 1) * i + 1] = -cx3 - cx4
         A[(j - 2) * i + 1, (j - 1) * i + 2] = cx3
 
-        p[(j - 1) * i + 1, 0] = -(0.5 * load_yL + 0.5 * load_yB) * density ** 3
         A[(j - 1) * i + 1, (j - 4) * i + 1] = cy4
         A[(j - 1) * i + 1, (j - 3) * i] = cy2
         A[(j - 1) * i + 1, (j - 3) * i + 1] = -2 * cy2 - cy3 - 3 * cy4
@@ -356,11 +417,9 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
 
     if supports["bottom"] == 0 and supports["right"] == 0:  # 3 equations for corner point
 
-        p[(j - 2) * i + i - 1, 0] = 0
         A[(j - 2) * i + i - 1, (j - 2) * i + i - 1] = 1
         A[(j - 2) * i + i - 1, (j - 1) * i + i - 2] = -1
 
-        p[(j - 2) * i + i - 2, 0] = (0.5 * load_xB + 0.5 * load_xR) * density ** 3
         A[(j - 2) * i + i - 2, (j - 4) * i + i - 2] = cx4
         A[(j - 2) * i + i - 2, (j - 3) * i + i - 3] = cx2 - cx3
         A[(j - 2) * i + i - 2, (j - 3) * i + i - 2] = -2 * cx2 + cx3 - 3 * cx4
@@ -372,7 +431,6 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
         A[(j - 2) * i + i - 2, (j - 1) * i + i - 3] = -cx3
         A[(j - 2) * i + i - 2, (j - 1) * i + i - 2] = cx3 - cx4
 
-        p[(j - 1) * i + i - 2, 0] = -(0.5 * load_yB + 0.5 * load_yR) * density ** 3
         A[(j - 1) * i + i - 2, (j - 4) * i + i - 2] = cy4
         A[(j - 1) * i + i - 2, (j - 3) * i + i - 3] = cy2 - cy3
         A[(j - 1) * i + i - 2, (j - 3) * i + i - 2] = -2 * cy2 + cy3 - 3 * cy4
@@ -390,11 +448,10 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
     """ 6. Setting equations for edge points (B) for displacement boundary conditions """
 
     def edge_nodes_displacement(_real_node, _fictitious_node,  n1, n2, n3, n4, n5, n6, n7, n8, n9,
-                                _A=A, _p=p, _i=i, _j=j, _v=v, _density=density,
+                                _A=A, _i=i, _j=j, _v=v,
                                 _a1=a1, _a2=a2, _a3=a3, _a4=a4, _a5=a5, _a6=a6):
         # 2 equations for edge points
 
-        _p[_real_node, 0] = 0 * _density**2  # equation for u(i,j)
         _A[_real_node, n1] = -_a2/4
         _A[_real_node, n2] = _a3
         _A[_real_node, n3] = _a2/4
@@ -405,7 +462,6 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
         _A[_real_node, n8] = _a3
         _A[_real_node, n9] = -_a2/4
 
-        _p[_fictitious_node, 0] = 0 * _density ** 2  # equation for v(i,j)
         _A[_fictitious_node, n1] = -_a5 / 4
         _A[_fictitious_node, n2] = _a6
         _A[_fictitious_node, n3] = _a5 / 4
@@ -416,33 +472,33 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
         _A[_fictitious_node, n8] = _a6
         _A[_fictitious_node, n9] = -_a5 / 4
 
-        return [_A, _p]
+        return _A
 
     if supports["top"] in [1, 2]:
         for m in range(2, i - 2, 1):    # top
-            [A, p] = edge_nodes_displacement(i + m, m, m - 1, m, m + 1, i + m - 1, i + m,
-                                             i + m + 1, 2 * i + m - 1, 2 * i + m, 2 * i + m + 1)
+            A = edge_nodes_displacement(i + m, m, m - 1, m, m + 1, i + m - 1, i + m,
+                                        i + m + 1, 2 * i + m - 1, 2 * i + m, 2 * i + m + 1)
     else:
         pass     # it mean that for this node static boundaries will be applied
 
     if supports["left"] in [1, 2]:
         for m in range(2 * i, (j - 2) * i, i):  # left
-            [A, p] = edge_nodes_displacement(m + 1, m, -i + m, -i + m + 1, -i + m + 2, m,
-                                             m + 1, m + 2, i + m, i + m + 1, i + m + 2)
+            A = edge_nodes_displacement(m + 1, m, -i + m, -i + m + 1, -i + m + 2, m,
+                                        m + 1, m + 2, i + m, i + m + 1, i + m + 2)
     else:
         pass     # it mean that for this node static boundaries will be applied
 
     if supports["bottom"] in [1, 2]:
         for m in range((j - 1) * i + 2, (j - 1) * i + i - 2, 1):  # bottom
-            [A, p] = edge_nodes_displacement(-i + m, m, -2 * i + m - 1, -2*i + m, -2 * i + m + 1,
-                                             -i + m - 1, -i + m, -i + m + 1, m - 1, m, m + 1)
+            A = edge_nodes_displacement(-i + m, m, -2 * i + m - 1, -2*i + m, -2 * i + m + 1,
+                                        -i + m - 1, -i + m, -i + m + 1, m - 1, m, m + 1)
     else:
         pass     # it mean that for this node static boundaries will be applied
 
     if supports["right"] in [1, 2]:
         for m in range(2 * i + i - 1, (j - 2) * i + i - 1, i):  # right
-            [A, p] = edge_nodes_displacement(m, m - 1, i + m - 2, i + m - 1, i + m, m - 2,
-                                             m - 1, m, -i + m - 2, -i + m - 1, -i + m)
+            A = edge_nodes_displacement(m, m - 1, i + m - 2, i + m - 1, i + m, m - 2,
+                                        m - 1, m, -i + m - 2, -i + m - 1, -i + m)
     else:
         pass     # it mean that for this node static boundaries will be applied
 
@@ -455,7 +511,6 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
             real_node = i + m
             fictitious_node = m
 
-            p[real_node, 0] = load_xT * 2 * density ** 3  # equation for u(i,j)
             A[real_node, m - 1] = ct2 - ct3
             A[real_node, m] = -2 * ct2 + 2 * ct4
             A[real_node, m + 1] = ct2 + ct3
@@ -469,7 +524,6 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
             A[real_node, m + i + 2] = ct1
             A[real_node, m + 3 * i] = -2 * ct4
 
-            p[fictitious_node, 0] = load_yT * 2 * density ** 3  # equation for v(i,j)
             A[fictitious_node, m - 1] = cy2 - cy3
             A[fictitious_node, m] = -2 * cy2 + 2 * cy4
             A[fictitious_node, m + 1] = cy2 + cy3
@@ -490,7 +544,6 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
             real_node = m + 1
             fictitious_node = m
 
-            p[real_node, 0] = load_xL * 2 * density ** 3  # equation for u(i,j)
             A[real_node, m - i] = cx2 - cx3
             A[real_node, m - i + 1] = -2 * cx2 - 2 * cx4
             A[real_node, m - i + 2] = cx2 + cx3
@@ -504,7 +557,6 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
             A[real_node, m + 2 * i + 1] = -cx4
             A[real_node, m + 3] = 2 * cx1
 
-            p[fictitious_node, 0] = load_yL * 2 * density ** 3  # equation for v(i,j)
             A[fictitious_node, m - i] = ct2 - ct3
             A[fictitious_node, m - i + 1] = -2 * ct2 - 2 * ct4
             A[fictitious_node, m - i + 2] = ct2 + ct3
@@ -525,7 +577,6 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
             real_node = -i + m
             fictitious_node = m
 
-            p[real_node, 0] = load_xB * 2 * density ** 3  # equation for u(i,j)
             A[real_node, m - 2 * i - 1] = ct2 - ct3
             A[real_node, m - 2 * i] = -2 * ct2 - 6 * ct4
             A[real_node, m - 2 * i + 1] = ct2 + ct3
@@ -539,7 +590,6 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
             A[real_node, m - i + 2] = ct1
             A[real_node, m - 3 * i] = 2 * ct4
 
-            p[fictitious_node, 0] = load_yB * 2 * density ** 3  # equation for v(i,j)
             A[fictitious_node, m - 2 * i - 1] = cy2 - cy3
             A[fictitious_node, m - 2 * i] = -2 * cy2 - 6 * cy4
             A[fictitious_node, m - 2 * i + 1] = cy2 + cy3
@@ -560,7 +610,6 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
             real_node = m - 1
             fictitious_node = m
 
-            p[real_node, 0] = load_xR * 2 * density ** 3  # equation for u(i,j)
             A[real_node, m - i - 2] = cx2 - cx3
             A[real_node, m - i - 1] = -2 * cx2 + -2 * cx4
             A[real_node, m - i] = cx2 + cx3
@@ -574,7 +623,6 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
             A[real_node, m + 2 * i - 1] = -cx4
             A[real_node, m - 3] = -2 * cx1
 
-            p[fictitious_node, 0] = load_yR * 2 * density ** 3  # equation for v(i,j)
             A[fictitious_node, m - i - 2] = ct2 - ct3
             A[fictitious_node, m - i - 1] = -2 * ct2 + -2 * ct4
             A[fictitious_node, m - i] = ct2 + ct3
@@ -592,53 +640,69 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
 
     """ 8. Setting equations for mid points (C) """
 
-    def mid_nodes(node, n1, n2, n3, n4, n5, n6, n7, n8, n9, n10, n11, n12, n13,
-                  _A=A, _p=p, _density=density,
-                  _beta0=beta0, _beta1=beta1, _beta2=beta2, _beta3=beta3):
-
-        _p[node, 0] = _beta0 * 0 * _density**4  # there is no external load applied to mid nodes
-        _A[node, n1] = _beta3
-        _A[node, n2] = _beta2
-        _A[node, n3] = -4 * _beta3 - 2 * _beta2
-        _A[node, n4] = _beta2
-        _A[node, n5] = _beta1
-        _A[node, n6] = -4 * _beta1 - 2 * _beta2
-        _A[node, n7] = 6 * _beta1 + 4 * _beta2 + 6 * _beta3
-        _A[node, n8] = -4 * _beta1 - 2 * _beta2
-        _A[node, n9] = _beta1
-        _A[node, n10] = _beta2
-        _A[node, n11] = -4 * _beta3 - 2 * _beta2
-        _A[node, n12] = _beta2
-        _A[node, n13] = _beta3
-        return [_A, _p]
-
-    for vm in range(2, j - 2, 1):
-        for m in range(2, i - 2, 1):
-            [A, p] = mid_nodes(vm * i + m, (vm - 2) * i + m, (vm - 1) * i + m - 1, (vm - 1) * i + m,
-                               (vm - 1) * i + m + 1, vm * i + m - 2, vm * i + m - 1, vm * i + m, vm * i + m + 1,
-                               vm * i + m + 2, (vm + 1) * i + m - 1, (vm + 1) * i + m, (vm + 1) * i + m + 1,
-                               (vm + 2) * i + m)
-
-    """ 9. Calculation of Af = p equation """
-
-    f_solved = np.linalg.solve(A, p)
-    F = np.zeros((i, j))
-    s = 0
-    for vm in range(j):
-        for m in range(i):
-            F[m, vm] = round(f_solved[s, 0], 14)
-            s += 1
-
-    """ 10. Calculation of u, v, sigma x, sigma y and tau xy and membrane forces from F matrix"""
-
-    blank = np.zeros((i, j))
-
-    u = np.zeros((i-2, j-2))
-    for vm in range(j-2):
-        for m in range(i-2):
-            u[m, vm] = -a2 / 4 * F[m, vm] + a3 * F[m + 1, vm] + a2 / 4 * F[m + 2, vm] \
-                       + a1 * F[m, vm + 1] + (-2 * a1 - 2 * a3) * F[m + 1, vm + 1] + a1 * F[m + 2, vm + 1] \
-                       + a2 / 4 * F[m, vm + 2] + a3 * F[m + 1, vm + 2] - a2 / 4 * F[m + 2, vm + 2]
+    report(progress, "interior rows")
+    # all mid points have the same equation, so they are set at once
+    set_interior_stencil(A, i, j, [beta3, beta2, -4 * beta3 - 2 * beta2, beta2,
+                                   beta1, -4 * beta1 - 2 * beta2, 6 * beta1 + 4 * beta2 + 6 * beta3,
+                                   -4 * beta1 - 2 * beta2, beta1,
+                                   beta2, -4 * beta3 - 2 * beta2, beta2, beta3])
+
+    return [A, p]
+
+
+def membrane_force(stress, thickness):
+    """Membrane force of shield of given thickness caused by normal or shear stress"""
+    return stress * thickness
+
+
+def results_shape(displacements, loads):
+    """Shape of every matrix of results - load cases and nodes on y and x dimension"""
+    return tuple(reversed(loads_shape(loads))) + displacements[0].shape[::-1]
+
+
+def recover_shield_one_direction(f_solved, displacements, E, v, density, thickness, direction, progress=None):
+    """Compute displacements, stresses and membrane forces from solved values of F function
+
+    f_solved - vector of F values or matrix with columns for following load cases, then every returned matrix has
+               additional first dimension with results of following load cases
+    progress - function called with name of every stage of recovery, see fidi.fdm_engine.progress
+
+    Returns Results (fidi.fdm_engine.results) with displacements and stresses stored, membrane forces derived from
+    stresses and zero w and moments.
+    """
+
+    report(progress, "reshape")
+    (i, j) = displacements[0].shape
+    i += 2     # adding fictitious nodes
+    j += 2     # adding fictitious nodes
+
+    [[a1, a2, a3, a4, a5, a6], [beta0, beta1, beta2, beta3],
+     [cx1, cx2, cx3, cx4], [cy1, cy2, cy3, cy4], [ct1, ct2, ct3, ct4]] = shield_coefficients(E, v, direction)
+
+    # f vector is flattened F matrix column by column, so F[m, vm] = f[vm * i + m], load cases are the last dimension
+    F = np.round(f_solved, 14).reshape((j, i) + f_solved.shape[1:]).swapaxes(0, 1)
+
+    """ 9. Calculation of u, v, sigma x, sigma y and tau xy and membrane forces from F matrix"""
+
+    report(progress, "recovery")
+
+    # F values moved by (dm, dvm) nodes - F[m + dm, vm + dvm] - for all nodes (m, vm) of the field at once
+
+    def _Fd(dm, dvm):
+        """For every node of displacement fields"""
+        return F[dm:dm + i - 2, dvm:dvm + j - 2]
+
+    def _Fs(dm, dvm):
+        """For every node of stress fields not lying on the edge"""
+        return F[1 + dm:i - 3 + dm, 1 + dvm:j - 3 + dvm]
+
+    def displacement(b1, b2, b3):
+        """Displacement in every node of domain, b1, b2, b3 are alpha coefficients of Fxx, Fxy and Fyy"""
+        return -b2 / 4 * _Fd(0, 0) + b3 * _Fd(1, 0) + b2 / 4 * _Fd(2, 0) \
+            + b1 * _Fd(0, 1) + (-2 * b1 - 2 * b3) * _Fd(1, 1) + b1 * _Fd(2, 1) \
+            + b2 / 4 * _Fd(0, 2) + b3 * _Fd(1, 2) - b2 / 4 * _Fd(2, 2)
+
+    u = displacement(a1, a2, a3)
     # values at corners has to be changed due to the fact that corner points does not belong to F function domain
     u[0, 0] = (a1 * F[0, 1] + a3 * F[1, 0] + (-2 * a1 - a2 - 2 * a3) * F[1, 1] + (a1 + a2) * F[2, 1]
                + (a2 + a3) * F[1, 2] - a2 * F[2, 2]) * 1 / (density ** 2)
@@ -649,12 +713,7 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
     u[i - 3, j - 3] = (a1 * F[i-1, j-2] + a3 * F[i-2, j-1] + (-2 * a1 - a2 - 2 * a3) * F[i-2, j-2]
                        + (a1 + a2) * F[i-3, j-2] + (a2 + a3) * F[i-2, j-3] - a2 * F[i-3, j-3]) * 1 / (density ** 2)
 
-    v = np.zeros((i-2, j-2))
-    for vm in range(j-2):
-        for m in range(i-2):
-            v[m, vm] = -a5 / 4 * F[m, vm] + a6 * F[m + 1, vm] + a5 / 4 * F[m + 2, vm] \
-                       + a4 * F[m, vm + 1] + (-2 * a4 - 2 * a6) * F[m + 1, vm + 1] + a4 * F[m + 2, vm + 1] \
-                       + a5 / 4 * F[m, vm + 2] + a6 * F[m + 1, vm + 2] - a5 / 4 * F[m + 2, vm + 2]
+    v = displacement(a4, a5, a6)
     # values at corners has to be changed due to the fact that corner points does not belong to F function domain
     v[0, 0] = (a4 * F[0, 1] + a6 * F[1, 0] + (-2 * a4 - a5 - 2 * a6) * F[1, 1] + (a4 + a5) * F[2, 1]
                + (a5 + a6) * F[1, 2] - a5 * F[2, 2]) * 1 / (density ** 2)
@@ -665,67 +724,157 @@ def compute_shield_one_direction(displacements, E, loads, supports, density, v,
     v[i - 3, j - 3] = (a4 * F[i-1, j-2] + a6 * F[i-2, j-1] + (-2 * a4 - a5 - 2 * a6) * F[i-2, j-2]
                        + (a4 + a5) * F[i-3, j-2] + (a5 + a6) * F[i-2, j-3] - a5 * F[i-3, j-3]) * 1 / (density ** 2)
 
-    sigma_x = np.zeros((i - 2, j - 2))
-    for vm in range(j - 3)[1:]:
-        for m in range(i - 3)[1:]:
-            sigma_x[m, vm] = (cx4 * F[m + 1, vm - 1] + (cx2 - cx3) * F[m, vm] + (-2 * cx2 - 2 * cx4) * F[m + 1, vm]
-                              + (cx2 + cx3) * F[m + 2, vm] - cx1 * F[m - 1, vm + 1] + (2 * cx1 + 2 * cx3) * F[m, vm + 1]
-                              + 0 * F[m + 1, vm + 1] + (-2 * cx1 - 2 * cx3) * F[m + 2, vm + 1] + cx1 * F[m + 3, vm + 1]
-                              + (-cx2 - cx3) * F[m, vm + 2] + (2 * cx2 + 2 * cx4) * F[m + 1, vm + 2]
-                              + (-cx2 + cx3) * F[m + 2, vm + 2] - cx4 * F[m + 1, vm + 3]) / (2 * density ** 3)
+    sigma_x = np.zeros((i - 2, j - 2) + F.shape[2:], dtype=F.dtype)  # results of single precision solve stay single
+    sigma_x[1:i - 3, 1:j - 3] = (cx4 * _Fs(1, -1) + (cx2 - cx3) * _Fs(0, 0) + (-2 * cx2 - 2 * cx4) * _Fs(1, 0)
+                                 + (cx2 + cx3) * _Fs(2, 0) - cx1 * _Fs(-1, 1) + (2 * cx1 + 2 * cx3) * _Fs(0, 1)
+                                 + 0 * _Fs(1, 1) + (-2 * cx1 - 2 * cx3) * _Fs(2, 1) + cx1 * _Fs(3, 1)
+                                 + (-cx2 - cx3) * _Fs(0, 2) + (2 * cx2 + 2 * cx4) * _Fs(1, 2)
+                                 + (-cx2 + cx3) * _Fs(2, 2) - cx4 * _Fs(1, 3)) / (2 * density ** 3)
     # values at corners and edges has to be changed
     # TO BE CONTINUED
 
-    sigma_y = np.zeros((i - 2, j - 2))
-    for vm in range(j - 3)[1:]:
-        for m in range(i - 3)[1:]:
-            sigma_y[m, vm] = (cy4 * F[m + 1, vm - 1] + (cy1 - cy3) * F[m, vm] + (-2 * cy2 - 2 * cy4) * F[m + 1, vm]
-                              + (cy2 + cy3) * F[m + 2, vm] - cy1 * F[m - 1, vm + 1] + (2 * cy1 + 2 * cy3) * F[m, vm + 1]
-                              + 0 * F[m + 1, vm + 1] + (-2 * cy1 - 2 * cy3) * F[m + 2, vm + 1] + cy1 * F[m + 3, vm + 1]
-                              + (-cy2 - cy3) * F[m, vm + 2] + (2 * cy2 + 2 * cy4) * F[m + 1, vm + 2]
-                              + (-cy2 + cy3) * F[m + 2, vm + 2] - cy4 * F[m + 1, vm + 3]) / (2 * density ** 3)
+    sigma_y = np.zeros((i - 2, j - 2) + F.shape[2:], dtype=F.dtype)
+    sigma_y[1:i - 3, 1:j - 3] = (cy4 * _Fs(1, -1) + (cy1 - cy3) * _Fs(0, 0) + (-2 * cy2 - 2 * cy4) * _Fs(1, 0)
+                                 + (cy2 + cy3) * _Fs(2, 0) - cy1 * _Fs(-1, 1) + (2 * cy1 + 2 * cy3) * _Fs(0, 1)
+                                 + 0 * _Fs(1, 1) + (-2 * cy1 - 2 * cy3) * _Fs(2, 1) + cy1 * _Fs(3, 1)
+                                 + (-cy2 - cy3) * _Fs(0, 2) + (2 * cy2 + 2 * cy4) * _Fs(1, 2)
+                                 + (-cy2 + cy3) * _Fs(2, 2) - cy4 * _Fs(1, 3)) / (2 * density ** 3)
     # values at corners and edges has to be changed
     # TO BE CONTINUED
 
-    tau_xy = np.zeros((i - 2, j - 2))
-    for vm in range(j - 3)[1:]:
-        for m in range(i - 3)[1:]:
-            tau_xy[m, vm] = (ct4 * F[m + 1, vm - 1] + (ct2 - ct3) * F[m, vm] + (-2 * ct2 - 2 * ct4) * F[m + 1, vm]
-                             + (ct2 + ct3) * F[m + 2, vm] - ct1 * F[m - 1, vm + 1] + (2 * ct1 + 2 * ct3) * F[m, vm + 1]
-                             + 0 * F[m + 1, vm + 1] + (-2 * ct1 - 2 * ct3) * F[m + 2, vm + 1] + ct1 * F[m + 3, vm + 1]
-                             + (-ct2 - ct3) * F[m, vm + 2] + (2 * ct2 + 2 * ct4) * F[m + 1, vm + 2]
-                             + (-ct2 + ct3) * F[m + 2, vm + 2] - ct4 * F[m + 1, vm + 3]) / (2 * density ** 3)
+    tau_xy = np.zeros((i - 2, j - 2) + F.shape[2:], dtype=F.dtype)
+    tau_xy[1:i - 3, 1:j - 3] = (ct4 * _Fs(1, -1) + (ct2 - ct3) * _Fs(0, 0) + (-2 * ct2 - 2 * ct4) * _Fs(1, 0)
+                                + (ct2 + ct3) * _Fs(2, 0) - ct1 * _Fs(-1, 1) + (2 * ct1 + 2 * ct3) * _Fs(0, 1)
+                                + 0 * _Fs(1, 1) + (-2 * ct1 - 2 * ct3) * _Fs(2, 1) + ct1 * _Fs(3, 1)
+                                + (-ct2 - ct3) * _Fs(0, 2) + (2 * ct2 + 2 * ct4) * _Fs(1, 2)
+                                + (-ct2 + ct3) * _Fs(2, 2) - ct4 * _Fs(1, 3)) / (2 * density ** 3)
     # values at corners and edges has to be changed
     # TO BE CONTINUED
 
-    nxx = sigma_x * thickness
-    nyy = sigma_y * thickness
-    nxy = tau_xy * thickness
+    # membrane forces are proportional to stresses, so they are computed from them only when they are used
+    force = partial(membrane_force, thickness=thickness)
+
+    return Results(FIELDS, u.T.shape, F.dtype, {"u": u.T, "v": v.T, "sigma_x": sigma_x.T, "sigma_y": sigma_y.T,
+                                                "tau_xy": tau_xy.T},
+                   {"nxx": [force, ["sigma_x"]], "nyy": [force, ["sigma_y"]], "nxy": [force, ["tau_xy"]]})
 
-    return [u.T, v.T, blank, sigma_x.T, sigma_y.T, tau_xy.T, blank, blank, blank, nxx.T, nyy.T, nxy.T]
 
+def compute_shield_one_direction(displacements, E, loads, supports, density, v, thickness, direction,
+                                 assembly="dense", solver=None, solver_options=None, info=None):
+    """Apply boundary conditions for shield objects and compute values of displacement in every node of mesh
 
-def compute_shield(displacements, E, loads, supports, density, v, thickness):
-    """Function combining matrices for vertical and horizontal load cases"""
+    assembly - "dense" stores A as full n x n matrix, "sparse" stores only non-zero coefficients of A, "stencil"
+               stores only equations of edge nodes and applies stencil of interior nodes without any matrix
+    solver - name of solver from fidi.fdm_engine.solvers, by default dense for dense, sparse for sparse and
+             multigrid for stencil assembly
+    solver_options - dictionary of options of iterative solvers (tol, maxiter, preconditioner) and precision
+    info - dictionary filled with details of solution, e.g. convergence history of iterative solvers
+    """
+
+    options = dict({} if solver_options is None else solver_options, grid=mesh_shape(displacements))
+    [A, p] = assemble_shield_one_direction(displacements, E, loads, supports, density, v, direction, assembly,
+                                           dtype=precision_dtype(options.get("precision", "double")))
+    if solver is None:
+        solver = solvers.default_solver(assembly)
+    f_solved = solvers.solve(A, p, solver, options, info).reshape((-1,) + loads_shape(loads))
+    return recover_shield_one_direction(f_solved, displacements, E, v, density, thickness, direction)
+
+
+def combine_directions(vertical_matrices, horizontal_matrices):
+    """Sums results of vertical and horizontal direction of load into 8 resulting matrices, field computed only for
+    one direction is not copied"""
+    fields = {}
+    for name in SHIELD_FIELDS:
+        computed = [results.fields[name] for results in [vertical_matrices, horizontal_matrices]
+                    if name in results.fields]
+        if computed:
+            fields[name] = computed[0] if len(computed) == 1 else computed[0] + computed[1]
+    derived = dict(horizontal_matrices.derived, **vertical_matrices.derived)  # the same for both directions
+    return Results(SHIELD_FIELDS, vertical_matrices.shape, vertical_matrices.dtype, fields, derived)
+
+
+def compute_shield(displacements, E, loads, supports, density, v, thickness, assembly="dense", solver=None,
+                   cache=None, solver_options=None, info=None, executor=None, progress=None, profiler=None):
+    """Function combining matrices for vertical and horizontal load cases
+
+    If loads are given as sequences of values for following load cases, all of them are solved at once and every
+    returned matrix has additional first dimension with results of following load cases.
+
+    Operator of every direction is assembled and factorized only once, operators of the two directions always differ
+    in their boundary rows, so they are factorized separately. Direction without any load is neither assembled nor
+    solved, because its F function is equal to zero. If cache (FactorizationCache) is given, operators factorized in
+    previous calculations are reused without assembling them again. Options of iterative solvers and precision
+    (double, single or mixed, see fidi.fdm_engine.solvers) are given in solver_options and details of solution of
+    every solved direction are put in info dictionary under name of the direction. If executor (concurrent.futures
+    thread pool) is given, both directions are solved concurrently.
+
+    Function progress is called with name of every stage of calculations and function profiler with name and time of
+    every stage, see fidi.fdm_engine.progress. Times of stages of both directions are put in info as timings and,
+    if profiler is given, number of non-zero coefficients and estimate of condition number of every solved operator
+    are put in details of its direction.
+    """
 
-    given_displacements = displacements
-    given_E = E
-    given_loads = loads
-    given_supports = supports
-    given_density = density
-    given_v = v
-    given_thickness = thickness
-    vertical_matrices = compute_shield_one_direction(given_displacements, given_E, given_loads, given_supports,
-                                                     given_density, given_v, given_thickness, "vertical")
-    horizontal_matrices = compute_shield_one_direction(given_displacements, given_E, given_loads, given_supports,
-                                                       given_density, given_v, given_thickness, "horizontal")
-    resulting_matrices = [0, 0, 0, 0, 0, 0, 0, 0]
-    for el in range(len(resulting_matrices)):
-        resulting_matrices[el] = vertical_matrices[el] + horizontal_matrices[el]
-    return resulting_matrices
+    timer = StageTimer(progress, profiler)
+    if solver is None:
+        solver = solvers.default_solver(assembly)
+    directions = ["vertical", "horizontal"]
+    keys = [operator_key("shield", displacements[0].shape, density, supports, v,
+                         solvers.solver_key(solver, solver_options), E, direction)
+            for direction in directions]
+    options = dict({} if solver_options is None else solver_options, grid=mesh_shape(displacements))
+    dtype = precision_dtype(options.get("precision", "double"))
+    timer("allocation")
+    loads_p = [load_shield_one_direction(displacements, loads, supports, density, direction)
+               for direction in directions]
+    loaded = [k for k in range(len(directions)) if np.any(loads_p[k])]  # only they are assembled and solved
+    # operator already factorized is not assembled, unless its profile is needed - then in cheap sparse form
+    solves = {k: None if cache is None else cache.get(keys[k]) for k in loaded}  # solve functions of directions
+    operators = {k: assemble_shield_one_direction(displacements, E, loads, supports, density, v, directions[k],
+                                                  assembly if solves[k] is None else "sparse", timer, dtype)[0]
+                 for k in loaded if solves[k] is None or profiler is not None}
+    solutions = [None for direction in directions]
+    details = [{} for direction in directions]
+    timers = [StageTimer(progress, profiler) for direction in directions]  # directions may be solved in threads
+
+    def solved(k):
+        timers[k]("factorization")
+        if solves[k] is None:
+            solves[k] = solvers.factorize(operators[k], solver, options)
+            if cache is not None:
+                cache.put(keys[k], solves[k])
+        timers[k]("solve")
+        f_solved = solves[k](loads_p[k], details[k])
+        timers[k].stop()
+        return f_solved
+
+    timer.stop()
+    for k, f_solved in zip(loaded, map(solved, loaded) if executor is None else executor.map(solved, loaded)):
+        solutions[k] = f_solved
+        timer.merge(timers[k])
+    if profiler is not None:  # additional solves of estimate are not a part of any stage
+        for k in solves:
+            details[k].update(solvers.operator_profile(operators[k], solves[k]))
+    if info is not None:
+        info.update({directions[k]: details[k] for k in loaded})
+
+    # F function of direction without any load is equal to zero, so all its results are zero too
+    [vertical_matrices, horizontal_matrices] = [recover_shield_one_direction(solutions[k].reshape((-1,) +
+                                                                                                  loads_shape(loads)),
+                                                                             displacements, E, v, density, thickness,
+                                                                             directions[k], timer)
+                                                if k in loaded else
+                                                Results(FIELDS, results_shape(displacements, loads), dtype)
+                                                for k in range(len(directions))]
+    timer.stop()
+    if info is not None:
+        info["timings"] = timer.timings
+    return combine_directions(vertical_matrices, horizontal_matrices)
 
 
 if __name__ == '__main__':
+    import matplotlib.pyplot as plt  # plotting is needed only here, engine is imported without it
+    import matplotlib.cm as cm
+    import matplotlib.colors
 
     class TestMeshClass(object):
         def __init__(self):
@@ -0,0 +1,166 @@
+"""This part of program is responsible for geometric multigrid, which uses regularity of mesh - every coarser level
+is a mesh of the same element with doubled distance between nodes (halved density), so solution of FDM equations
+on fine meshes needs number of operations close to number of nodes
+
+Coarse operators are Galerkin products of interpolation and fine operator, so boundary conditions of any supports
+are carried to coarse levels without assembling them again. Multigrid converges fastest if number of nodes minus one
+on both dimensions is divisible by high power of two, e.g. 129 x 65 nodes."""
+
+import numpy as np
+import scipy.sparse as sparse
+from scipy.sparse.linalg import splu, spsolve_triangular, LinearOperator
+
+from fidi.fdm_engine.assembly import StencilMatrix
+
+
+def coarse_indices(n, last=False):
+    """Returns indices of nodes of coarser mesh - every second node and, if last is True, always the last one"""
+    indices = np.arange(0, n, 2)
+    if last and indices[-1] != n - 1:
+        indices = np.append(indices, n - 1)
+    return indices
+
+
+def interpolation_1d(n, last=False, order=4):
+    """Lagrange interpolation from coarse nodes to all n nodes of one dimension of mesh, as n x nc sparse matrix.
+    Every fine node is interpolated from order nearest coarse nodes - cubic interpolation (order 4) is needed for
+    good convergence on biharmonic operator."""
+    coarse = coarse_indices(n, last)
+    order = min(order, len(coarse))
+    fine = np.arange(n)
+    right = np.searchsorted(coarse, fine)  # first coarse node on the right of fine node or at its place
+    first = np.clip(right - order // 2, 0, len(coarse) - order)  # first coarse node of interpolation window
+    window = first[:, None] + np.arange(order)
+    x = coarse[window]
+    weights = np.ones(window.shape)
+    for a in range(order):
+        for b in range(order):
+            if a != b:
+                weights[:, a] *= (fine - x[:, b]) / (x[:, a] - x[:, b])
+    rows = np.repeat(fine, order)
+    return sparse.csr_matrix((weights.ravel(), (rows, window.ravel())), shape=(n, len(coarse)))
+
+
+def interpolation(grid, last):
+    """Interpolation from coarser mesh to mesh of i x j nodes numbered node = vm * i + m, returns it with numbers of
+    fine nodes at which coarse nodes lie. last tells on which dimensions the last node has to be a coarse node."""
+    (i, j) = grid
+    P = sparse.kron(interpolation_1d(j, last[1]), interpolation_1d(i, last[0])).tocsr()
+    at = (coarse_indices(j, last[1])[:, None] * i + coarse_indices(i, last[0])).ravel()
+    return P, at
+
+
+def constrained_nodes(A):
+    """Returns mask of nodes with known value - their equation contains only coefficient of the node itself,
+    like displacement equal to zero on supported edges"""
+    A = sparse.csr_matrix(A)
+    lengths = np.diff(A.indptr)
+    single = np.flatnonzero(lengths == 1)
+    mask = np.zeros(A.shape[0], dtype=bool)
+    mask[single[A.indices[A.indptr[single]] == single]] = True
+    return mask
+
+
+def constrained_interpolation(P, at, constrained):
+    """Excludes constrained nodes from interpolation - corrections of their values are always zero - and keeps every
+    coarse node lying at constrained node as constrained node of coarse mesh"""
+    keep = sparse.diags((~constrained).astype(np.float64))
+    P = (keep @ P).tocsc()
+    fixed = constrained[at]  # coarse nodes lying at constrained nodes
+    P = P @ sparse.diags((~fixed).astype(np.float64))
+    P = P + sparse.csr_matrix((np.ones(fixed.sum()), (at[fixed], np.flatnonzero(fixed))), shape=P.shape)
+    P = sparse.csr_matrix(P)
+    P.eliminate_zeros()
+    return P
+
+
+def gauss_seidel(A):
+    """Returns function making one forward Gauss-Seidel sweep"""
+    lower = sparse.tril(A, format="csr")
+
+    def _sweep(x, b):
+        return x + spsolve_triangular(lower, b - A @ x, lower=True)
+    _sweep.memory = lower.data.nbytes + lower.indices.nbytes + lower.indptr.nbytes
+    return _sweep
+
+
+def jacobi(A, omega=0.5):
+    """Returns function making one damped Jacobi sweep, it needs only diagonal and product of A and vector, so it is
+    used for matrix-free operators"""
+    diagonal = A.diagonal()
+
+    def _sweep(x, b):
+        return x + omega * (b - A @ x) / diagonal
+    _sweep.memory = diagonal.nbytes
+    return _sweep
+
+
+def build_levels(A, grid, min_nodes=400, omega=0.5):
+    """Creates list of levels [A, P, smoother] from the finest to the coarsest one, coarse operators are Galerkin
+    products P.T * A * P. The coarsest level is factorized directly.
+
+    grid - number of nodes on x and y dimension of mesh, node = vm * i + m
+    A - assembled matrix or matrix-free StencilMatrix, which is smoothed with damped Jacobi method (weight omega)
+    """
+    if not isinstance(A, StencilMatrix):
+        A = sparse.csr_matrix(A)
+    levels = []
+    while A.shape[0] > min_nodes and min(grid) >= 5:
+        if isinstance(A, StencilMatrix):
+            [constrained, smoother] = [constrained_nodes(A.boundary), jacobi(A, omega)]
+        else:
+            [constrained, smoother] = [constrained_nodes(A), gauss_seidel(A)]
+        edges = constrained.reshape(grid[::-1])
+        # last node on unconstrained edge would be extrapolated from coarse nodes, so it becomes coarse node too
+        last = (not edges[:, -1].all(), not edges[-1, :].all())
+        [P, at] = interpolation(grid, last)
+        P = constrained_interpolation(P, at, constrained)
+        levels.append([A, P, smoother])
+        A = (P.T @ (A @ P)).tocsr()
+        grid = (len(coarse_indices(grid[0], last[0])), len(coarse_indices(grid[1], last[1])))
+    if isinstance(A, StencilMatrix):
+        A = A.tocsr()  # mesh is too small for multigrid
+    levels.append([A, None, splu(A.tocsc())])
+    return levels
+
+
+def cycle(levels, b, level=0, gamma=1, steps=2):
+    """One multigrid cycle approximating solution of A*x = b, gamma = 1 gives V-cycle and gamma = 2 gives W-cycle"""
+    [A, P, smoother] = levels[level]
+    if P is None:
+        return smoother.solve(np.asarray(b, dtype=A.dtype))  # the coarsest level is solved exactly
+    x = np.zeros(b.shape)
+    for step in range(steps):
+        x = smoother(x, b)
+    for k in range(gamma):
+        x = x + P @ cycle(levels, P.T @ (b - A @ x), level + 1, gamma, steps)
+    for step in range(steps):
+        x = smoother(x, b)
+    return x
+
+
+def levels_memory(levels):
+    """Number of bytes occupied by all levels except the finest operator, which is stored by solver anyway"""
+    memory = 0
+    for k, [A, P, smoother] in enumerate(levels):
+        matrices = ([] if k == 0 else [A]) + ([] if P is None else [P])
+        memory += sum(M.data.nbytes + M.indices.nbytes + M.indptr.nbytes for M in matrices)
+        if P is None:
+            memory += (smoother.L.nnz + smoother.U.nnz) * (smoother.L.data.itemsize + smoother.L.indices.itemsize)
+        else:
+            memory += smoother.memory
+    return memory
+
+
+def multigrid_preconditioner(A, options):
+    """One multigrid cycle used as approximate inverse of A, returns it with its memory in bytes
+
+    options - grid (shape of mesh, required), cycle ("V" or "W"), smoothing_steps, min_nodes (size of coarsest level),
+              omega (weight of Jacobi smoothing of matrix-free operators)
+    """
+    if "grid" not in options:
+        raise ValueError("Multigrid needs shape of mesh given as grid option")
+    levels = build_levels(A, options["grid"], options.get("min_nodes", 400), options.get("omega", 0.5))
+    gamma = {"V": 1, "W": 2}[options.get("cycle", "V")]
+    steps = options.get("smoothing_steps", 2)
+    return LinearOperator(A.shape, lambda b: cycle(levels, np.ravel(b), 0, gamma, steps)), levels_memory(levels)
@@ -0,0 +1,94 @@
+"""This part of program is responsible for reporting and timing stages of calculations, so long calculations may be
+followed and stopped by user interface and it is known where the time goes
+
+Progress is a function called with name of every stage when it starts. It may stop calculations by raising
+ComputationCancelled, then calculations end at the beginning of the next stage. Profiler is a function called with
+name of every stage and its time in seconds when the stage ends."""
+
+import time
+import tracemalloc
+from collections import OrderedDict
+
+STAGES = ["allocation", "boundary rows", "interior rows", "factorization", "solve", "reshape", "recovery"]
+
+
+class ComputationCancelled(Exception):
+    """Raised by progress function to stop calculations"""
+    pass
+
+
+def report(progress, stage):
+    """Calls progress function with name of stage, if it is given"""
+    if progress is not None:
+        progress(stage)
+
+
+def part_progress(progress, part):
+    """Returns progress or profiler function of one part of element, e.g. plate of shell, which reports its stages
+    together with name of the part"""
+    if progress is None:
+        return None
+
+    def _progress(stage, *values):
+        progress("{} {}".format(part, stage), *values)
+    return _progress
+
+
+class StageTimer(object):
+    """Progress function measuring time of every stage, stages reported many times (e.g. assembly of both
+    directions of shield) are summed. Stages are reported further to progress and profiler functions.
+
+    Timer follows one sequence of stages, so parts of calculations running concurrently (e.g. directions of shield
+    solved in other threads) need own timers, which are merged afterwards."""
+
+    def __init__(self, progress=None, profiler=None):
+        self.progress = progress
+        self.profiler = profiler
+        self.timings = OrderedDict()  # stage : time in seconds
+        self._stage = None
+        self._start = None
+
+    def __call__(self, stage):
+        self.stop()
+        report(self.progress, stage)
+        self._stage = stage
+        self._start = time.perf_counter()
+
+    def stop(self):
+        """Ends the current stage"""
+        if self._stage is None:
+            return
+        [stage, seconds] = [self._stage, time.perf_counter() - self._start]
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+        self._stage = None
+        if self.profiler is not None:
+            self.profiler(stage, seconds)
+
+    def merge(self, other):
+        """Adds times of stages of other timer, which has to be stopped"""
+        for stage, seconds in other.timings.items():
+            self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+
+class MemoryTrace(object):
+    """Context measuring peak memory allocated inside it (in bytes, attribute peak), only if enabled is True"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.peak = None
+        self._started = False
+
+    def __enter__(self):
+        if self.enabled:
+            self._started = not tracemalloc.is_tracing()
+            if self._started:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        return self
+
+    def __exit__(self, *exception):
+        if self.enabled:
+            self.peak = tracemalloc.get_traced_memory()[1]
+            if self._started:
+                tracemalloc.stop()
+        return False
@@ -0,0 +1,93 @@
+"""This part of program is responsible for keeping results of calculations of elements
+
+Results are named matrices in fixed order, available also by index like in list returned by previous versions of
+program (results[2] is w). Only computed fields are stored - fields which are not computed for given element (e.g. u
+and v of plate) are read-only matrices of zeros occupying no memory, and derived fields (e.g. stresses of plate,
+proportional to its moments) are computed from other fields on every access."""
+
+from collections import OrderedDict
+
+import numpy as np
+
+# fields of plate in order of results, shield has only the first 8 of them
+FIELDS = ["u", "v", "w", "sigma_x", "sigma_y", "tau_xy", "mxx", "myy", "mxy", "nxx", "nyy", "nxy"]
+SHIELD_FIELDS = FIELDS[:8]
+
+
+class Results(object):
+    """Named matrices of results of the same shape
+
+    names - all fields in order of indices
+    shape - shape of every matrix, with first dimension of load cases if many load cases were solved at once
+    fields - dictionary of stored matrices, fields missing in it and in derived are equal to zero
+    derived - dictionary of name : [function, names of fields which are its arguments]
+    """
+
+    def __init__(self, names, shape, dtype=np.float64, fields=None, derived=None):
+        self.names = list(names)
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.fields = OrderedDict((name, fields[name]) for name in self.names if fields and name in fields)
+        self.derived = {name: derived[name] for name in self.names if derived and name in derived}
+
+    @classmethod
+    def from_arrays(cls, names, arrays):
+        """Results made of matrices in order of names, e.g. read from archive"""
+        arrays = list(arrays)
+        return cls(names, np.shape(arrays[0]), np.asarray(arrays[0]).dtype, dict(zip(names, arrays)))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        for name in self.names:
+            yield self[name]
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def __getitem__(self, key):
+        """Field given by name or index, slice gives list of fields"""
+        if isinstance(key, slice):
+            return [self[name] for name in self.names[key]]
+        name = key if isinstance(key, str) else self.names[key]
+        if name in self.fields:
+            return self.fields[name]
+        if name in self.derived:
+            [function, arguments] = self.derived[name]
+            return function(*[self[argument] for argument in arguments])
+        if name not in self.names:
+            raise KeyError(name)
+        return self.zeros()
+
+    def zeros(self):
+        """Read-only matrix of zeros of results shape, which does not occupy memory"""
+        return np.broadcast_to(np.zeros((), dtype=self.dtype), self.shape)
+
+    def is_zero(self, name):
+        """True if field is neither computed nor derived, so it is equal to zero"""
+        return name not in self.fields and name not in self.derived
+
+    @property
+    def nbytes(self):
+        """Memory occupied by stored fields"""
+        return sum(field.nbytes for field in self.fields.values())
+
+    def prefixed(self, prefix):
+        """The same results with names of all fields preceded by prefix, matrices are not copied"""
+        return Results([prefix + name for name in self.names], self.shape, self.dtype,
+                       {prefix + name: field for name, field in self.fields.items()},
+                       {prefix + name: [function, [prefix + argument for argument in arguments]]
+                        for name, [function, arguments] in self.derived.items()})
+
+
+def joined_results(parts):
+    """Joins results of parts of element given as list of [prefix, results], e.g. plate and shield of shell, into
+    one Results with prefixed names of fields in order of parts. Matrices are not copied."""
+    parts = [results.prefixed(prefix) for [prefix, results] in parts]
+    [fields, derived] = [{}, {}]
+    for results in parts:
+        fields.update(results.fields)
+        derived.update(results.derived)
+    return Results([name for results in parts for name in results.names], parts[0].shape, parts[0].dtype, fields,
+                   derived)
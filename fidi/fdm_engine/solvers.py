@@ -0,0 +1,500 @@
+"""This part of program is responsible for solving assembled systems of FDM scheme equations A*x = p
+
+Every solver is a function which takes matrix A and returns function solving A*x = p for given right-hand side p,
+so the matrix is factorized only once and may be used for many right-hand sides. Returned function has attribute
+memory - number of bytes occupied by the factorization - and takes optional dictionary info, which is filled with
+details of solution (convergence history of iterative solvers).
+
+Direct solvers are dense (LAPACK LU), sparse (SuperLU) and banded (LAPACK banded LU with automatic choice of node
+numbering giving narrower band, which is much cheaper than dense LU for long and narrow elements).
+
+Iterative solvers (cg, gmres, bicgstab and iterative - cg for symmetric matrices, gmres otherwise) do not factorize
+the matrix at all, only its preconditioner is prepared once. Solver multigrid is gmres with geometric multigrid
+preconditioner. They are controlled by options:
+    tol - relative tolerance of residual, default 1e-8 (round-off errors of fine meshes do not let reach much less)
+    maxiter - limit of iterations for every right-hand side, default 1000; for gmres it counts restart cycles, not
+        iterations, so its default is 1000 // restart cycles
+    preconditioner - "ilu" (incomplete LU, default), "jacobi", "multigrid" or "none"
+    drop_tol, fill_factor - parameters of incomplete LU
+    restart - number of gmres iterations between restarts, default 20
+    cycle ("V" or "W"), smoothing_steps, min_nodes - parameters of multigrid
+    grid - shape of mesh, set by compute functions
+
+Right-hand sides not solved to tolerance within maxiter are reported in info["converged"] and by ConvergenceWarning,
+elements computed with them raise ConvergenceError.
+
+Matrix-free StencilMatrix operators are never assembled by iterative solvers, they work with multigrid (default for
+them, jacobi if shape of mesh is not given), jacobi and none preconditioners. Direct solvers (dense, sparse, banded)
+reject them, default solver of stencil assembly is multigrid.
+
+Every solver works in precision chosen by option precision:
+    double - default
+    single - A is factorized and x is returned in single precision, which halves memory of factorization
+             (iterative solvers keep operator and preconditioner in single precision, but iterate in double)
+    mixed - A is factorized in single precision and x is improved by iterative refinement, residuals are computed
+            in double precision, controlled by options refinement_tol (default 1e-12) and refinement_maxiter
+            (default 10). Refinement stops when residual does not decrease, which happens if A is too
+            ill-conditioned for single precision, e.g. for very fine meshes.
+Single and mixed precision put relative residual max(|p - A*x| / |p|) of solution in info. Matrix-free operators
+are solved in precision in which they were assembled.
+"""
+
+import warnings
+
+import numpy as np
+import scipy.sparse as sparse
+from scipy.sparse.linalg import splu, spilu, cg, gmres, bicgstab, LinearOperator
+from scipy.linalg import get_lapack_funcs, lu_factor, lu_solve
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+from fidi.fdm_engine.assembly import SparseMatrix, StencilMatrix, precision_dtype
+from fidi.fdm_engine.multigrid import multigrid_preconditioner
+
+MAXITER = 1000
+
+
+class ConvergenceWarning(UserWarning):
+    """Issued when iterative solver stops at maxiter before reaching its tolerance"""
+    pass
+
+
+class ConvergenceError(np.linalg.LinAlgError):
+    """Raised when results of element are not accurate, because iterative solver did not converge"""
+    pass
+
+
+def dense_matrix(A):
+    """Returns A as dense numpy matrix"""
+    if isinstance(A, (SparseMatrix, StencilMatrix)) or sparse.issparse(A):
+        return A.toarray()
+    return A
+
+
+def sparse_matrix(A):
+    """Returns A as compressed sparse column matrix"""
+    if isinstance(A, (SparseMatrix, StencilMatrix)):
+        return A.tocsr().tocsc()
+    return sparse.csc_matrix(A)
+
+
+def factorize_dense(A, options=None):
+    """Reference solver - dense LU decomposition of LAPACK (sgetrf for single precision)"""
+    A = dense_matrix(A)
+    [lu, piv] = lu_factor(A)
+    if np.any(np.diagonal(lu) == 0):
+        raise np.linalg.LinAlgError("Singular matrix")
+    dtype = A.dtype  # A is not kept by solve function, its memory is the memory of factors
+
+    def _solve(p, info=None):
+        if info is not None:
+            info["solver"] = "dense"
+        return lu_solve((lu, piv), np.asarray(p, dtype=dtype))
+    _solve.memory = lu.nbytes + piv.nbytes
+    return _solve
+
+
+def nested_dissection_ordering(grid, min_nodes=64):
+    """Returns permutation of nodes of i x j mesh (perm[new] = old) given by geometric nested dissection - mesh is
+    divided in halves by separators two nodes wide (stencil reaches two nodes in every direction), both halves are
+    numbered first, each of them the same way, and their separator at the end"""
+    (i, j) = grid
+
+    def _dissect(block):
+        (rows, cols) = block.shape
+        if block.size <= min_nodes or max(rows, cols) < 5:
+            return [block.ravel()]
+        if cols < rows:
+            return [part.T for part in _dissect(block.T)]
+        mid = cols // 2
+        return _dissect(block[:, :mid - 1]) + _dissect(block[:, mid + 1:]) + [block[:, mid - 1:mid + 1].ravel()]
+    parts = _dissect(np.arange(i * j).reshape((j, i)))
+    return np.concatenate([part.ravel() for part in parts])
+
+
+def rcm_ordering(A):
+    """Returns reverse Cuthill-McKee permutation of nodes (perm[new] = old), it reduces bandwidth of A"""
+    pattern = sparse.csr_matrix(A, copy=True)
+    pattern.data = np.ones(pattern.nnz)
+    return reverse_cuthill_mckee((pattern + pattern.T).tocsr(), symmetric_mode=True).astype(np.int64)
+
+
+# orderings computed by SuperLU itself, it permutes only columns of A
+SUPERLU_ORDERINGS = {"colamd": "COLAMD", "natural": "NATURAL", "mmd_ata": "MMD_ATA", "mmd_at_plus_a": "MMD_AT_PLUS_A"}
+
+
+def factorize_sparse(A, options=None):
+    """Sparse LU decomposition (SuperLU) with ordering of nodes reducing fill-in
+
+    options - ordering: colamd, natural, mmd_ata, mmd_at_plus_a - column orderings of SuperLU, or
+                        rcm (reverse Cuthill-McKee), nested_dissection (needs grid option) - symmetric permutations
+                        of nodes applied before factorization, solution is permuted back to original numbering.
+                        By default nested dissection is used if shape of mesh is known, colamd otherwise.
+    """
+    options = {} if options is None else options
+    ordering = options.get("ordering", "nested_dissection" if "grid" in options else "colamd")
+    A = sparse_matrix(A)
+    perm = None
+    if ordering in SUPERLU_ORDERINGS:
+        lu = splu(A, permc_spec=SUPERLU_ORDERINGS[ordering])
+    elif ordering in ("rcm", "nested_dissection"):
+        if ordering == "rcm":
+            perm = rcm_ordering(A)
+        elif "grid" in options:
+            perm = nested_dissection_ordering(options["grid"])
+        else:
+            raise ValueError("Nested dissection needs shape of mesh given as grid option")
+        # rows and columns are permuted together, so pivots are kept on diagonal if it is possible
+        lu = splu(A[perm][:, perm].tocsc(), permc_spec="NATURAL", diag_pivot_thresh=0.1,
+                  options={"SymmetricMode": True})
+    else:
+        raise ValueError("Unknown ordering {}, choose one of: {}, rcm, nested_dissection".format(
+            ordering, ", ".join(SUPERLU_ORDERINGS)))
+    memory = (lu.L.nnz + lu.U.nnz) * (lu.L.data.itemsize + lu.L.indices.itemsize) + 2 * lu.perm_r.nbytes
+    fill = (lu.L.nnz + lu.U.nnz - A.shape[0]) / A.nnz  # L and U share diagonal
+    dtype = A.dtype  # A is not kept by solve function
+
+    def _solve(p, info=None):
+        if info is not None:
+            info.update({"solver": "sparse", "ordering": ordering, "fill": fill, "factor_memory": memory})
+        p = np.asarray(p, dtype=dtype)
+        if perm is None:
+            return lu.solve(p)
+        x = np.empty(p.shape, dtype=dtype)
+        x[perm] = lu.solve(p[perm])
+        return x
+    _solve.memory = memory + (0 if perm is None else perm.nbytes)
+    return _solve
+
+
+def transposed_ordering(grid):
+    """Returns permutation numbering nodes of i x j mesh along y dimension first - perm[new] = old, where
+    old = vm * i + m and new = m * j + vm"""
+    (i, j) = grid
+    return np.arange(i * j).reshape((j, i)).T.ravel()
+
+
+def bandwidths(rows, cols):
+    """Returns number of sub-diagonals and super-diagonals of matrix with given non-zero entries"""
+    return max(0, np.max(rows - cols, initial=0)), max(0, np.max(cols - rows, initial=0))
+
+
+def factorize_banded(A, options=None):
+    """Banded LU decomposition (LAPACK gbtrf), bandwidth of FDM matrices is about 2 * number of nodes on x dimension,
+    so if mesh has more nodes on x than on y dimension, nodes are numbered along y dimension first"""
+    options = {} if options is None else options
+    A = sparse_matrix(A).tocoo()
+    n = A.shape[0]
+    [rows, cols] = [A.row, A.col]
+    [kl, ku] = bandwidths(rows, cols)
+    perm = None
+    if "grid" in options:
+        candidate = transposed_ordering(options["grid"])
+        inverse = np.empty(n, dtype=np.int64)
+        inverse[candidate] = np.arange(n)
+        [kl_t, ku_t] = bandwidths(inverse[A.row], inverse[A.col])
+        if kl_t + ku_t < kl + ku:
+            [perm, rows, cols, kl, ku] = [candidate, inverse[A.row], inverse[A.col], kl_t, ku_t]
+    ab = np.zeros((2 * kl + ku + 1, n), dtype=A.dtype)  # LAPACK band storage with kl additional rows for fill-in
+    ab[kl + ku + rows - cols, cols] = A.data
+    [gbtrf, gbtrs] = get_lapack_funcs(("gbtrf", "gbtrs"), dtype=A.dtype)  # sgbtrf for single precision
+    [lu, piv, status] = gbtrf(ab, kl, ku, overwrite_ab=True)
+    if status > 0:
+        raise np.linalg.LinAlgError("Singular matrix")
+    dtype = A.dtype  # A is not kept by solve function
+
+    def _solve(p, info=None):
+        if info is not None:
+            info.update({"solver": "banded", "ordering": "natural" if perm is None else "transposed",
+                         "bandwidth": [int(kl), int(ku)]})
+        p = np.asarray(p, dtype=dtype)
+        [x, status] = gbtrs(lu, kl, ku, p if perm is None else p[perm], piv)
+        if perm is not None:
+            x[perm] = x.copy()
+        return x
+    _solve.memory = lu.nbytes + piv.nbytes + (0 if perm is None else perm.nbytes)
+    return _solve
+
+
+def is_symmetric(A):
+    """Checks if sparse matrix A is exactly symmetric"""
+    return abs(A - A.T).max() == 0
+
+
+def operator_memory(A):
+    """Number of bytes occupied by dense or sparse matrix or matrix-free operator"""
+    if isinstance(A, np.ndarray):
+        return A.nbytes
+    if isinstance(A, StencilMatrix):
+        A = A.boundary
+    return A.data.nbytes + A.indices.nbytes + A.indptr.nbytes
+
+
+def operator_nnz(A):
+    """Number of non-zero coefficients of assembled matrix or matrix-free operator"""
+    if isinstance(A, StencilMatrix):
+        (i, j) = A.grid
+        return A.boundary.nnz + np.count_nonzero(A.coefficients) * max(i - 4, 0) * max(j - 4, 0)
+    if isinstance(A, SparseMatrix):
+        return A.tocsr().nnz
+    if sparse.issparse(A):
+        return A.nnz
+    return np.count_nonzero(A)
+
+
+def condition_estimate(A, solve, iterations=5):
+    """Estimate of condition number of A in 1-norm - norm of A multiplied by growth of vector solved with A, which
+    is repeated a few times like in power method. It is a lower bound, but usually close to the condition number."""
+    norm = abs(sparse_matrix(A)).sum(axis=0).max()
+    x = np.ones((A.shape[0], 1)) / A.shape[0]
+    growth = 0.0
+    for k in range(iterations):
+        y = np.reshape(solve(x), x.shape)
+        growth = np.abs(y).sum() / np.abs(x).sum()
+        x = y / np.abs(y).sum()
+    return float(norm * growth)
+
+
+def operator_profile(A, solve):
+    """Returns number of non-zero coefficients and estimate of condition number of A"""
+    return {"nnz": int(operator_nnz(A)), "condition_estimate": condition_estimate(A, solve)}
+
+
+def ilu_preconditioner(A, options):
+    """Incomplete LU decomposition of A used as approximate inverse of A, returns it with its memory in bytes"""
+    if isinstance(A, StencilMatrix):
+        raise ValueError("Incomplete LU needs assembled matrix, choose jacobi or multigrid preconditioner")
+    ilu = spilu(A.tocsc(), drop_tol=options.get("drop_tol", 1e-4), fill_factor=options.get("fill_factor", 10))
+    memory = (ilu.L.nnz + ilu.U.nnz) * (ilu.L.data.itemsize + ilu.L.indices.itemsize) + 2 * ilu.perm_r.nbytes
+    return LinearOperator(A.shape, lambda b: ilu.solve(np.asarray(b, dtype=A.dtype))), memory
+
+
+def jacobi_preconditioner(A, options):
+    """Inverse of diagonal of A used as approximate inverse of A, returns it with its memory in bytes. Rows with zero
+    on diagonal (boundary rows of shield) are not scaled."""
+    diagonal = A.diagonal()
+    diagonal = np.where(diagonal == 0, 1, diagonal)
+    return LinearOperator(A.shape, lambda b: np.ravel(b) / diagonal), diagonal.nbytes
+
+
+PRECONDITIONERS = {
+    "ilu": ilu_preconditioner,
+    "jacobi": jacobi_preconditioner,
+    "multigrid": multigrid_preconditioner,
+}
+
+
+def factorize_iterative(A, options=None, method="iterative"):
+    """Krylov solver with preconditioner, every column of right-hand side is solved separately"""
+    options = {} if options is None else options
+    if not isinstance(A, StencilMatrix):
+        A = sparse_matrix(A).tocsr()
+    if method == "iterative":
+        method = "cg" if not isinstance(A, StencilMatrix) and is_symmetric(A) else "gmres"
+    krylov = {"cg": cg, "gmres": gmres, "bicgstab": bicgstab}[method]
+    if isinstance(A, StencilMatrix):  # incomplete LU needs explicit coefficients, jacobi alone rarely converges
+        default = "multigrid" if "grid" in options else "jacobi"
+    else:
+        default = "ilu"
+    preconditioner = options.get("preconditioner", default)
+    if preconditioner == "none":
+        [M, memory] = [None, 0]
+    elif preconditioner in PRECONDITIONERS:
+        [M, memory] = PRECONDITIONERS[preconditioner](A, options)
+    else:
+        raise ValueError("Unknown preconditioner {}, choose one of: none, {}".format(preconditioner,
+                                                                                  ", ".join(PRECONDITIONERS)))
+    tol = options.get("tol", 1e-8)
+    restart = options.get("restart", 20)
+    maxiter = options.get("maxiter", max(1, MAXITER // restart) if method == "gmres" else MAXITER)
+    operator = A.aslinearoperator() if isinstance(A, StencilMatrix) else A
+
+    def _solve(p, info=None):
+        # Krylov iterations of single precision operator are done in double precision, only operator and its
+        # preconditioner are stored in single precision - single precision residuals would stop convergence
+        p = np.asarray(p, dtype=np.float64)
+        columns = p.reshape((p.shape[0], -1))
+        x = np.zeros(columns.shape)
+        histories = []
+        converged = []
+        for c in range(columns.shape[1]):
+            b = columns[:, c]
+            norm = np.linalg.norm(b)
+            if norm == 0:  # there is nothing to solve, x = 0
+                histories.append([0.0])
+                converged.append(True)
+                continue
+            history = []
+            if method == "gmres":
+                # gmres reports relative preconditioned residual of every inner iteration
+                kwargs = {"callback": history.append, "callback_type": "pr_norm", "restart": restart}
+            else:
+                kwargs = {"callback": lambda xk: history.append(np.linalg.norm(b - A @ xk) / norm)}
+            [x[:, c], status] = krylov(operator, b, rtol=tol, atol=0.0, maxiter=maxiter, M=M, **kwargs)
+            if status < 0:
+                raise ValueError("Illegal input or breakdown of {} solver".format(method))
+            histories.append(history)
+            converged.append(status == 0)
+        if not all(converged):
+            warnings.warn("{} solver did not reach tolerance {} in {} of {} right-hand sides, maxiter = {}".format(
+                method, tol, converged.count(False), len(converged), maxiter), ConvergenceWarning, stacklevel=2)
+        if info is not None:
+            info.update({"solver": method, "preconditioner": preconditioner, "tol": tol,
+                         "iterations": [len(history) for history in histories], "residuals": histories,
+                         "converged": converged})
+        return x.reshape(p.shape)
+    _solve.memory = operator_memory(A) + memory
+    return _solve
+
+
+def factorize_cg(A, options=None):
+    return factorize_iterative(A, options, "cg")
+
+
+def factorize_gmres(A, options=None):
+    return factorize_iterative(A, options, "gmres")
+
+
+def factorize_bicgstab(A, options=None):
+    return factorize_iterative(A, options, "bicgstab")
+
+
+def factorize_multigrid(A, options=None):
+    options = dict({"preconditioner": "multigrid"}, **({} if options is None else options))
+    return factorize_iterative(A, options, "gmres")
+
+
+SOLVERS = {
+    "dense": factorize_dense,
+    "sparse": factorize_sparse,
+    "banded": factorize_banded,
+    "iterative": factorize_iterative,
+    "cg": factorize_cg,
+    "gmres": factorize_gmres,
+    "bicgstab": factorize_bicgstab,
+    "multigrid": factorize_multigrid,
+}
+MATRIX_FREE_SOLVERS = ["iterative", "cg", "gmres", "bicgstab", "multigrid"]  # solvers working with StencilMatrix
+
+
+def preferred_assembly(solver, assembly=None):
+    """Returns assembly mode in which matrix for given solver should be stored, unless it is chosen explicitly"""
+    if assembly is not None:
+        return assembly
+    if solver in [None, "dense"]:
+        return "dense"
+    else:
+        return "sparse"
+
+
+def default_solver(assembly):
+    """Returns solver used when it is not chosen - dense or sparse for the same assembly, multigrid for stencil"""
+    return "multigrid" if assembly == "stencil" else assembly
+
+
+def single_precision(A):
+    """Returns assembled matrix A with coefficients in single precision, matrix-free operator is returned unchanged"""
+    if isinstance(A, StencilMatrix):
+        return A
+    if isinstance(A, SparseMatrix):
+        A = A.tocsr()
+    return A.astype(np.float32, copy=False)
+
+
+def residual_operator(A):
+    """Returns A in form which may be multiplied by vector, in precision in which it was assembled"""
+    if isinstance(A, SparseMatrix):
+        return A.tocsr()
+    return A
+
+
+def relative_residuals(A, x, p):
+    """Returns relative residual |p - A*x| / |p| of every column of p computed in double precision and residual
+    p - A*x itself"""
+    p = np.asarray(p, dtype=np.float64)
+    r = p - np.reshape(A @ np.asarray(x, dtype=np.float64), p.shape)
+    norms = np.linalg.norm(p.reshape((p.shape[0], -1)), axis=0)
+    return np.linalg.norm(r.reshape((r.shape[0], -1)), axis=0) / np.where(norms == 0, 1, norms), r
+
+
+def single_solver(A, solve):
+    """Returns solve function of single precision, which puts relative residual of its solution in info"""
+    A = residual_operator(A)
+
+    def _solve(p, info=None):
+        x = np.asarray(solve(p, info), dtype=np.float32)
+        if info is not None:
+            info.update({"precision": "single", "residual": float(np.max(relative_residuals(A, x, p)[0]))})
+        return x
+    _solve.memory = solve.memory + operator_memory(A)  # A is kept for residuals
+    return _solve
+
+
+def refined_solver(A, solve, options):
+    """Returns solve function of mixed precision - solution of single precision solve function is improved by
+    iterative refinement, correction d of solution x is solved from A*d = p - A*x with residual computed in double
+    precision"""
+    tol = options.get("refinement_tol", 1e-12)
+    maxiter = options.get("refinement_maxiter", 10)
+    A = residual_operator(A)
+
+    def _solve(p, info=None):
+        x = np.asarray(solve(p, info), dtype=np.float64)
+        [residuals, r] = relative_residuals(A, x, p)
+        history = [float(np.max(residuals))]
+        while history[-1] > tol and len(history) <= maxiter:
+            corrected = x + np.reshape(solve(r), x.shape)
+            [residuals, corrected_r] = relative_residuals(A, corrected, p)
+            if np.max(residuals) >= history[-1]:
+                break  # refinement stagnates, A is too ill-conditioned for single precision
+            [x, r] = [corrected, corrected_r]
+            history.append(float(np.max(residuals)))
+        if info is not None:
+            info.update({"precision": "mixed", "residual": history[-1], "refinement_residuals": history,
+                         "refinement_converged": history[-1] <= tol})
+        return x
+    _solve.memory = solve.memory + operator_memory(A)
+    return _solve
+
+
+def hashable(value):
+    """Returns value with lists, arrays and dictionaries turned into tuples, so it may be a part of key"""
+    if isinstance(value, dict):
+        return tuple(sorted((str(key), hashable(item)) for key, item in value.items()))
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        return tuple(hashable(item) for item in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def solver_key(solver, options=None):
+    """Returns description of solver and its options, which may be a part of key of factorized operator"""
+    if not options:
+        return solver
+    return (solver,) + hashable(options)
+
+
+def factorize(A, solver="dense", options=None):
+    """Returns function solving A*x = p with chosen solver in precision given by option precision"""
+    if solver not in SOLVERS:
+        raise ValueError("Unknown solver {}, choose one of: {}".format(solver, ", ".join(SOLVERS)))
+    if isinstance(A, StencilMatrix) and solver not in MATRIX_FREE_SOLVERS:
+        raise ValueError("Solver {} needs assembled matrix, choose one of: {} for stencil assembly".format(
+            solver, ", ".join(MATRIX_FREE_SOLVERS)))
+    precision = (options or {}).get("precision", "double")
+    precision_dtype(precision)  # unknown precision is reported before factorization
+    if precision == "double":
+        return SOLVERS[solver](A, options)
+    solve = SOLVERS[solver](single_precision(A), options)
+    if precision == "single":
+        return single_solver(A, solve)
+    return refined_solver(A, solve, options)
+
+
+def solve(A, p, solver="dense", options=None, info=None):
+    """Solves A*x = p with chosen solver"""
+    return factorize(A, solver, options)(p, info)
@@ -0,0 +1,38 @@
+"""This part of program is responsible for solving plates hinged on all edges without assembling any matrix
+
+Displacements of hinged edges are equal to zero and their second derivatives too, so equations of all interior nodes
+of such plate are exactly L*L*w = p, where L is five-point Laplace operator of interior nodes with zero values
+outside. Discrete sine transform diagonalizes L - its eigenvalues on mesh of k nodes are 4 * sin(s*pi / (2k + 2))^2
+for s = 1, ..., k on every dimension - so the whole system is solved with two transforms in O(n log n) operations.
+"""
+
+import numpy as np
+from scipy.fft import dstn, idstn
+
+
+def hinged_on_all_edges(supports, grid):
+    """Checks if plate of i x j nodes is hinged on all edges and has any interior node"""
+    return all(supports[edge] == 1 for edge in ["top", "bottom", "left", "right"]) and min(grid) >= 3
+
+
+def laplacian_eigenvalues(k):
+    """Eigenvalues of one dimensional operator [-1, 2, -1] on k nodes with zero values outside, in order of sine
+    transform coefficients"""
+    return 4 * np.sin(np.arange(1, k + 1) * np.pi / (2 * k + 2)) ** 2
+
+
+def solve_hinged_plate(load, grid, info=None):
+    """Solves equations of plate hinged on all edges for load of interior nodes (q * density^4 / Dp, or values for
+    following load cases) and returns vector of displacements of all nodes, node = vm * i + m, with load cases as
+    the last dimension"""
+    (i, j) = grid
+    load = np.asarray(load, dtype=np.float64)
+    cases = (1,) * load.ndim
+    p = np.broadcast_to(load, (j - 2, i - 2) + load.shape)
+    eigenvalues = laplacian_eigenvalues(j - 2)[:, None] + laplacian_eigenvalues(i - 2)[None, :]
+    coefficients = dstn(p, type=1, axes=(0, 1), norm="ortho") / (eigenvalues ** 2).reshape(eigenvalues.shape + cases)
+    W = np.zeros((j, i) + load.shape)
+    W[1:j - 1, 1:i - 1] = idstn(coefficients, type=1, axes=(0, 1), norm="ortho")
+    if info is not None:
+        info["solver"] = "spectral"
+    return W.reshape((i * j,) + load.shape)
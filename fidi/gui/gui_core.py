@@ -1,12 +1,13 @@
 """This part of program is responsible for joining all parts of GUI and adds functionality to all windows, that is not
 assigned in QTdesigner - opening other windows and importing given data"""
 
-from PySide2 import QtWidgets
+from PySide2 import QtWidgets, QtCore
 
 from fidi.gui.Ui import starting_window, about_fidi, plate_window, shield_window, shell_window
 from fidi.attributes.collecting_attributes import gui_input_attributes as att
 from fidi.attributes.saving_attributes import gui_save_file
 from fidi.attributes import loading_attributes as obj
+from fidi.fdm_engine.progress import STAGES, ComputationCancelled
 import json
 import datetime
 import matplotlib.pyplot as plt
@@ -14,6 +15,39 @@ import matplotlib.cm as cm
 import matplotlib.colors
 
 
+class ComputeWorker(QtCore.QObject):
+    """Computes prism in other thread than windows, so they are responsive during long calculations"""
+    stage = QtCore.Signal(str)         # name of started stage of calculations
+    finished = QtCore.Signal(object)   # time of calculations
+    failed = QtCore.Signal(str)
+    cancelled = QtCore.Signal()
+
+    def __init__(self, prism):
+        super(ComputeWorker, self).__init__()
+        self.prism = prism
+        self._cancel = False
+
+    def cancel(self):
+        """Stops calculations at the beginning of their next stage, it is called directly from GUI thread"""
+        self._cancel = True
+
+    def progress(self, stage):
+        if self._cancel:
+            raise ComputationCancelled()
+        self.stage.emit(stage)
+
+    def run(self):
+        start = datetime.datetime.now()
+        try:
+            self.prism.compute(progress=self.progress)
+        except ComputationCancelled:
+            self.cancelled.emit()
+        except Exception as error:
+            self.failed.emit("{}: {}".format(type(error).__name__, error))
+        else:
+            self.finished.emit(datetime.datetime.now() - start)
+
+
 class FidiInterface(starting_window.Ui_StartingWindow, QtWidgets.QMainWindow):
     """Class opening starting window of GUI and importing all methods of classes created by QTdesigner"""
     def __init__(self):
@@ -26,6 +60,9 @@ class FidiInterface(starting_window.Ui_StartingWindow, QtWidgets.QMainWindow):
         self.prism = None
         self.data_error = 0
         self.stability_error = 0
+        self.compute_thread = None
+        self.compute_worker = None
+        self.progress_dialog = None
         # Added functions :
         self.setWindowTitle("FIDI")
         self.InfoButton.clicked.connect(self.open_info)
@@ -260,6 +297,9 @@ class FidiInterface(starting_window.Ui_StartingWindow, QtWidgets.QMainWindow):
     def calculate(self):
         """Creates prism object and uses compute method, different for each type of element"""
 
+        if self.computation_running():
+            return
+
         if self.data_error > 0:
             self.check_shield_data()
             if self.data_error > 0:
@@ -293,17 +333,79 @@ class FidiInterface(starting_window.Ui_StartingWindow, QtWidgets.QMainWindow):
                    'density': input_data[0][9],
                    'supports': input_data[0][10]}
             if type_of_element == 1:
-                self.prism = obj.Shield(data)
+                prism = obj.Shield(data)
             elif type_of_element == 2:
-                self.prism = obj.Plate(data)
+                prism = obj.Plate(data)
             else:
-                self.prism = obj.Shell(data)
+                prism = obj.Shell(data)
+
+            self.numeric_supports(prism.supports)
+            self.start_computation(prism)
 
-            self.numeric_supports(self.prism.supports)
-            start = datetime.datetime.now()
-            self.prism.compute()
-            duration = datetime.datetime.now() - start  # time of calculations
-            self.warning("Calculations completed, time of solving - {}".format(duration))
+    def start_computation(self, prism):
+        """Computes prism in worker thread and shows progress of calculations with button cancelling them,
+        computed prism replaces the previous one only when calculations are completed. Request to start while
+        calculations are still running is ignored."""
+        if self.computation_running():
+            return
+        self.progress_dialog = QtWidgets.QProgressDialog("Calculations", "Cancel", 0, len(STAGES))
+        self.progress_dialog.setWindowTitle("FIDI")
+        self.progress_dialog.setWindowModality(QtCore.Qt.ApplicationModal)
+        self.progress_dialog.setMinimumDuration(0)
+        self.progress_dialog.setValue(0)
+        # worker is busy in its thread, so its cancel method is called from this thread
+        self.progress_dialog.canceled.connect(self.cancel_computation)
+
+        self.compute_thread = QtCore.QThread()
+        self.compute_worker = ComputeWorker(prism)
+        self.compute_worker.moveToThread(self.compute_thread)
+        self.compute_thread.started.connect(self.compute_worker.run)
+        self.compute_worker.stage.connect(self.computation_stage)
+        self.compute_worker.finished.connect(self.computation_finished)
+        self.compute_worker.failed.connect(self.computation_failed)
+        self.compute_worker.cancelled.connect(self.computation_cancelled)
+        for signal in [self.compute_worker.finished, self.compute_worker.failed, self.compute_worker.cancelled]:
+            signal.connect(self.compute_thread.quit)
+        # Qt objects are released when thread ends, only then next calculations may start
+        self.compute_thread.finished.connect(self.compute_worker.deleteLater)
+        self.compute_thread.finished.connect(self.compute_thread.deleteLater)
+        self.compute_thread.finished.connect(self.computation_ended)
+        self.compute_thread.start()
+
+    def computation_running(self):
+        """Returns True and informs user, if calculations started before have not ended yet"""
+        if self.compute_thread is None:
+            return False
+        self.warning("Calculations are still running, please wait until they stop")
+        return True
+
+    def computation_ended(self):
+        self.compute_thread = None
+        self.compute_worker = None
+
+    def cancel_computation(self):
+        if self.compute_worker is not None:
+            self.compute_worker.cancel()
+
+    def computation_stage(self, stage):
+        """Shows started stage of calculations, parts of shell report stages like "plate solve" """
+        self.progress_dialog.setLabelText("Calculations - {}".format(stage))
+        reached = max((k for k in range(len(STAGES)) if stage.endswith(STAGES[k])),
+                      default=self.progress_dialog.value())  # unknown stage does not move progress
+        self.progress_dialog.setValue(max(self.progress_dialog.value(), reached))
+
+    def computation_finished(self, duration):
+        self.prism = self.compute_worker.prism
+        self.progress_dialog.setValue(len(STAGES))
+        self.warning("Calculations completed, time of solving - {}".format(duration))
+
+    def computation_failed(self, text):
+        self.progress_dialog.reset()
+        self.warning("Calculations failed - {}".format(text))
+
+    def computation_cancelled(self):
+        self.progress_dialog.reset()
+        self.warning("Calculations cancelled")
 
     def warning(self, text):
         """Opens message box, that informs user input is inappropriate"""
@@ -0,0 +1,59 @@
+"""Elements shared by tests - small meshes, support layouts and loads, computed with chosen settings of solver"""
+
+import copy
+
+import numpy as np
+
+from fidi.attributes.loading_attributes import element_from_data
+from fidi.fdm_engine.fdm_plate_algorithm import compute_plate
+from fidi.fdm_engine.fdm_shield_algorithm import compute_shield
+
+SUPPORTS = [  # 0 - free end  1 - hinged  2 - fixed
+    {"bottom": 2, "left": 2, "right": 2, "top": 2},
+    {"bottom": 2, "left": 0, "right": 1, "top": 0},
+    {"bottom": 1, "left": 2, "right": 0, "top": 1},
+]
+# operator of shield is regular only if its left edge is free, other layouts have no unique solution to compare
+SHIELD_SUPPORTS = [
+    {"bottom": 2, "left": 0, "right": 2, "top": 2},
+    {"bottom": 1, "left": 0, "right": 0, "top": 2},
+    {"bottom": 2, "left": 0, "right": 1, "top": 0},
+]
+HINGED = {"bottom": 1, "left": 1, "right": 1, "top": 1}
+SHAPES = [(9, 9), (7, 12)]
+
+SHIELD_LOADS = {"x_direction": {"bottom": 0.0, "left": 3.0, "right": 0.0, "top": 1.0},
+                "y_direction": {"bottom": 0.0, "left": 0.0, "right": 2.0, "top": 10.0}}
+
+
+def plate(supports, shape, q=2000, **settings):
+    return compute_plate([None, None, np.zeros(shape)], 0.2, q, supports, 0.5, 0.3, 0.25, **settings)
+
+
+def shield(supports, shape, loads=SHIELD_LOADS, **settings):
+    return compute_shield([np.zeros(shape), np.zeros(shape), None], 0.2, loads, supports, 1, 0.2, 0.15, **settings)
+
+
+def assert_results_close(results, reference, rtol):
+    for name in reference.names:
+        scale = max(np.max(np.abs(reference[name])), 1e-300)
+        assert np.max(np.abs(results[name] - reference[name])) <= rtol * scale, name
+
+# definitions of elements like in json files, shield has free loaded edges so both its directions are solved
+PLATE = {"density": 0.1, "geometry": {"height": 0.9, "thickness": 20.0, "width": 1.2}, "loads_plate": 5.0,
+         "loads_shield": {"x_direction": {"bottom": 0.0, "left": 0.0, "right": 0.0, "top": 0.0},
+                          "y_direction": {"bottom": 0.0, "left": 0.0, "right": 0.0, "top": 0.0}},
+         "material": {"E": 30.0, "v": 0.2}, "name": "plate", "object_type": "plate",
+         "supports": {"bottom": 2, "left": 0, "right": 1, "top": 2}}
+SHELL = dict(PLATE, name="shell", object_type="shell",
+             loads_shield={"x_direction": {"bottom": 0.0, "left": 4.0, "right": 0.0, "top": 1.0},
+                           "y_direction": {"bottom": 0.0, "left": 0.0, "right": 0.0, "top": 10.0}},
+             supports={"bottom": 2, "left": 0, "right": 1, "top": 0})
+SHIELD = dict(SHELL, name="shield", object_type="shield")
+
+
+def element(data, **settings):
+    """Element created from copy of definition and computed with given settings"""
+    created = element_from_data(copy.deepcopy(data))
+    created.compute(**settings)
+    return created
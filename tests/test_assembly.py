@@ -0,0 +1,43 @@
+"""Tests of assembly of FDM scheme equations - sparse storage has to give exactly the dense matrix"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from fidi.fdm_engine.fdm_plate_algorithm import assemble_plate
+from fidi.fdm_engine.fdm_shield_algorithm import assemble_shield_one_direction
+from tests.cases import SHAPES, SHIELD_LOADS, SUPPORTS, SHIELD_SUPPORTS, plate, shield, assert_results_close
+
+ALL_SUPPORTS = [dict(zip(["bottom", "left", "right", "top"], layout)) for layout in itertools.product([0, 1, 2],
+                                                                                                       repeat=4)]
+
+
+@pytest.mark.parametrize("supports", ALL_SUPPORTS)
+def test_sparse_plate_matrix_equals_dense(supports):
+    displacements = [None, None, np.zeros(SHAPES[1])]
+    [A, p] = assemble_plate(displacements, 0.2, 2000, supports, 0.5, 0.3, "dense")
+    [S, sparse_p] = assemble_plate(displacements, 0.2, 2000, supports, 0.5, 0.3, "sparse")
+    assert np.array_equal(S.toarray(), A) and np.array_equal(sparse_p, p)
+
+
+@pytest.mark.parametrize("supports", ALL_SUPPORTS)
+@pytest.mark.parametrize("direction", ["vertical", "horizontal"])
+def test_sparse_shield_matrix_equals_dense(supports, direction):
+    displacements = [np.zeros(SHAPES[1]), np.zeros(SHAPES[1]), None]
+    [A, p] = assemble_shield_one_direction(displacements, 0.2, SHIELD_LOADS, supports, 1, 0.2, direction, "dense")
+    [S, sparse_p] = assemble_shield_one_direction(displacements, 0.2, SHIELD_LOADS, supports, 1, 0.2, direction,
+                                                  "sparse")
+    assert np.array_equal(S.toarray(), A) and np.array_equal(sparse_p, p)
+
+
+@pytest.mark.parametrize("supports", SUPPORTS)
+@pytest.mark.parametrize("shape", SHAPES)
+def test_plate_of_sparse_assembly_matches_dense(supports, shape):
+    assert_results_close(plate(supports, shape, assembly="sparse", solver="dense"), plate(supports, shape), 1e-12)
+
+
+@pytest.mark.parametrize("supports", SHIELD_SUPPORTS)
+@pytest.mark.parametrize("shape", SHAPES)
+def test_shield_of_sparse_assembly_matches_dense(supports, shape):
+    assert_results_close(shield(supports, shape, assembly="sparse", solver="dense"), shield(supports, shape), 1e-12)
@@ -0,0 +1,61 @@
+"""Tests of batch runner - every element file has to give the same results as element computed alone, broken files
+are reported in summary without stopping the others"""
+
+import csv
+import json
+import os
+
+import numpy as np
+
+from fidi.attributes import loading_attributes
+from fidi.attributes.batch_runner import SUMMARY_FIELDS, element_files, run_batch
+from tests.cases import PLATE, SHELL, SHIELD, element
+
+ELEMENTS = {"plate": PLATE, "shell": SHELL, "shield": SHIELD}
+
+
+def write_elements(directory):
+    for [name, data] in ELEMENTS.items():
+        with open(os.path.join(directory, name + ".json"), "w") as element_file:
+            json.dump(data, element_file)
+    with open(os.path.join(directory, "broken.json"), "w") as element_file:
+        element_file.write('{"name": "broken"')
+
+
+def test_element_files_of_directory(tmp_path):
+    write_elements(str(tmp_path))
+    names = [os.path.basename(path) for path in element_files(str(tmp_path))]
+    assert names == ["broken.json", "plate.json", "shell.json", "shield.json"]
+
+
+def test_batch_saves_results_of_every_element(tmp_path):
+    [elements, output] = [str(tmp_path / "elements"), str(tmp_path / "output")]
+    os.makedirs(elements)
+    write_elements(elements)
+    rows = {os.path.basename(row["file"]): row for row in run_batch(elements, output, "sparse", workers=1)}
+    with open(os.path.join(output, "summary.csv"), newline="") as summary_file:
+        summary = list(csv.DictReader(summary_file))
+    assert len(summary) == 4 and list(summary[0]) == SUMMARY_FIELDS
+    assert rows["broken.json"]["error"].startswith("JSONDecodeError")
+    for [name, data] in ELEMENTS.items():
+        row = rows[name + ".json"]
+        assert not row.get("error") and row["object_type"] == data["object_type"]
+        reference = element(data, solver="sparse")
+        with np.load(os.path.join(output, row["results"])) as archive:
+            saved = [archive["arr_{}".format(k)] for k in range(len(archive.files))]
+        assert len(saved) == len(reference.result_names)
+        for array, result_name in zip(saved, reference.result_names):
+            assert np.allclose(array, reference.results[result_name], rtol=1e-10, atol=0), result_name
+
+
+def test_batch_takes_computed_elements_from_cache(tmp_path, monkeypatch):
+    [elements, output, cache] = [str(tmp_path / "elements"), str(tmp_path / "output"), str(tmp_path / "cache")]
+    os.makedirs(elements)
+    write_elements(elements)
+    first = {row["file"]: row for row in run_batch(elements, output, "sparse", workers=1, cache_directory=cache)}
+    monkeypatch.setattr(loading_attributes.fdm_plate, "compute_plate", None)  # nothing may be computed again
+    monkeypatch.setattr(loading_attributes.fdm_shield, "compute_shield", None)
+    second = {row["file"]: row for row in run_batch(elements, output, "sparse", workers=1, cache_directory=cache)}
+    for path in first:
+        assert first[path].get("max_displacement") == second[path].get("max_displacement")
+        assert first[path].get("error") == second[path].get("error")
@@ -0,0 +1,81 @@
+"""Tests of cache of factorized operators - cached operator gives the same results without assembling it again"""
+
+import gc
+import itertools
+import weakref
+
+import numpy as np
+import pytest
+
+from fidi.fdm_engine import solvers, fdm_plate_algorithm, fdm_shield_algorithm
+from fidi.fdm_engine.factorization_cache import FactorizationCache
+from tests.cases import SHAPES, SUPPORTS, SHIELD_SUPPORTS, SHIELD_LOADS, plate, shield, assert_results_close
+
+ALL_SUPPORTS = [dict(zip(["bottom", "left", "right", "top"], layout)) for layout in itertools.product([0, 1, 2],
+                                                                                                       repeat=4)]
+
+
+@pytest.mark.parametrize("supports", ALL_SUPPORTS)
+def test_load_vectors_equal_assembled_ones(supports):
+    displacements = [np.zeros(SHAPES[1]), np.zeros(SHAPES[1]), np.zeros(SHAPES[1])]
+    q = np.array([2000.0, 1.5])
+    p = fdm_plate_algorithm.assemble_plate(displacements, 0.2, q, supports, 0.5, 0.3, "sparse")[1]
+    assert np.array_equal(fdm_plate_algorithm.load_plate(displacements, 0.2, q, supports, 0.5), p)
+    for direction in ["vertical", "horizontal"]:
+        p = fdm_shield_algorithm.assemble_shield_one_direction(displacements, 0.2, SHIELD_LOADS, supports, 1, 0.2,
+                                                               direction, "sparse")[1]
+        load = fdm_shield_algorithm.load_shield_one_direction(displacements, SHIELD_LOADS, supports, 1, direction)
+        assert np.array_equal(load, p)
+
+
+def test_cached_operator_is_not_assembled_again(monkeypatch):
+    cache = FactorizationCache()
+    first = plate(SUPPORTS[1], SHAPES[1], assembly="sparse", solver="sparse", cache=cache)
+    monkeypatch.setattr(fdm_plate_algorithm, "assemble_plate", None)  # any call of it would fail
+    second = plate(SUPPORTS[1], SHAPES[1], q=1000, assembly="sparse", solver="sparse", cache=cache)
+    assert cache.hits == 1
+    for name in first.names:  # results are proportional to load
+        assert np.allclose(2 * second[name], first[name], rtol=1e-12, atol=0), name
+
+
+def test_cached_shield_operators_give_the_same_results(monkeypatch):
+    cache = FactorizationCache()
+    first = shield(SHIELD_SUPPORTS[2], SHAPES[1], assembly="sparse", solver="sparse", cache=cache)
+    monkeypatch.setattr(fdm_shield_algorithm, "assemble_shield_one_direction", None)
+    second = shield(SHIELD_SUPPORTS[2], SHAPES[1], assembly="sparse", solver="sparse", cache=cache)
+    assert cache.hits == 2
+    assert_results_close(second, first, 0)
+
+
+def test_other_material_is_not_taken_from_cache():
+    cache = FactorizationCache()
+    plate(SUPPORTS[1], SHAPES[1], cache=cache)
+    fdm_plate_algorithm.compute_plate([None, None, np.zeros(SHAPES[1])], 0.2, 2000, SUPPORTS[1], 0.5, 0.25, 0.25,
+                                      cache=cache)
+    assert cache.hits == 0 and len(cache) == 2
+
+
+@pytest.mark.parametrize("solver", ["dense", "sparse", "banded"])
+def test_solve_function_does_not_keep_matrix(solver):
+    A = fdm_plate_algorithm.assemble_plate([None, None, np.zeros(SHAPES[0])], 0.2, 2000, SUPPORTS[0], 0.5, 0.3,
+                                           "dense")[0]
+    matrix = weakref.ref(A)
+    solve = solvers.factorize(A, solver)
+    del A
+    gc.collect()
+    assert matrix() is None and solve.memory > 0
+
+
+def test_least_recently_used_operator_is_evicted():
+    A = fdm_plate_algorithm.assemble_plate([None, None, np.zeros(SHAPES[0])], 0.2, 2000, SUPPORTS[0], 0.5, 0.3,
+                                           "dense")[0]
+    memory = solvers.factorize(A, "dense").memory
+    cache = FactorizationCache(max_memory=2 * memory)
+    for key in ["first", "second", "third"]:
+        cache.factorize(key, A, "dense")
+    assert "first" not in cache and "third" in cache and cache.memory <= 2 * memory
+
+
+def test_solver_key_accepts_unhashable_options():
+    key = solvers.solver_key("gmres", {"tol": 1e-8, "grid": [9, 9], "levels": {"b": 1, "a": [2]}})
+    assert hash(key) == hash(solvers.solver_key("gmres", {"levels": {"a": [2], "b": 1}, "grid": (9, 9), "tol": 1e-8}))
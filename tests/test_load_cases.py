@@ -0,0 +1,29 @@
+"""Tests of solving many load cases at once - every load case has to give the same results as solved alone"""
+
+import copy
+
+import numpy as np
+import pytest
+
+from tests.cases import PLATE, SHELL, SHIELD, element
+
+LOAD_CASES = [
+    {"loads_plate": 5.0, "loads_shield": SHELL["loads_shield"]},
+    {"loads_plate": -2.0, "loads_shield": {"x_direction": {"bottom": 0.0, "left": 0.0, "right": 0.0, "top": 3.0},
+                                           "y_direction": {"bottom": 0.0, "left": 1.0, "right": 0.0, "top": 0.0}}},
+    {"loads_plate": 0.0, "loads_shield": {"x_direction": {"bottom": 0.0, "left": 0.0, "right": 0.0, "top": 0.0},
+                                          "y_direction": {"bottom": 0.0, "left": 0.0, "right": 0.0, "top": 0.0}}},
+]
+
+
+@pytest.mark.parametrize("data", [PLATE, SHIELD, SHELL])
+@pytest.mark.parametrize("settings", [{}, {"solver": "sparse"}])
+def test_stacked_load_cases_equal_single_solves(data, settings):
+    stacked = element(data).compute_load_cases(LOAD_CASES, **settings)
+    for case, load_case in enumerate(LOAD_CASES):
+        single = element(dict(copy.deepcopy(data), **copy.deepcopy(load_case)), **settings).results
+        assert stacked.names == single.names
+        for name in single.names:
+            assert stacked[name].shape == (len(LOAD_CASES),) + single[name].shape
+            scale = max(np.max(np.abs(single[name])), 1e-300)
+            assert np.max(np.abs(stacked[name][case] - single[name])) <= 1e-10 * scale, name
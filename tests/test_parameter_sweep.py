@@ -0,0 +1,39 @@
+"""Tests of parametric studies - every combination has to give the same results as element computed alone"""
+
+import csv
+import os
+
+import numpy as np
+import pytest
+
+from fidi.attributes.parameter_sweep import SUMMARY_FIELDS, combinations, parameter_values, swept_data, sweep
+from tests.cases import PLATE, SHELL, element
+
+RANGES = {"thickness": [15.0, 25.0], "E": [30.0], "v": [0.15, 0.25]}
+
+
+def test_parameter_values():
+    assert parameter_values("0.2") == [0.2]
+    assert np.allclose(parameter_values("10:20:3"), [10, 15, 20])
+
+
+def test_combinations_of_given_parameters():
+    assert combinations(RANGES) == [{"thickness": t, "E": 30.0, "v": v} for t in [15.0, 25.0] for v in [0.15, 0.25]]
+
+
+@pytest.mark.parametrize("data", [PLATE, SHELL])
+def test_sweep_saves_results_of_every_combination(data, tmp_path):
+    rows = list(sweep(data, RANGES, str(tmp_path), solver="sparse", workers=1))
+    assert sorted(row["index"] for row in rows) == list(range(4))
+    with open(os.path.join(str(tmp_path), "sweep.csv"), newline="") as summary_file:
+        summary = list(csv.DictReader(summary_file))
+    assert len(summary) == 4 and list(summary[0]) == SUMMARY_FIELDS
+    for row in rows:
+        assert not row.get("error")
+        reference = element(swept_data(data, combinations(RANGES)[row["index"]]), solver="sparse")
+        with np.load(os.path.join(str(tmp_path), row["file"])) as archive:
+            saved = [archive["arr_{}".format(k)] for k in range(len(archive.files))]
+        assert len(saved) == len(reference.result_names)
+        for array, name in zip(saved, reference.result_names):
+            assert np.allclose(array, reference.results[name], rtol=1e-10, atol=0), name
+        assert row["thickness"] == combinations(RANGES)[row["index"]]["thickness"]
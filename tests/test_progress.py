@@ -0,0 +1,78 @@
+"""Tests of reporting and timing stages of calculations"""
+
+import copy
+
+import pytest
+
+from fidi.attributes.loading_attributes import element_from_data
+from fidi.fdm_engine.progress import STAGES, ComputationCancelled, StageTimer, part_progress
+from tests.cases import SUPPORTS, SHIELD_SUPPORTS, SHAPES, SHELL, plate, shield, element
+
+SETTINGS = [{"solver": "dense"}, {"assembly": "sparse", "solver": "sparse"}]
+
+
+def in_order(stages):
+    """Returns True if stages are reported in order of STAGES, stages may be repeated or left out"""
+    positions = [STAGES.index(stage) for stage in stages]
+    return positions == sorted(positions)
+
+
+def test_stage_timer_sums_repeated_stages():
+    [reported, profiled] = [[], []]
+    timer = StageTimer(reported.append, lambda stage, seconds: profiled.append(stage))
+    for stage in ["allocation", "solve", "solve"]:
+        timer(stage)
+    timer.stop()
+    assert reported == ["allocation", "solve", "solve"] and profiled == reported
+    assert list(timer.timings) == ["allocation", "solve"]
+    other = StageTimer()
+    other("solve")
+    other.stop()
+    timer.merge(other)
+    assert list(timer.timings) == ["allocation", "solve"] and all(seconds >= 0 for seconds in timer.timings.values())
+
+
+def test_part_progress_reports_name_of_part():
+    reported = []
+    part_progress(lambda *values: reported.append(values), "plate")("solve", 0.5)
+    assert reported == [("plate solve", 0.5)] and part_progress(None, "plate") is None
+
+
+@pytest.mark.parametrize("settings", SETTINGS)
+def test_stages_of_plate(settings):
+    [info, reported, profiled] = [{}, [], []]
+    plate(SUPPORTS[0], SHAPES[1], info=info, progress=reported.append,
+          profiler=lambda stage, seconds: profiled.append([stage, seconds]), **settings)
+    assert in_order(reported) and reported[-1] == "recovery"
+    assert [stage for [stage, seconds] in profiled] == reported
+    assert list(info["timings"]) == reported and set(info["timings"]) <= set(STAGES)
+    assert "nnz" in info and "condition_estimate" in info  # profile of operator is given to profiler
+
+
+@pytest.mark.parametrize("settings", SETTINGS)
+def test_stages_of_shield(settings):
+    [info, reported] = [{}, []]
+    shield(SHIELD_SUPPORTS[0], SHAPES[1], info=info, progress=reported.append, **settings)
+    assert set(reported) == set(info["timings"]) and set(info["timings"]) <= set(STAGES)
+    assert "factorization" in info["timings"] and "solve" in info["timings"]
+
+
+def test_stages_of_shell_are_reported_with_parts():
+    reported = []
+    shell = element(SHELL, cache=None, progress=reported.append)
+    parts = {stage.split(" ")[0] for stage in reported}
+    assert parts == {"plate", "shield"}
+    assert all(stage.split(" ", 1)[1] in STAGES for stage in reported)
+    assert set(shell.solver_info["plate"]["timings"]) <= set(STAGES)
+
+
+def test_progress_cancels_calculations():
+    def cancel(stage):
+        if stage.endswith("factorization"):  # stages of shell are reported with name of part
+            raise ComputationCancelled()
+    with pytest.raises(ComputationCancelled):
+        plate(SUPPORTS[0], SHAPES[0], solver="dense", progress=cancel)
+    cancelled = element_from_data(copy.deepcopy(SHELL))
+    with pytest.raises(ComputationCancelled):
+        cancelled.compute(cache=None, progress=cancel)
+    assert not cancelled.computed
@@ -0,0 +1,44 @@
+"""Tests of cache of results on disk - element computed again with the same settings is taken from cache"""
+
+import copy
+
+import numpy as np
+
+from fidi.attributes.loading_attributes import element_from_data
+from fidi.attributes.result_cache import ResultCache, result_key, element_key
+from tests.cases import PLATE, SHELL, element
+
+
+def test_result_cache_round_trip(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    computed = element(PLATE, result_cache=cache)
+    assert cache.misses == 1 and len(cache) == 1
+    again = element(PLATE, result_cache=cache)
+    assert cache.hits == 1 and again.solver_info["result_cache"] == computed.solver_info["result_cache"]
+    for name in computed.results.names:
+        assert np.array_equal(again.results[name], computed.results[name]), name
+    shell_names = element_from_data(copy.deepcopy(SHELL)).result_names
+    assert cache.get(computed.result_key(), shell_names) is None  # results of other type of element
+
+
+def test_result_cache_keys():
+    other_load = dict(copy.deepcopy(PLATE), loads_plate=6.0)
+    assert result_key(PLATE, "dense", "dense", None) == result_key(dict(PLATE, name="other"), "dense", "dense", {})
+    assert result_key(PLATE, "dense", "dense", None) != result_key(other_load, "dense", "dense", None)
+    assert result_key(PLATE, "dense", "dense", None) != result_key(PLATE, "sparse", "sparse", None)
+    assert element_key(dict(PLATE, density=0.1)) == element_key(dict(PLATE, density=1e-1))
+    assert element_key(dict(copy.deepcopy(PLATE), loads_plate=5)) == element_key(PLATE)
+
+
+def test_result_cache_invalidation_and_size(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    computed = element(PLATE, result_cache=cache)
+    element(PLATE, solver="sparse", result_cache=cache)
+    element(SHELL, result_cache=cache)
+    assert len(cache) == 3
+    assert cache.invalidate_element(PLATE) == 2 and len(cache) == 1
+    assert not cache.invalidate(computed.result_key())
+    cache.resize(0)
+    assert len(cache) == 0 and cache.size == 0
+    element(PLATE, result_cache=cache)  # larger than limit of cache, so it is not stored at all
+    assert len(cache) == 0
@@ -0,0 +1,49 @@
+"""Tests of archives of results - element loaded from archive has to have the same results as computed one"""
+
+import copy
+
+import numpy as np
+import pytest
+
+from fidi.attributes import results_archive
+from fidi.attributes.loading_attributes import element_from_data, load_element
+from tests.cases import PLATE, SHELL, element
+
+
+def assert_same_results(results, reference):
+    assert list(results.names) == list(reference.names)
+    for name in reference.names:
+        assert np.array_equal(results[name], reference[name]), name
+
+
+@pytest.mark.parametrize("data", [PLATE, SHELL])
+@pytest.mark.parametrize("mmap", [True, False])
+def test_archive_round_trip(tmp_path, data, mmap):
+    computed = element(data)
+    path = computed.save_results(str(tmp_path / "element"))
+    loaded = load_element(path, mmap)
+    assert loaded.computed and type(loaded) is type(computed)
+    assert_same_results(loaded.results, computed.results)
+    [definition, names, results] = results_archive.load_results(path, mmap)
+    assert definition == data and names == computed.result_names
+
+
+def test_archive_does_not_store_zero_fields(tmp_path):
+    computed = element(PLATE)
+    path = computed.save_results(str(tmp_path / "plate"))
+    with np.load(path) as archive:
+        assert len(archive.files) < len(computed.result_names)
+    loaded = load_element(path)
+    assert computed.results.is_zero("u") and not np.any(loaded.results["u"])
+    assert loaded.results["u"].shape == computed.results["w"].shape
+
+
+def test_element_with_other_names_is_not_loaded(tmp_path):
+    path = element(PLATE).save_results(str(tmp_path / "plate"))
+    with pytest.raises(ValueError):
+        element_from_data(copy.deepcopy(SHELL)).load_results(path)
+
+
+def test_not_computed_element_is_not_saved(tmp_path):
+    with pytest.raises(ValueError):
+        element_from_data(copy.deepcopy(PLATE)).save_results(str(tmp_path / "plate"))
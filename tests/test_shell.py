@@ -0,0 +1,36 @@
+"""Tests of shell - plate and both directions of shield solved concurrently have to give the same results as solved
+one after another"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from fidi.fdm_engine.factorization_cache import FactorizationCache
+from tests.cases import SHELL, element
+
+SETTINGS = [{}, {"solver": "sparse"}, {"solver": "banded"}]
+
+
+def assert_shell_equals_parts(shell, settings):
+    plate = element(dict(SHELL, object_type="plate"), cache=None, **settings)
+    shield = element(dict(SHELL, object_type="shield"), cache=None, **settings)
+    for [prefix, part] in [["plate_", plate], ["shield_", shield]]:
+        for name in part.result_names:
+            assert np.array_equal(shell.results[prefix + name], part.results[name]), prefix + name
+
+
+@pytest.mark.parametrize("settings", SETTINGS)
+def test_concurrent_shell_equals_sequential_parts(settings):
+    shell = element(SHELL, cache=None, **settings)
+    assert_shell_equals_parts(shell, settings)
+    assert {"plate", "vertical", "horizontal"} <= set(shell.solver_info)
+
+
+@pytest.mark.parametrize("settings", SETTINGS)
+def test_shells_computed_in_threads_share_cache(settings):
+    cache = FactorizationCache()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        shells = list(executor.map(lambda k: element(SHELL, cache=cache, **settings), range(4)))
+    for shell in shells:
+        assert_shell_equals_parts(shell, settings)
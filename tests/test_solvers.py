@@ -0,0 +1,184 @@
+"""Tests of solvers of FDM scheme equations - every backend is compared with the reference dense solver"""
+
+import copy
+
+import numpy as np
+import pytest
+
+from fidi.attributes.loading_attributes import element_from_data
+from fidi.attributes.parameter_sweep import compute_group
+from fidi.attributes.result_cache import ResultCache
+from fidi.fdm_engine.solvers import ConvergenceError, ConvergenceWarning, nested_dissection_ordering
+from tests.cases import SHAPES, SUPPORTS, SHIELD_SUPPORTS, HINGED, PLATE, SHELL, plate, shield, element, \
+    assert_results_close
+
+BACKENDS = [  # settings of compute functions and relative tolerance of comparison with dense solver
+    [{"assembly": "sparse", "solver": "sparse"}, 1e-10],
+    [{"assembly": "sparse", "solver": "banded"}, 1e-10],
+    [{"assembly": "sparse", "solver": "gmres", "solver_options": {"tol": 1e-12}}, 1e-6],
+    [{"assembly": "sparse", "solver": "iterative", "solver_options": {"tol": 1e-12}}, 1e-6],
+    [{"assembly": "sparse", "solver": "multigrid", "solver_options": {"tol": 1e-12}}, 1e-6],
+    [{"assembly": "stencil", "solver": "multigrid", "solver_options": {"tol": 1e-12}}, 1e-6],
+    [{"assembly": "sparse", "solver": "sparse", "solver_options": {"precision": "mixed"}}, 1e-8],
+    [{"solver": "dense", "solver_options": {"precision": "mixed"}}, 1e-8],
+]
+
+
+@pytest.mark.parametrize("supports", SUPPORTS)
+@pytest.mark.parametrize("shape", SHAPES)
+@pytest.mark.parametrize("settings, rtol", BACKENDS)
+def test_plate_backend_matches_dense(supports, shape, settings, rtol):
+    assert_results_close(plate(supports, shape, **settings), plate(supports, shape, solver="dense"), rtol)
+
+
+@pytest.mark.parametrize("supports", SHIELD_SUPPORTS)
+@pytest.mark.parametrize("shape", SHAPES)
+@pytest.mark.parametrize("settings, rtol", BACKENDS)
+def test_shield_backend_matches_dense(supports, shape, settings, rtol):
+    assert_results_close(shield(supports, shape, **settings), shield(supports, shape, solver="dense"), rtol)
+
+
+def test_unknown_solver_is_rejected():
+    with pytest.raises(ValueError):
+        plate(SUPPORTS[0], SHAPES[0], assembly="sparse", solver="cholesky")
+
+
+# too few iterations of gmres with jacobi preconditioner to solve plate
+NOT_CONVERGING = {"solver": "gmres", "solver_options": {"preconditioner": "jacobi", "maxiter": 1, "restart": 2}}
+
+
+def test_not_converged_solver_warns():
+    info = {}
+    with pytest.warns(ConvergenceWarning):
+        plate(SUPPORTS[0], SHAPES[0], assembly="sparse", info=info, **NOT_CONVERGING)
+    assert info["converged"] == [False]
+
+
+@pytest.mark.parametrize("data", [PLATE, SHELL])
+def test_not_converged_element_is_not_computed(data, tmp_path):
+    created = element_from_data(copy.deepcopy(data))
+    result_cache = ResultCache(str(tmp_path))
+    with pytest.warns(ConvergenceWarning), pytest.raises(ConvergenceError):
+        created.compute(result_cache=result_cache, **NOT_CONVERGING)
+    assert not created.computed
+    assert result_cache.get(created.result_key(**NOT_CONVERGING), created.result_names) is None
+
+
+def test_not_converged_combination_is_reported_by_sweep(tmp_path):
+    with pytest.warns(ConvergenceWarning):
+        [row] = compute_group(PLATE, [[0, {"thickness": 15.0}]], str(tmp_path), **NOT_CONVERGING)
+    assert row["error"].startswith("ConvergenceError")
+
+
+@pytest.mark.parametrize("assembly", ["sparse", "stencil"])
+def test_multigrid_converges_on_fine_mesh(assembly):
+    info = {}
+    plate(SUPPORTS[1], (65, 65), assembly=assembly, solver="multigrid", info=info)
+    assert info["converged"] == [True] and info["iterations"][0] < 50
+
+
+def test_stencil_assembly_with_default_solver():
+    [info, shield_info] = [{}, {}]
+    assert_results_close(plate(SUPPORTS[1], SHAPES[1], assembly="stencil", info=info),
+                         plate(SUPPORTS[1], SHAPES[1], solver="dense"), 1e-6)
+    assert_results_close(shield(SHIELD_SUPPORTS[0], SHAPES[1], assembly="stencil", info=shield_info),
+                         shield(SHIELD_SUPPORTS[0], SHAPES[1], solver="dense"), 1e-6)
+    solved = [details for details in shield_info.values() if isinstance(details, dict) and "converged" in details]
+    assert info["preconditioner"] == "multigrid" and solved
+    assert all(details["preconditioner"] == "multigrid" for details in solved)
+
+
+@pytest.mark.parametrize("data", [PLATE, SHELL])
+def test_element_with_stencil_assembly_uses_matrix_free_solver(data):
+    created = element(data, assembly="stencil")
+    reference = element(data, solver="sparse")  # displacements of shield are close to their rounding to 1e-14 m
+    assert_results_close(created.results, reference.results, 1e-6)
+    assert created.solver_info["plate"]["preconditioner"] == "multigrid"
+
+
+@pytest.mark.parametrize("solver", ["gmres", "iterative"])
+def test_krylov_solver_of_stencil_assembly_uses_multigrid(solver):
+    info = {}
+    plate(SUPPORTS[1], SHAPES[0], assembly="stencil", solver=solver, info=info)
+    assert info["preconditioner"] == "multigrid" and all(info["converged"])
+
+
+@pytest.mark.parametrize("solver", ["dense", "sparse", "banded"])
+def test_direct_solver_rejects_stencil_assembly(solver):
+    with pytest.raises(ValueError):
+        plate(SUPPORTS[1], SHAPES[0], assembly="stencil", solver=solver)
+
+
+@pytest.mark.parametrize("shape, ordering", [[(9, 9), "natural"], [(12, 7), "transposed"], [(7, 12), "natural"]])
+def test_banded_solver_numbers_nodes_along_shorter_dimension(shape, ordering):
+    info = {}
+    plate(SUPPORTS[0], shape, assembly="sparse", solver="banded", info=info)
+    assert info["ordering"] == ordering
+    assert sum(info["bandwidth"]) <= 4 * (min(shape) + 4) + 1  # two ghost nodes on each edge
+
+
+@pytest.mark.parametrize("ordering", ["colamd", "natural", "mmd_ata", "mmd_at_plus_a", "rcm", "nested_dissection"])
+def test_sparse_orderings_give_the_same_results(ordering):
+    info = {}
+    results = plate(SUPPORTS[2], SHAPES[1], assembly="sparse", solver="sparse", solver_options={"ordering": ordering},
+                    info=info)
+    assert info["ordering"] == ordering
+    assert_results_close(results, plate(SUPPORTS[2], SHAPES[1], solver="dense"), 1e-10)
+
+
+def test_nested_dissection_is_permutation_of_nodes():
+    perm = nested_dissection_ordering((17, 23), min_nodes=16)
+    assert sorted(perm) == list(range(17 * 23))
+
+
+def test_sparse_solver_uses_nested_dissection_on_mesh():
+    info = {}
+    plate(SUPPORTS[0], SHAPES[0], assembly="sparse", solver="sparse", info=info)
+    assert info["ordering"] == "nested_dissection"
+
+
+def test_unknown_ordering_is_rejected():
+    with pytest.raises(ValueError):
+        plate(SUPPORTS[0], SHAPES[0], assembly="sparse", solver="sparse", solver_options={"ordering": "metis"})
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_spectral_matches_dense(shape):
+    [info, dense_info] = [{}, {}]
+    spectral = plate(HINGED, shape, solver="dense", info=info)
+    dense = plate(HINGED, shape, solver="dense", solver_options={"spectral": False}, info=dense_info)
+    assert info["solver"] == "spectral" and dense_info["solver"] == "dense"
+    assert_results_close(spectral, dense, 1e-10)
+
+
+def test_spectral_only_for_default_solver():
+    info = {}
+    plate(HINGED, SHAPES[0], assembly="sparse", solver="sparse", info=info)
+    assert info["solver"] == "sparse"
+
+
+def test_spectral_keeps_precision():
+    results = plate(HINGED, SHAPES[0], solver="dense", solver_options={"precision": "single"})
+    assert results["w"].dtype == np.float32
+
+
+@pytest.mark.parametrize("settings", [{"solver": "dense"}, {"assembly": "sparse", "solver": "sparse"},
+                                      {"assembly": "sparse", "solver": "banded"}])
+def test_single_precision(settings):
+    options = {"precision": "single", "spectral": False}
+    results = plate(SUPPORTS[1], SHAPES[1], solver_options=options, **settings)
+    assert results["w"].dtype == np.float32
+    assert_results_close(results, plate(SUPPORTS[1], SHAPES[1], solver="dense"), 1e-3)
+
+
+def test_mixed_precision_refines_solution():
+    info = {}
+    results = plate(SUPPORTS[1], SHAPES[1], assembly="sparse", solver="sparse", solver_options={"precision": "mixed"},
+                    info=info)
+    assert results["w"].dtype == np.float64
+    assert info["precision"] == "mixed" and info["refinement_converged"]
+
+
+def test_unknown_precision_is_rejected():
+    with pytest.raises(ValueError):
+        plate(SUPPORTS[1], SHAPES[0], assembly="sparse", solver="sparse", solver_options={"precision": "half"})